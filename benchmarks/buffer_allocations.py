@@ -0,0 +1,106 @@
+"""
+Memory allocated per password by the str and the buffer paths.
+
+Compares `generate`, which returns a new `str`, with `generate_into`,
+which builds the password into a pooled `bytearray` from pre-encoded
+words. For every path it reports the time per password, the peak of the
+memory allocated while one password is built (traced with `tracemalloc`),
+and the memory still held afterwards by the returned passwords.
+
+    python benchmarks/buffer_allocations.py --count 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passbrew.buffers import BufferPool  # noqa: E402
+from passbrew.generators.passphrase import (  # noqa: E402
+    PassphraseGenerator,
+    PassphraseStyle,
+)
+from passbrew.generators.user_friendly import (  # noqa: E402
+    UserFriendlyPasswordGenerator,
+)
+from passbrew.settings import GeneratorSettings  # noqa: E402
+
+
+def measure(function, count, pool=None):
+    # Only the generation is traced; the pooled buffer already exists, as it
+    # would in a long running process.
+    results = []
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    peak = 0
+    for _ in range(count):
+        if pool is None:
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            results.append(function())
+            peak += tracemalloc.get_traced_memory()[1] - start
+        else:
+            with pool.borrow() as buffer:
+                tracemalloc.reset_peak()
+                start = tracemalloc.get_traced_memory()[0]
+                function(buffer)
+                peak += tracemalloc.get_traced_memory()[1] - start
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return peak / count, held / count
+
+
+def time_per_call(function, count, pool=None):
+    start = time.perf_counter()
+    for _ in range(count):
+        if pool is None:
+            function()
+        else:
+            with pool.borrow() as buffer:
+                function(buffer)
+    return (time.perf_counter() - start) / count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--length", type=int, default=24)
+    args = parser.parse_args(argv)
+
+    index = UserFriendlyPasswordGenerator().word_index
+    user_friendly = UserFriendlyPasswordGenerator(
+        word_index=index, settings=GeneratorSettings()
+    )
+    passphrase = PassphraseGenerator(
+        word_index=index,
+        settings=GeneratorSettings(),
+        style=PassphraseStyle("-_.", "random", 2),
+    )
+    pool = BufferPool(256)
+    # Encode the words and fill the pool before measuring.
+    with pool.borrow() as buffer:
+        user_friendly.generate_into(buffer, args.length)
+
+    cases = [
+        ("user-friendly str", lambda: user_friendly.generate(args.length), None),
+        (
+            "user-friendly buffer",
+            lambda buffer: user_friendly.generate_into(buffer, args.length),
+            pool,
+        ),
+        ("passphrase str", lambda: passphrase.generate(5), None),
+        ("passphrase buffer", lambda buffer: passphrase.generate_into(buffer, 5), pool),
+    ]
+
+    print(f"{'path':<22} {'µs':>8} {'peak B':>8} {'held B':>8}")
+    for name, function, case_pool in cases:
+        seconds = time_per_call(function, args.count, case_pool)
+        peak, held = measure(function, args.count, case_pool)
+        print(f"{name:<22} {seconds * 1e6:>8.1f} {peak:>8.0f} {held:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
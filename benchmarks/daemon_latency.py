@@ -0,0 +1,136 @@
+"""
+Latency of the passbrew daemon against in-process generation.
+
+Starts `python -m passbrew.daemon` on a temporary socket and compares:
+
+- one password generated in-process and requested from the daemon,
+- a bulk batch generated in-process and read from the daemon's ring,
+- a short-lived process generating one password itself and asking the
+  daemon for it, which includes the interpreter start-up.
+
+    python benchmarks/daemon_latency.py --requests 2000 --bulk 100000
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from passbrew.client import PassbrewClient  # noqa: E402
+from passbrew.generators.user_friendly import (  # noqa: E402
+    UserFriendlyPasswordGenerator,
+)
+
+IN_PROCESS = (
+    "from passbrew.generators.user_friendly import UserFriendlyPasswordGenerator\n"
+    "print(UserFriendlyPasswordGenerator().generate(20))"
+)
+CLIENT = (
+    "from passbrew.client import PassbrewClient\n"
+    "print(PassbrewClient({path!r}).generate('user-friendly', 20))"
+)
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return (
+        timings[len(timings) // 2] * 1e6,
+        timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1e6,
+    )
+
+
+def time_calls(function, requests):
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return percentiles(timings)
+
+
+def time_once(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def time_process(code, runs):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    command = [sys.executable, "-c", code]
+    return statistics.median(
+        time_once(
+            lambda: subprocess.run(
+                command, env=env, check=True, stdout=subprocess.DEVNULL
+            )
+        )
+        for _ in range(runs)
+    )
+
+
+def start_daemon(path):
+    daemon = subprocess.Popen(
+        [sys.executable, "-m", "passbrew.daemon", "--socket", path],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    # The daemon prints a line once it accepts connections.
+    daemon.stdout.readline()
+    return daemon
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--bulk", type=int, default=100_000)
+    parser.add_argument("--cold-runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "passbrew.sock")
+        daemon = start_daemon(path)
+        try:
+            generator = UserFriendlyPasswordGenerator()
+            client = PassbrewClient(path)
+
+            print(f"{'single password':<24} {'p50 µs':>10} {'p99 µs':>10}")
+            rows = [
+                ("in-process", lambda: generator.generate(20)),
+                ("daemon", lambda: client.generate("user-friendly", 20)),
+            ]
+            for name, function in rows:
+                p50, p99 = time_calls(function, args.requests)
+                print(f"{name:<24} {p50:>10.1f} {p99:>10.1f}")
+
+            print(f"\n{f'{args.bulk:,} passwords':<24} {'ms':>10}")
+            rows = [
+                ("in-process", lambda: generator.generate_batch(args.bulk, 20)),
+                (
+                    "daemon ring",
+                    lambda: client.generate_batch("user-friendly", args.bulk, 20),
+                ),
+            ]
+            for name, function in rows:
+                print(f"{name:<24} {time_once(function) * 1e3:>10.1f}")
+
+            print(f"\n{'new process':<24} {'ms':>10}")
+            rows = [
+                ("generating itself", IN_PROCESS),
+                ("asking the daemon", CLIENT.format(path=path)),
+            ]
+            for name, code in rows:
+                print(f"{name:<24} {time_process(code, args.cold_runs) * 1e3:>10.1f}")
+            client.close()
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Cost of recording batches in an issuance log, and of looking them up.
+
+Generates batches with and without an `IssuanceLog` attached, then looks
+up a mix of issued and unknown passwords. Reports the time per password,
+the size of the log per record and the time per lookup.
+
+    python benchmarks/issuance_log.py --count 500000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passbrew.generators.computer_friendly import (  # noqa: E402
+    ComputerFriendlyPasswordGenerator,
+)
+from passbrew.issuance import IssuanceLog  # noqa: E402
+from passbrew.settings import GeneratorSettings  # noqa: E402
+
+
+def time_once(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=500_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--segment-records", type=int, default=4096)
+    parser.add_argument("--no-sync", action="store_true")
+    args = parser.parse_args(argv)
+
+    generator = ComputerFriendlyPasswordGenerator(settings=GeneratorSettings())
+
+    def generate():
+        return list(generator.generate_stream(args.count, 20, chunk_size=args.batch))
+
+    plain, _ = time_once(generate)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "issued.log")
+        with IssuanceLog(
+            path, os.urandom(32), args.segment_records, sync=not args.no_sync
+        ) as log:
+            generator.issuance_log = log
+            logged, passwords = time_once(generate)
+            flushing, _ = time_once(log.flush)
+            size = os.path.getsize(path)
+
+            half = args.lookups // 2
+            queries = passwords[:half] + [p + "x" for p in passwords[:half]]
+            looking_up, found = time_once(lambda: log.lookup(queries))
+            assert sum(t is not None for t in found) == half
+
+    print(f"{'':<24} {'µs/password':>12}")
+    print(f"{'generate_stream':<24} {plain / args.count * 1e6:>12.2f}")
+    print(f"{'with issuance log':<24} {logged / args.count * 1e6:>12.2f}")
+    print(f"{'final flush':<24} {flushing * 1e3:>9.1f} ms")
+    print(f"{'log size':<24} {size / args.count:>9.1f} B/record")
+    print(f"{'lookup':<24} {looking_up / len(queries) * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Throughput of issuing unique passphrases from a sharded keyspace.
+
+Every node walks the counters of its shard through the keyed permutation
+and unranks them into passphrases, without coordinating with the others.
+Compares the steps of that walk with random generation, and checks that
+the passphrases issued by all nodes are unique.
+
+    python benchmarks/keyspace_issuance.py --count 20000 --nodes 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passbrew.generators.passphrase import PassphraseGenerator  # noqa: E402
+from passbrew.keyspace import unrank_permutation  # noqa: E402
+from passbrew.settings import GeneratorSettings  # noqa: E402
+
+
+def time_per_item(function, count):
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) / count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20_000)
+    parser.add_argument("--words", type=int, default=5)
+    parser.add_argument("--nodes", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    generator = PassphraseGenerator(settings=GeneratorSettings())
+    keyspace = generator.get_keyspace(args.words, os.urandom(32))
+    n = len(keyspace.word_index)
+    counters = keyspace.shard(0, args.nodes)[: args.count]
+    ranks = [keyspace.permutation.permute(c) for c in counters]
+    print(
+        f"keyspace: {keyspace.size:,} passphrases ({keyspace.size.bit_length()} bits)"
+    )
+
+    cases = [
+        ("permute", lambda: [keyspace.permutation.permute(c) for c in counters]),
+        ("unrank", lambda: [unrank_permutation(r, n, args.words) for r in ranks]),
+        ("issue", lambda: keyspace.issue(counters)),
+        ("generate_batch", lambda: generator.generate_batch(args.count, args.words)),
+    ]
+    print(f"{'step':<16} {'µs':>8} {'per s':>10}")
+    for name, function in cases:
+        seconds = time_per_item(function, args.count)
+        print(f"{name:<16} {seconds * 1e6:>8.2f} {1 / seconds:>10,.0f}")
+
+    per_node = args.count // args.nodes
+    issued = []
+    for node in range(args.nodes):
+        issued.extend(keyspace.issue(keyspace.shard(node, args.nodes)[:per_node]))
+    print(f"unique across {args.nodes} nodes: {len(set(issued)) == len(issued)}")
+
+
+if __name__ == "__main__":
+    main()
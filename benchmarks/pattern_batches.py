@@ -0,0 +1,63 @@
+"""
+Throughput of pattern passwords, compiled once and generated in batches.
+
+Compares one `generate` call per password with `generate_batch`, which
+draws every token of the pattern for the whole batch at once, and reports
+the time spent compiling each pattern into its plan.
+
+    python benchmarks/pattern_batches.py --count 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passbrew.generators.pattern import PatternPasswordGenerator  # noqa: E402
+from passbrew.generators.user_friendly import (  # noqa: E402
+    UserFriendlyPasswordGenerator,
+)
+from passbrew.pattern import PatternPlan  # noqa: E402
+from passbrew.settings import GeneratorSettings  # noqa: E402
+
+PATTERNS = ("Word-Word-dd-S", "ccvcvc99", "WORD{4,6}.x{8}")
+
+
+def time_once(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--single", type=int, default=20_000)
+    parser.add_argument("patterns", nargs="*", default=PATTERNS)
+    args = parser.parse_args(argv)
+
+    index = UserFriendlyPasswordGenerator().word_index
+    generator = PatternPasswordGenerator(word_index=index, settings=GeneratorSettings())
+
+    print(
+        f"{'pattern':<18} {'bits':>6} {'compile µs':>11} "
+        f"{'single µs':>10} {'batch µs':>9} {'batch /s':>11}"
+    )
+    for pattern in args.patterns:
+        compiling = time_once(lambda: PatternPlan(pattern, index))
+        plan = generator.get_plan(pattern)
+        single = time_once(
+            lambda: [generator.generate(pattern) for _ in range(args.single)]
+        )
+        batch = time_once(lambda: generator.generate_batch(args.count, pattern))
+        print(
+            f"{pattern:<18} {plan.entropy:>6.1f} {compiling * 1e6:>11.1f} "
+            f"{single / args.single * 1e6:>10.2f} {batch / args.count * 1e6:>9.2f} "
+            f"{args.count / batch:>11,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
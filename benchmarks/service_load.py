@@ -0,0 +1,109 @@
+"""
+Load test for `passbrew.service` against localhost.
+
+Starts a server on a free port (unless --url is given) and hammers one
+endpoint from many threads, each reusing a single keep-alive connection.
+
+    python benchmarks/service_load.py --threads 16 --requests 500
+    python benchmarks/service_load.py --url http://127.0.0.1:8000 --count 10
+"""
+
+import argparse
+import http.client
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passbrew.service import PassbrewServer  # noqa: E402
+
+
+def worker(host, port, path, requests, latencies, errors):
+    conn = http.client.HTTPConnection(host, port)
+    for _ in range(requests):
+        start = time.perf_counter()
+        conn.request("GET", path)
+        response = conn.getresponse()
+        body = response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            errors.append(body)
+    conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="Test a running server instead.")
+    parser.add_argument(
+        "--endpoint",
+        default="user-friendly",
+        choices=["computer-friendly", "user-friendly", "passphrase"],
+    )
+    parser.add_argument("--length", type=int, default=20)
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        server = PassbrewServer(("127.0.0.1", 0), quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+
+    length = args.length
+    if args.endpoint == "passphrase" and args.length > 12:
+        length = 5
+    path = f"/{args.endpoint}?length={length}&count={args.count}"
+
+    # Warm up and check the endpoint before measuring.
+    conn = http.client.HTTPConnection(host, port)
+    conn.request("GET", path)
+    response = conn.getresponse()
+    body = response.read().decode("utf-8")
+    print(f"GET {path} -> {response.status} {body[:80]!r}")
+    conn.close()
+
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(host, port, path, args.requests, latencies, errors),
+        )
+        for _ in range(args.threads)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    total = args.threads * args.requests
+    latencies.sort()
+    print(f"{total} requests in {elapsed:.2f}s, {len(errors)} errors")
+    print(
+        f"{total / elapsed:,.0f} requests/s, {total * args.count / elapsed:,.0f} passwords/s"
+    )
+    print(
+        f"latency p50 {latencies[len(latencies) // 2] * 1000:.2f}ms "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms"
+    )
+    if server is not None:
+        coalescer = server.coalescer
+        print(
+            f"{coalescer.requests} requests served in {coalescer.batches} batches "
+            f"({coalescer.requests / max(coalescer.batches, 1):.1f} per batch)"
+        )
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
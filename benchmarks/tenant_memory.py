@@ -0,0 +1,78 @@
+"""
+Memory per tenant for differently configured generators.
+
+Compares generators that each load their own word list with slotted
+generators sharing one `WordIndex` and holding per-tenant
+`GeneratorSettings`.
+
+    python benchmarks/tenant_memory.py --tenants 10000
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passbrew.generators.passphrase import PassphraseGenerator  # noqa: E402
+from passbrew.generators.user_friendly import (  # noqa: E402
+    UserFriendlyPasswordGenerator,
+)
+from passbrew.settings import GeneratorSettings  # noqa: E402
+
+
+def measure(factory, tenants):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    generators = [factory(i) for i in range(tenants)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return generators, size / tenants
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tenants", type=int, default=10_000)
+    parser.add_argument(
+        "--legacy-tenants",
+        type=int,
+        default=200,
+        help="Tenants for the word-list-per-generator baseline, which is slow "
+        "to build.",
+    )
+    args = parser.parse_args(argv)
+
+    shared = UserFriendlyPasswordGenerator()
+    index = shared.word_index
+
+    def legacy(i):
+        return UserFriendlyPasswordGenerator()
+
+    def compact_user_friendly(i):
+        return UserFriendlyPasswordGenerator(
+            word_index=index,
+            settings=GeneratorSettings(char_amount=1 + i % 3, num_amount=1 + i % 4),
+        )
+
+    def compact_passphrase(i):
+        return PassphraseGenerator(
+            word_index=index,
+            settings=GeneratorSettings(min_word_count=3 + i % 3, max_word_count=10),
+        )
+
+    _, legacy_size = measure(legacy, args.legacy_tenants)
+    print(f"own word list per generator:      {legacy_size:>10,.0f} bytes/tenant")
+
+    generators, size = measure(compact_user_friendly, args.tenants)
+    print(f"shared index, user-friendly:      {size:>10,.0f} bytes/tenant")
+    assert generators[5].generate(20)
+
+    generators, size = measure(compact_passphrase, args.tenants)
+    print(f"shared index, passphrase:         {size:>10,.0f} bytes/tenant")
+    assert generators[5].generate(5)
+
+
+if __name__ == "__main__":
+    main()
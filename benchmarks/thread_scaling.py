@@ -0,0 +1,142 @@
+"""
+Generation throughput across threads.
+
+Runs 1 to --threads threads, each with its own generator sharing one
+`WordIndex`, and reports the throughput and the speedup over one thread.
+On a free-threaded interpreter (3.13t and later, with the GIL disabled)
+the throughput should grow nearly linearly with the cores. With the GIL,
+threads cannot run Python code in parallel, so the same work is also run
+in processes for comparison.
+
+    python benchmarks/thread_scaling.py --threads 8 --seconds 2
+    python3.13t -X gil=0 benchmarks/thread_scaling.py --generator passphrase
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import sysconfig
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passbrew.generators.computer_friendly import (  # noqa: E402
+    ComputerFriendlyPasswordGenerator,
+)
+from passbrew.generators.passphrase import PassphraseGenerator  # noqa: E402
+from passbrew.generators.user_friendly import (  # noqa: E402
+    UserFriendlyPasswordGenerator,
+)
+from passbrew.settings import GeneratorSettings  # noqa: E402
+
+GENERATORS = {
+    "user_friendly": (UserFriendlyPasswordGenerator, (20,)),
+    "passphrase": (PassphraseGenerator, (4,)),
+    "computer_friendly": (ComputerFriendlyPasswordGenerator, (20,)),
+}
+
+
+def is_gil_enabled():
+    return getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def make_generator(name, index):
+    # Without an index, the generator loads its own word list.
+    generator_class, args = GENERATORS[name]
+    generator = generator_class(word_index=index, settings=GeneratorSettings())
+    return lambda: generator.generate(*args)
+
+
+def run(name, index, seconds, start, counts, slot):
+    generate = make_generator(name, index)
+    start.wait()
+    deadline = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            generate()
+        count += 100
+    counts[slot] = count
+
+
+def measure_threads(name, index, workers, seconds):
+    counts = [0] * workers
+    start = threading.Barrier(workers)
+    threads = [
+        threading.Thread(target=run, args=(name, index, seconds, start, counts, i))
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def measure_processes(name, workers, seconds):
+    # Every process loads its own word list, as a process pool would.
+    with multiprocessing.Manager() as manager:
+        counts = manager.list([0] * workers)
+        start = manager.Barrier(workers)
+        processes = [
+            multiprocessing.Process(
+                target=run, args=(name, None, seconds, start, counts, i)
+            )
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        return sum(counts) / seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument(
+        "--generator", choices=sorted(GENERATORS), default="user_friendly"
+    )
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="Also compare with processes on a free-threaded interpreter.",
+    )
+    args = parser.parse_args(argv)
+
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    gil = is_gil_enabled()
+    print(
+        f"Python {sys.version.split()[0]}, "
+        f"{'free-threaded' if free_threaded else 'default'} build, "
+        f"GIL {'enabled' if gil else 'disabled'}, {os.cpu_count()} CPUs"
+    )
+    compare = gil or args.processes
+
+    index = UserFriendlyPasswordGenerator().word_index
+    base = None
+    header = f"{'workers':>7} {'threads/s':>12} {'speedup':>8}"
+    if compare:
+        header += f" {'processes/s':>12} {'speedup':>8}"
+    print(header)
+    for workers in range(1, args.threads + 1):
+        rate = measure_threads(args.generator, index, workers, args.seconds)
+        if base is None:
+            base = rate
+        line = f"{workers:>7} {rate:>12,.0f} {rate / base:>7.2f}x"
+        if compare:
+            process_rate = measure_processes(args.generator, workers, args.seconds)
+            line += f" {process_rate:>12,.0f} {process_rate / base:>7.2f}x"
+        print(line)
+    if gil:
+        print(
+            "The GIL serializes the threads; run a free-threaded build with "
+            "-X gil=0 to scale them across cores."
+        )
+
+
+if __name__ == "__main__":
+    main()
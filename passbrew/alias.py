@@ -0,0 +1,194 @@
+import random
+import struct
+from typing import Iterable, List, Sequence, Tuple
+
+from passbrew.exceptions import ValidationError
+
+_WORD_SIZE = 8
+_WORD_RANGE = 1 << 64
+
+
+def build_alias_table(weights: Sequence[int]) -> Tuple[List[int], List[int], int]:
+    """
+    Build a Walker alias table with Vose's method, in exact integers.
+
+    Outcome `i` of `n` has the probability `weights[i] / total`. A draw
+    picks a uniform integer `r` below `n * total`; its column is
+    `r // total`, and the column's own outcome is kept if `r % total` is
+    below the column's threshold, otherwise its alias is used.
+
+    :param weights: The non-negative integer weights of the outcomes.
+    :type weights: Sequence[int]
+    :return: The thresholds, the aliases and the total weight.
+    :rtype: Tuple[List[int], List[int], int]
+    :raises ValidationError: If a weight is not a non-negative integer, or
+                             all weights are zero.
+    """
+    for weight in weights:
+        if not isinstance(weight, int) or isinstance(weight, bool) or weight < 0:
+            raise ValidationError(
+                f"Invalid weight: {weight!r}. Weights must be non-negative integers."
+            )
+    total = sum(weights)
+    if total == 0:
+        raise ValidationError("At least one weight must be positive.")
+
+    n = len(weights)
+    scaled = [weight * n for weight in weights]
+    thresholds = [total] * n
+    aliases = list(range(n))
+    small = [i for i, weight in enumerate(scaled) if weight < total]
+    large = [i for i, weight in enumerate(scaled) if weight >= total]
+    while small and large:
+        i = small.pop()
+        j = large[-1]
+        thresholds[i] = scaled[i]
+        aliases[i] = j
+        scaled[j] -= total - scaled[i]
+        if scaled[j] < total:
+            small.append(large.pop())
+    # Integer arithmetic leaves no rounding errors, so the remaining columns
+    # are full.
+    return thresholds, aliases, total
+
+
+def random_words(rng: random.Random, k: int) -> List[int]:
+    """
+    Draw `k` uniform 64-bit integers from one read of random bytes.
+
+    :param rng: The random number generator.
+    :type rng: random.Random
+    :param k: The amount of integers.
+    :type k: int
+    :return: The integers.
+    :rtype: List[int]
+    """
+    # Read little-endian, so seeded draws are the same on every platform.
+    return list(struct.unpack(f"<{k}Q", rng.randbytes(_WORD_SIZE * k)))
+
+
+def get_limit(modulus: int) -> int:
+    """
+    Get the rejection limit of reducing 64-bit integers modulo `modulus`.
+
+    Integers below the limit are uniform modulo `modulus`; the others are
+    replaced by a fresh draw, which happens with a probability below
+    `modulus / 2**64`.
+
+    :param modulus: The modulus, at most 2**64.
+    :type modulus: int
+    :return: The largest multiple of `modulus` up to 2**64.
+    :rtype: int
+    """
+    return _WORD_RANGE - _WORD_RANGE % modulus
+
+
+class AliasTable:
+    """
+    Sample outcomes with integer weights in constant time.
+
+    The table is built once with `build_alias_table`; every draw then takes
+    one random 64-bit integer, a division and one comparison, whatever the
+    amount of outcomes.
+
+    :param weights: The non-negative integer weights of the outcomes.
+    :type weights: Sequence[int]
+    :raises ValidationError: If the weights are invalid.
+
+    Attributes
+    ----------
+    weights : Tuple[int, ...]
+        The weights of the outcomes.
+    total : int
+        The sum of the weights.
+    """
+
+    __slots__ = ("weights", "total", "_thresholds", "_aliases", "_modulus", "_limit")
+
+    def __init__(self, weights: Sequence[int]) -> None:
+        self.weights = tuple(weights)
+        self._thresholds, self._aliases, self.total = build_alias_table(self.weights)
+        self._modulus = len(self.weights) * self.total
+        if self._modulus > _WORD_RANGE:
+            raise ValidationError("The weights of an alias table are too large.")
+        self._limit = get_limit(self._modulus)
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def probability(self, i: int) -> float:
+        """
+        Get the probability of an outcome.
+
+        :param i: The index of the outcome.
+        :type i: int
+        :return: The probability of drawing `i`.
+        :rtype: float
+        """
+        return self.weights[i] / self.total
+
+    def map_value(self, value: int, rng: random.Random) -> int:
+        """
+        Map a uniform 64-bit integer to an outcome.
+
+        :param value: A uniform random integer below 2**64.
+        :type value: int
+        :param rng: The random number generator for the rare rejected
+                    values.
+        :type rng: random.Random
+        :return: The index of the outcome.
+        :rtype: int
+        """
+        if value >= self._limit:
+            value = rng.randrange(self._modulus)
+        column, rest = divmod(value % self._modulus, self.total)
+        return column if rest < self._thresholds[column] else self._aliases[column]
+
+    def map_values(self, values: Iterable[int], rng: random.Random) -> List[int]:
+        """
+        Map many uniform 64-bit integers to outcomes.
+
+        :param values: Uniform random integers below 2**64.
+        :type values: Iterable[int]
+        :param rng: The random number generator for the rare rejected
+                    values.
+        :type rng: random.Random
+        :return: The indexes of the outcomes.
+        :rtype: List[int]
+        """
+        modulus = self._modulus
+        limit = self._limit
+        total = self.total
+        thresholds = self._thresholds
+        aliases = self._aliases
+        result = []
+        for value in values:
+            if value >= limit:
+                value = rng.randrange(modulus)
+            column, rest = divmod(value % modulus, total)
+            result.append(column if rest < thresholds[column] else aliases[column])
+        return result
+
+    def sample(self, rng: random.Random) -> int:
+        """
+        Draw one outcome.
+
+        :param rng: The random number generator.
+        :type rng: random.Random
+        :return: The index of the outcome.
+        :rtype: int
+        """
+        return self.map_value(random_words(rng, 1)[0], rng)
+
+    def sample_many(self, rng: random.Random, k: int) -> List[int]:
+        """
+        Draw `k` independent outcomes from one read of random bytes.
+
+        :param rng: The random number generator.
+        :type rng: random.Random
+        :param k: The amount of outcomes.
+        :type k: int
+        :return: The indexes of the outcomes.
+        :rtype: List[int]
+        """
+        return self.map_values(random_words(rng, k), rng)
@@ -0,0 +1,261 @@
+import hashlib
+import heapq
+import mmap
+import os
+import tempfile
+from typing import Iterable, Iterator, List
+
+from passbrew.exceptions import ValidationError
+
+RECORD_SIZE = hashlib.sha1().digest_size
+
+# The first bytes of every record, read as an integer, drive the
+# interpolation search. SHA-1 digests are uniformly distributed, so the
+# position of a key can be estimated from its value.
+_KEY_SIZE = 8
+_KEY_SPACE = 1 << (_KEY_SIZE * 8)
+
+
+def hash_password(password: str) -> bytes:
+    """
+    Get the SHA-1 digest of a password, as stored in a blocklist.
+
+    :param password: The password to be hashed.
+    :type password: str
+    :return: The 20 byte digest of the UTF-8 encoded password.
+    :rtype: bytes
+    """
+    return hashlib.sha1(password.encode("utf-8")).digest()
+
+
+def _parse_line(line: str, hashed: bool) -> bytes:
+    """
+    Convert a line of a breached-password corpus into a digest.
+
+    Hashed corpora contain a hex encoded SHA-1 digest per line, optionally
+    followed by `:count` as published by Have I Been Pwned.
+    """
+    line = line.rstrip("\r\n")
+    if not hashed:
+        return hash_password(line)
+    try:
+        digest = bytes.fromhex(line.split(":", 1)[0].strip())
+    except ValueError:
+        raise ValidationError(f"Invalid SHA-1 hash: {line!r}")
+    if len(digest) != RECORD_SIZE:
+        raise ValidationError(f"Invalid SHA-1 hash: {line!r}")
+    return digest
+
+
+def _read_records(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            record = f.read(RECORD_SIZE)
+            if not record:
+                break
+            yield record
+
+
+def _write_run(records: List[bytes], directory: str) -> str:
+    records.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        f.write(b"".join(records))
+    return path
+
+
+def build_blocklist(
+    lines: Iterable[str],
+    output_path: str,
+    hashed: bool = True,
+    chunk_size: int = 5_000_000,
+) -> int:
+    """
+    Build a sorted, fixed-width binary hash file from a password corpus.
+
+    The corpus is read as a stream and sorted externally: chunks of
+    `chunk_size` digests are sorted in memory and written to temporary
+    runs, which are then merged into the output file. Duplicates are
+    dropped while merging.
+
+    :param lines: The lines of the corpus, e.g. an open text file.
+    :type lines: Iterable[str]
+    :param output_path: The path of the blocklist file to be written.
+    :type output_path: str
+    :param hashed: Whether the lines are hex encoded SHA-1 digests (True)
+                   or plaintext passwords (False).
+    :type hashed: bool
+    :param chunk_size: The maximum amount of digests held in memory.
+    :type chunk_size: int
+    :return: The amount of digests in the blocklist.
+    :rtype: int
+    :raises ValidationError: If a line is not a valid SHA-1 hash.
+    """
+    directory = os.path.dirname(os.path.abspath(output_path))
+    runs = []
+    try:
+        chunk = []
+        for line in lines:
+            if not line.strip():
+                continue
+            chunk.append(_parse_line(line, hashed))
+            if len(chunk) >= chunk_size:
+                runs.append(_write_run(chunk, directory))
+                chunk = []
+        if chunk or not runs:
+            runs.append(_write_run(chunk, directory))
+
+        count = 0
+        previous = None
+        with open(output_path, "wb") as f:
+            for record in heapq.merge(*(_read_records(run) for run in runs)):
+                if record != previous:
+                    f.write(record)
+                    count += 1
+                    previous = record
+        return count
+    finally:
+        for run in runs:
+            os.remove(run)
+
+
+class Blocklist:
+    """
+    A breached-password blocklist backed by a sorted binary hash file.
+
+    The file is memory mapped, so opening a blocklist of hundreds of
+    millions of hashes is instant and only the pages touched by lookups are
+    ever read. Lookups use interpolation search, which needs O(log log n)
+    probes on uniformly distributed digests, and fall back to bisection if
+    the estimates stop converging.
+
+    Methods
+    -------
+    contains_hash(digest: bytes) -> bool
+        Check whether a SHA-1 digest is in the blocklist.
+    contains_batch(passwords: Iterable[str]) -> List[bool]
+        Check many passwords at once.
+    filter(passwords: Iterable[str]) -> List[str]
+        Drop the blocked passwords.
+    close() -> None
+        Close the underlying file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size % RECORD_SIZE:
+            self._file.close()
+            raise ValidationError(
+                f"Invalid blocklist file: {size} bytes is not a multiple of {RECORD_SIZE}."
+            )
+        self._size = size // RECORD_SIZE
+        self._mmap = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if size
+            else b""
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, password: str) -> bool:
+        return self.contains_hash(hash_password(password))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._file.close()
+
+    def _search(self, digest: bytes, lo: int, lo_key: int):
+        """
+        Find the position of a digest in the file.
+
+        :param digest: The digest to be found.
+        :type digest: bytes
+        :param lo: The position to start the search from.
+        :type lo: int
+        :param lo_key: The key of the record before `lo`.
+        :type lo_key: int
+        :return: Whether the digest was found, the position of the first
+                 record not less than the digest, and its key.
+        :rtype: Tuple[bool, int, int]
+        """
+        mm = self._mmap
+        key = int.from_bytes(digest[:_KEY_SIZE], "big")
+        hi = self._size
+        hi_key = _KEY_SPACE
+        # Interpolation is abandoned after this many probes, which keeps the
+        # worst case of skewed files logarithmic.
+        probes = self._size.bit_length()
+        while lo < hi:
+            if probes > 0 and hi - lo > 16 and hi_key > lo_key:
+                probes -= 1
+                mid = lo + (key - lo_key) * (hi - lo) // (hi_key - lo_key)
+                mid = min(max(mid, lo), hi - 1)
+            else:
+                mid = (lo + hi) // 2
+            offset = mid * RECORD_SIZE
+            record = mm[offset : offset + RECORD_SIZE]
+            if record < digest:
+                lo = mid + 1
+                lo_key = int.from_bytes(record[:_KEY_SIZE], "big")
+            elif record > digest:
+                hi = mid
+                hi_key = int.from_bytes(record[:_KEY_SIZE], "big")
+            else:
+                return True, mid, lo_key
+        return False, lo, lo_key
+
+    def contains_hash(self, digest: bytes) -> bool:
+        """
+        Check whether a SHA-1 digest is in the blocklist.
+
+        :param digest: The 20 byte digest.
+        :type digest: bytes
+        :return: True if the digest is in the blocklist.
+        :rtype: bool
+        """
+        return self._search(digest, 0, 0)[0]
+
+    def contains_batch(self, passwords: Iterable[str]) -> List[bool]:
+        """
+        Check many passwords at once.
+
+        The digests are looked up in sorted order, so every search starts
+        where the previous one ended and the pages of the file are visited
+        in order.
+
+        :param passwords: The passwords to be checked.
+        :type passwords: Iterable[str]
+        :return: Whether each password is in the blocklist, in order.
+        :rtype: List[bool]
+        """
+        digests = [hash_password(p) for p in passwords]
+        result = [False] * len(digests)
+        lo = 0
+        lo_key = 0
+        for i in sorted(range(len(digests)), key=digests.__getitem__):
+            found, lo, lo_key = self._search(digests[i], lo, lo_key)
+            result[i] = found
+        return result
+
+    def filter(self, passwords: Iterable[str]) -> List[str]:
+        """
+        Drop the passwords that are in the blocklist.
+
+        :param passwords: The passwords to be checked.
+        :type passwords: Iterable[str]
+        :return: The passwords that are not in the blocklist, in order.
+        :rtype: List[str]
+        """
+        passwords = list(passwords)
+        blocked = self.contains_batch(passwords)
+        return [p for p, is_blocked in zip(passwords, blocked) if not is_blocked]
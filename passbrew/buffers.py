@@ -0,0 +1,114 @@
+import contextlib
+import threading
+from typing import Iterator, List, Sequence
+
+from passbrew.exceptions import ValidationError
+from passbrew.validation import is_positive_integer
+
+
+def get_byte_view(buffer):
+    """
+    Get a writable view of the bytes of a buffer.
+
+    :param buffer: A writable buffer.
+    :return: The buffer itself if it is a `bytearray`, which is written in
+             place as it is, otherwise a `memoryview` of its bytes.
+    """
+    if isinstance(buffer, bytearray):
+        return buffer
+    return memoryview(buffer).cast("B")
+
+
+def zeroize(buffer) -> None:
+    """
+    Overwrite a buffer with zeros in place.
+
+    :param buffer: A writable buffer, e.g. a `bytearray` or a writable
+                   `memoryview`.
+    """
+    view = get_byte_view(buffer)
+    view[:] = bytes(len(view))
+
+
+def write_segments(buffer, segments: Sequence[bytes]) -> int:
+    """
+    Write the segments of a password into a buffer, back to back.
+
+    Nothing is written if the segments do not fit.
+
+    :param buffer: A writable buffer.
+    :param segments: The encoded segments of the password.
+    :type segments: Sequence[bytes]
+    :return: The amount of bytes written.
+    :rtype: int
+    :raises ValidationError: If the buffer is too small.
+    """
+    view = get_byte_view(buffer)
+    size = sum(map(len, segments))
+    if size > len(view):
+        raise ValidationError(
+            f"The buffer of {len(view)} bytes is too small for {size} bytes."
+        )
+    position = 0
+    for segment in segments:
+        end = position + len(segment)
+        view[position:end] = segment
+        position = end
+    return position
+
+
+class BufferPool:
+    """
+    A pool of reusable buffers for passwords.
+
+    `borrow` lends a `bytearray` of `size` bytes and zeroizes it when it is
+    given back, so a password built into it with `generate_into` leaves no
+    copy once the borrowing block ends. Returned buffers are kept for the
+    next borrower, up to `max_buffers` of them. The pool can be shared by
+    threads.
+
+    :param size: The size of every buffer in bytes.
+    :type size: int
+    :param max_buffers: The largest amount of idle buffers kept.
+    :type max_buffers: int
+
+    Attributes
+    ----------
+    size : int
+        The size of every buffer in bytes.
+    max_buffers : int
+        The largest amount of idle buffers kept.
+    """
+
+    __slots__ = ("size", "max_buffers", "_idle", "_lock")
+
+    def __init__(self, size: int = 256, max_buffers: int = 64) -> None:
+        is_positive_integer(size)
+        is_positive_integer(max_buffers)
+        self.size = size
+        self.max_buffers = max_buffers
+        self._idle: List[bytearray] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    @contextlib.contextmanager
+    def borrow(self) -> Iterator[bytearray]:
+        """
+        Borrow a buffer for the duration of a `with` block.
+
+        Use `memoryview(buffer)[:n]` to pass on the `n` bytes of a password
+        without copying them.
+
+        :return: A context manager yielding a zeroed `bytearray`.
+        """
+        with self._lock:
+            buffer = self._idle.pop() if self._idle else bytearray(self.size)
+        try:
+            yield buffer
+        finally:
+            zeroize(buffer)
+            with self._lock:
+                if len(self._idle) < self.max_buffers:
+                    self._idle.append(buffer)
@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+from typing import List
+
+from passbrew.exceptions import ValidationError
+
+
+def get_default_socket_path() -> str:
+    """
+    Get the default socket path of the daemon.
+
+    :return: `passbrew.sock` in `$XDG_RUNTIME_DIR`, or a per-user name in
+             the temporary directory.
+    :rtype: str
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "passbrew.sock")
+    return os.path.join(tempfile.gettempdir(), f"passbrew-{os.getuid()}.sock")
+
+
+def _attach(name: str):
+    # Imported on the first bulk request only; multiprocessing takes longer
+    # to import than a single request takes.
+    from multiprocessing import resource_tracker, shared_memory
+
+    # The daemon owns the block; the resource tracker of a client would
+    # remove it when the client exits. Before Python 3.13 attaching always
+    # registers the block, so it is unregistered again; with the daemon in
+    # the same process, its tracker then reports the block as unknown when
+    # the daemon removes it.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    shm = shared_memory.SharedMemory(name)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class PassbrewClient:
+    """
+    A client of the passbrew daemon, see `passbrew.daemon`.
+
+    Imports nothing but the standard library, so a short-lived process
+    pays neither for the generators nor for loading a word list. Bulk
+    results are read from the daemon's shared memory ring instead of the
+    socket.
+
+    The connection is opened on creation and kept until `close`. A client
+    is not meant to be shared by threads; use one per thread.
+
+    :param path: The path of the daemon's socket. Defaults to
+                 `get_default_socket_path()`.
+    :type path: str
+    :param timeout: The socket timeout in seconds, or `None`.
+    :type timeout: float
+    :raises OSError: If the daemon cannot be reached.
+    """
+
+    __slots__ = ("path", "_sock", "_file", "_ring")
+
+    def __init__(self, path: str = None, timeout: float = 10.0) -> None:
+        self.path = path or get_default_socket_path()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(self.path)
+        except OSError:
+            self._sock.close()
+            raise
+        self._file = self._sock.makefile("rwb")
+        self._ring = None
+
+    def __enter__(self) -> "PassbrewClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _send(self, data: bytes) -> None:
+        self._file.write(data)
+        self._file.flush()
+
+    def _receive(self) -> dict:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("The daemon closed the connection.")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise ValidationError(reply["error"])
+        return reply
+
+    def _read_segment(self, reply: dict) -> List[str]:
+        if self._ring is None or self._ring.name != reply["ring"]:
+            if self._ring is not None:
+                self._ring.close()
+            self._ring = _attach(reply["ring"])
+        offset = reply["offset"]
+        data = bytes(self._ring.buf[offset : offset + reply["size"]])
+        self._send(b"ack\n")
+        return data.decode("utf-8").split("\n")[:-1]
+
+    def generate_batch(self, name: str, count: int, *args) -> List[str]:
+        """
+        Generate passwords with a generator of the daemon.
+
+        :param name: The name of the generator, e.g. `"user-friendly"`.
+        :type name: str
+        :param count: The amount of passwords.
+        :type count: int
+        :param args: The arguments of the generator's `generate` method.
+        :return: A list of `count` passwords.
+        :rtype: List[str]
+        :raises ValidationError: If the daemon rejected the request.
+        """
+        request = {"generator": name, "args": args, "count": count}
+        self._send(json.dumps(request).encode("utf-8") + b"\n")
+        passwords = []
+        while True:
+            reply = self._receive()
+            if "passwords" in reply:
+                return reply["passwords"]
+            if reply.get("done"):
+                return passwords
+            passwords.extend(self._read_segment(reply))
+
+    def generate(self, name: str, *args) -> str:
+        """
+        Generate one password with a generator of the daemon.
+
+        :param name: The name of the generator, e.g. `"user-friendly"`.
+        :type name: str
+        :param args: The arguments of the generator's `generate` method.
+        :return: The password.
+        :rtype: str
+        :raises ValidationError: If the daemon rejected the request.
+        """
+        return self.generate_batch(name, 1, *args)[0]
+
+    def close(self) -> None:
+        """
+        Close the connection.
+        """
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+        self._file.close()
+        self._sock.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m passbrew.client",
+        description="Generate passwords with a running passbrew daemon.",
+    )
+    parser.add_argument("generator", help="e.g. user-friendly")
+    parser.add_argument("args", nargs="*", type=int)
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--socket", default=get_default_socket_path())
+    args = parser.parse_args(argv)
+
+    with PassbrewClient(args.socket) as client:
+        for password in client.generate_batch(args.generator, args.count, *args.args):
+            print(password)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, Tuple
+
+from passbrew.client import get_default_socket_path
+from passbrew.exceptions import ValidationError
+from passbrew.generators.base_generator import BasePasswordGenerator
+from passbrew.service import get_default_generators
+
+# The smallest result ring, in bytes, a daemon accepts.
+MIN_RING_SIZE = 4096
+
+
+class ResultRing:
+    """
+    A ring buffer of result segments in shared memory.
+
+    The daemon writes the passwords of a bulk request as segments of
+    newline-separated UTF-8 text, and the client reads them in place from
+    the same shared memory block. A segment is always contiguous: one that
+    does not fit before the end of the block starts again at its beginning.
+    Space is only reused after the client released the segments written
+    before it, in order.
+
+    The block is created with the permissions of the daemon's user, and
+    overwritten with zeros before it is removed.
+
+    :param size: The size of the block in bytes.
+    :type size: int
+
+    Attributes
+    ----------
+    name : str
+        The name clients attach to.
+    size : int
+        The size of the block in bytes.
+    """
+
+    __slots__ = ("name", "size", "_shm", "_head", "_tail", "_pending")
+
+    def __init__(self, size: int) -> None:
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self.name = self._shm.name
+        self.size = size
+        # The absolute amounts of bytes written and released.
+        self._head = 0
+        self._tail = 0
+        # The absolute end of every unreleased segment.
+        self._pending = deque()
+
+    @property
+    def pending(self) -> int:
+        """
+        Get the amount of unreleased segments.
+
+        :return: The amount of segments written but not released.
+        :rtype: int
+        """
+        return len(self._pending)
+
+    def _get_start(self, size: int) -> int:
+        position = self._head % self.size
+        if position + size > self.size:
+            return self._head + self.size - position
+        return self._head
+
+    def fits(self, size: int) -> bool:
+        """
+        Check whether a segment can be written without overwriting
+        unreleased ones.
+
+        :param size: The size of the segment in bytes.
+        :type size: int
+        :return: True if the segment fits.
+        :rtype: bool
+        """
+        if not self._pending:
+            return size <= self.size
+        return self._get_start(size) + size - self._tail <= self.size
+
+    def write(self, data: bytes) -> int:
+        """
+        Write a segment.
+
+        :param data: The contents of the segment.
+        :type data: bytes
+        :return: The offset of the segment in the block.
+        :rtype: int
+        :raises ValidationError: If the segment does not fit.
+        """
+        if not self.fits(len(data)):
+            raise ValidationError("The segment does not fit into the ring.")
+        start = self._get_start(len(data))
+        if not self._pending:
+            # Nothing is unreleased, so the bytes skipped to keep the
+            # segment contiguous need no protection.
+            self._tail = start
+        offset = start % self.size
+        self._shm.buf[offset : offset + len(data)] = data
+        self._head = start + len(data)
+        self._pending.append(self._head)
+        return offset
+
+    def release(self) -> None:
+        """
+        Release the oldest unreleased segment.
+        """
+        self._tail = self._pending.popleft()
+
+    def close(self) -> None:
+        """
+        Clear and remove the shared memory block.
+        """
+        self._shm.buf[:] = bytes(self.size)
+        self._shm.close()
+        self._shm.unlink()
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Serve generation requests of one client connection.
+
+    Requests and replies are JSON objects, one per line. A request names
+    a generator, the arguments of its `generate` method and a count::
+
+        {"generator": "user-friendly", "args": [20], "count": 1}
+
+    Up to `inline_threshold` passwords are answered on the socket with
+    `{"passwords": [...]}`. Larger counts are written to the connection's
+    `ResultRing`, created on its first bulk request; every segment is
+    announced with `{"ring": name, "offset": ..., "size": ..., "count": ...}`
+    and must be acknowledged by the client with an `ack` line once read.
+    The reply ends with `{"done": true}`. Errors are answered with
+    `{"error": message}`.
+    """
+
+    def setup(self) -> None:
+        super().setup()
+        self.ring = None
+
+    def finish(self) -> None:
+        super().finish()
+        if self.ring is not None:
+            self.ring.close()
+
+    def _send(self, data: dict) -> None:
+        self.wfile.write(json.dumps(data).encode("utf-8") + b"\n")
+
+    def _read_ack(self) -> None:
+        if self.rfile.readline().strip() != b"ack":
+            raise ConnectionError("Expected the acknowledgement of a segment.")
+        self.ring.release()
+
+    def _parse(self, line: bytes) -> Tuple[BasePasswordGenerator, tuple, int]:
+        try:
+            request = json.loads(line)
+            name = request["generator"]
+            args = request.get("args", [])
+            count = request.get("count", 1)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise ValidationError(f"Invalid request: {line[:200]!r}.")
+        if not isinstance(args, list):
+            raise ValidationError(f"Invalid args: {args!r}. Expected a list.")
+        generator = self.server.generators.get(name)
+        if generator is None:
+            raise ValidationError(f"Unknown generator: {name!r}.")
+        if not isinstance(count, int) or not 0 < count <= self.server.max_count:
+            raise ValidationError(
+                f"Invalid count: {count!r}. It must be between 1 and {self.server.max_count}."
+            )
+        return generator, tuple(args), count
+
+    def _get_segments(
+        self, generator: BasePasswordGenerator, count: int, args: tuple
+    ) -> Iterator[Tuple[bytes, int]]:
+        # Segments of at most a quarter of the ring always fit once the
+        # client released the earlier ones.
+        limit = self.server.ring_size // 4
+        lines = []
+        size = 0
+        for password in generator.generate_stream(count, *args):
+            line = password.encode("utf-8") + b"\n"
+            if size + len(line) > limit and lines:
+                yield b"".join(lines), len(lines)
+                lines = []
+                size = 0
+            lines.append(line)
+            size += len(line)
+        yield b"".join(lines), len(lines)
+
+    def _send_ring(
+        self, generator: BasePasswordGenerator, count: int, args: tuple
+    ) -> None:
+        if self.ring is None:
+            self.ring = ResultRing(self.server.ring_size)
+        try:
+            for data, amount in self._get_segments(generator, count, args):
+                while not self.ring.fits(len(data)):
+                    if not self.ring.pending:
+                        raise ValidationError(
+                            f"A password of {len(data) - 1} bytes does not fit "
+                            f"into the ring of {self.ring.size} bytes."
+                        )
+                    self._read_ack()
+                offset = self.ring.write(data)
+                self._send(
+                    {
+                        "ring": self.ring.name,
+                        "offset": offset,
+                        "size": len(data),
+                        "count": amount,
+                    }
+                )
+                self.wfile.flush()
+            self._send({"done": True})
+        finally:
+            self.wfile.flush()
+            while self.ring.pending:
+                self._read_ack()
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                generator, args, count = self._parse(line)
+                if count > self.server.inline_threshold:
+                    self._send_ring(generator, count, args)
+                else:
+                    self._send({"passwords": generator.generate_batch(count, *args)})
+            except (ValidationError, ValueError, TypeError) as e:
+                # `TypeError` is raised for arguments the generator does
+                # not take.
+                self._send({"error": str(e)})
+            self.wfile.flush()
+
+
+class PassbrewDaemon(socketserver.ThreadingUnixStreamServer):
+    """
+    A daemon keeping warm generators behind a Unix domain socket.
+
+    Short-lived processes ask the daemon instead of importing passbrew and
+    loading a word list themselves; see `passbrew.client.PassbrewClient`.
+    Every connection is served by its own thread, and the generators are
+    shared by all of them.
+
+    The socket is created with the permissions `0600`, so only the
+    daemon's user can connect. A stale socket file is replaced.
+
+    :param path: The path of the socket.
+    :type path: str
+    :param generators: The generators by name. Defaults to one instance of
+                       each generator, named as in `PassbrewRequestHandler`.
+    :type generators: Dict[str, BasePasswordGenerator]
+    :param inline_threshold: The largest count answered on the socket.
+    :type inline_threshold: int
+    :param ring_size: The size in bytes of the result ring of a connection,
+                      at least `MIN_RING_SIZE`.
+    :type ring_size: int
+    :param max_count: The largest count accepted.
+    :type max_count: int
+    :raises ValidationError: If `ring_size` is too small.
+    :raises OSError: If another daemon is listening on `path`.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: str = None,
+        generators: Dict[str, BasePasswordGenerator] = None,
+        inline_threshold: int = 64,
+        ring_size: int = 1 << 20,
+        max_count: int = 1_000_000,
+    ) -> None:
+        if not isinstance(ring_size, int) or ring_size < MIN_RING_SIZE:
+            raise ValidationError(
+                f"Invalid ring size: {ring_size!r}. It must be at least "
+                f"{MIN_RING_SIZE} bytes."
+            )
+        path = path or get_default_socket_path()
+        if os.path.exists(path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+            except OSError:
+                os.unlink(path)
+            else:
+                raise OSError(f"A daemon is already listening on {path}.")
+            finally:
+                probe.close()
+        self.generators = generators or get_default_generators()
+        self.inline_threshold = inline_threshold
+        self.ring_size = ring_size
+        self.max_count = max_count
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, DaemonRequestHandler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m passbrew.daemon",
+        description="Keep warm generators behind a Unix domain socket.",
+    )
+    parser.add_argument("--socket", default=get_default_socket_path())
+    parser.add_argument(
+        "--word-list", default=BasePasswordGenerator.DEFAULT_WORD_LIST_PATH
+    )
+    parser.add_argument("--ring-size", type=int, default=1 << 20)
+    args = parser.parse_args(argv)
+
+    daemon = PassbrewDaemon(
+        args.socket, get_default_generators(args.word_list), ring_size=args.ring_size
+    )
+    # Remove the socket when stopped by a service manager, too.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Serving passbrew on {args.socket}", flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+
+
+if __name__ == "__main__":
+    main()
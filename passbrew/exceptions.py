@@ -8,3 +8,11 @@ class ValidationError(Exception):
 
 class ExceedsMaximumLength(Exception):
     pass
+
+
+class InsecureRandomWarning(UserWarning):
+    pass
+
+
+class SnapshotError(Exception):
+    pass
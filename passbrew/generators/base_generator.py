@@ -1,12 +1,20 @@
+import threading
 from pathlib import Path
+from typing import Iterator, List, Sequence
 
 from passbrew.exceptions import ExceedsMaximumLength, ValidationError
+from passbrew.rng import DEFAULT_RNG
 from passbrew.validation import (
     is_greater_than,
     is_less_than,
     is_positive_integer,
     validate_length,
 )
+from passbrew.wordlist import WordIndex, load_word_list
+
+# Guards the class-level defaults, which the setters check against each
+# other before changing one. Per-instance `GeneratorSettings` need no lock.
+SETTINGS_LOCK = threading.RLock()
 
 
 class BasePasswordGenerator:
@@ -24,6 +32,23 @@ class BasePasswordGenerator:
         The minimum length of the generated password.
     max_length : int
         The maximum length of the generated password.
+    words : Sequence[str]
+        The words of the word list, sorted by length.
+    word_index : BaseWordIndex
+        The words indexed by length, a `WordIndex` in memory or another
+        implementation such as `SQLiteWordIndex`.
+    rng : random.Random
+        The random number generator of the instance. Defaults to a shared
+        `SecureRandom`, pass a `SeededRandom` for reproducible output.
+    settings : GeneratorSettings
+        Per-instance settings overriding the class defaults, or `None`.
+    word_source : WordListSource
+        A changing word list the instance follows, or `None`.
+    issuance_log : IssuanceLog
+        A log recording the fingerprints of every batch, or `None`.
+
+    Generators are slotted and can share a `WordIndex`, so a generator
+    passed an existing `word_index` costs little more than its settings.
 
     Methods
     -------
@@ -34,19 +59,108 @@ class BasePasswordGenerator:
     validate_input(value: int) -> bool
         Validates whether the provided value is a positive integer
         within the allowed password length range.
-    _get() -> str
-        Returns the concatenated password from the preparation list.
+    generate_batch(count: int, *args, **kwargs) -> List[str]
+        Generates `count` passwords, skipping the blocked ones.
+    generate_stream(count: int, *args, **kwargs) -> Iterator[str]
+        Yields `count` passwords, generated in batches.
+    _get(segments: List[str]) -> str
+        Returns the concatenated password from its segments.
     """
 
+    __slots__ = (
+        "word_index",
+        "blocklist",
+        "rng",
+        "settings",
+        "word_source",
+        "issuance_log",
+    )
+
     DEFAULT_WORD_LIST_PATH = Path(__file__).resolve().parents[2] / "words.txt"
 
     _min_length = 12
     _max_length = 64
-    _password_prep = []
 
-    def __init__(self, word_list_path=DEFAULT_WORD_LIST_PATH) -> None:
-        with open(word_list_path, "r", encoding="utf-8") as f:
-            self.words = [x.strip() for x in f]
+    # The maximum amount of rounds `generate_batch` spends replacing
+    # passwords rejected by the blocklist.
+    max_batch_rounds = 10
+
+    def __init__(
+        self,
+        word_list_path=DEFAULT_WORD_LIST_PATH,
+        blocklist=None,
+        rng=None,
+        settings=None,
+        word_index=None,
+        word_source=None,
+    ) -> None:
+        if word_source is not None:
+            word_index = word_source.index
+        elif word_index is None:
+            word_index = WordIndex(*load_word_list(word_list_path))
+        self.word_index = word_index
+        self.word_source = word_source
+        self.blocklist = blocklist
+        self.rng = rng if rng is not None else DEFAULT_RNG
+        self.settings = settings
+        self.issuance_log = None
+        self._check_settings()
+
+    def _check_settings(self) -> None:
+        """
+        Check the settings together with the class defaults they fall back to.
+
+        A `GeneratorSettings` object only knows the fields it overrides, so
+        e.g. `max_length=10` is only found to conflict with the default
+        minimum length of 12 once it is attached to a generator.
+
+        :raises ValidationError: If the minimum length is not less than the
+                                 maximum length.
+        """
+        if self.min_length >= self.max_length:
+            raise ValidationError(
+                f"Minimum length {self.min_length} must be less than maximum "
+                f"length {self.max_length}."
+            )
+
+    @property
+    def words(self) -> Sequence[str]:
+        """
+        Get the words of the word list, sorted by length.
+
+        :return: The words of the word index.
+        :rtype: Sequence[str]
+        """
+        return self.word_index.words
+
+    def _use_current_words(self) -> bool:
+        """
+        Switch to the current version of the word source, if there is one.
+
+        Generators call this once at the start of every generation, so all
+        words of a password come from the same version.
+
+        :return: True if the word index changed.
+        :rtype: bool
+        """
+        if self.word_source is None:
+            return False
+        index = self.word_source.index
+        if index is self.word_index:
+            return False
+        self.word_index = index
+        return True
+
+    def _get_setting(self, name: str):
+        """
+        Get a setting of the instance, falling back to the class default.
+
+        :param name: The name of the setting, e.g. `min_length`.
+        :type name: str
+        :return: The value from `settings`, or the class attribute `_<name>`.
+        """
+        value = getattr(self.settings, name, None)
+        return getattr(self, "_" + name) if value is None else value
 
     @property
     def min_length(self):
@@ -59,7 +173,7 @@ class BasePasswordGenerator:
         :return: The minimum length.
         :rtype: int
         """
-        return self._min_length
+        return self._get_setting("min_length")
 
     @classmethod
     def set_min_length(kls, value: int) -> None:
@@ -77,8 +191,9 @@ class BasePasswordGenerator:
                                  integer or exceeds the maximum length defined by the class.
         """
         try:
-            if is_positive_integer(value) and is_less_than(value, kls._max_length):
-                kls._min_length = value
+            with SETTINGS_LOCK:
+                if is_positive_integer(value) and is_less_than(value, kls._max_length):
+                    kls._min_length = value
         except ValidationError as e:
             raise ValidationError(e)
         except ExceedsMaximumLength as e:
@@ -95,7 +210,7 @@ class BasePasswordGenerator:
         :return: The maximum length.
         :rtype: int
         """
-        return self._max_length
+        return self._get_setting("max_length")
 
     @classmethod
     def set_max_length(kls, value: int) -> None:
@@ -113,8 +228,11 @@ class BasePasswordGenerator:
                                  integer or is less than minimum length defined by the class.
         """
         try:
-            if is_positive_integer(value) and is_greater_than(value, kls._min_length):
-                kls._max_length = value
+            with SETTINGS_LOCK:
+                if is_positive_integer(value) and is_greater_than(
+                    value, kls._min_length
+                ):
+                    kls._max_length = value
         except ValidationError as e:
             raise ValidationError(e)
         except ValueError as e:
@@ -158,5 +276,79 @@ class BasePasswordGenerator:
         except Exception as e:
             raise ValidationError(e)
 
-    def _get(self) -> str:
-        return "".join(self._password_prep)
+    def _get(self, segments: List[str]) -> str:
+        return "".join(segments)
+
+    def generate_batch(self, count: int, *args, **kwargs) -> List[str]:
+        """
+        Generate many passwords at once.
+
+        The positional and keyword arguments are passed on to `generate`.
+        If the generator has a `blocklist`, every round of passwords is
+        checked against it in one batch lookup and the blocked passwords
+        are replaced in the next round. If the generator has an
+        `issuance_log`, the fingerprints of the batch are recorded in it.
+
+        :param count: The amount of passwords to generate.
+        :type count: int
+        :return: A list of `count` passwords.
+        :rtype: List[str]
+        :raises ValidationError: If `count` is not a positive integer, or the
+                                 blocked passwords could not be replaced
+                                 within `max_batch_rounds`.
+        """
+        is_positive_integer(count)
+        passwords = []
+        for _ in range(self.max_batch_rounds):
+            missing = count - len(passwords)
+            candidates = self._generate_candidates(missing, args, kwargs)
+            if self.blocklist is not None:
+                candidates = self.blocklist.filter(candidates)
+            passwords.extend(candidates)
+            if len(passwords) == count:
+                if self.issuance_log is not None:
+                    self.issuance_log.record(passwords)
+                return passwords
+        raise ValidationError(
+            f"Could not generate {count} passwords outside of the blocklist "
+            f"in {self.max_batch_rounds} rounds."
+        )
+
+    def _generate_candidates(self, count: int, args: tuple, kwargs: dict) -> List[str]:
+        """
+        Generate one round of `generate_batch`.
+
+        Subclasses that can generate many passwords faster than one at a
+        time override this.
+        """
+        return [self.generate(*args, **kwargs) for _ in range(count)]
+
+    def generate_stream(
+        self, count: int, *args, chunk_size: int = 1000, **kwargs
+    ) -> Iterator[str]:
+        """
+        Generate many passwords lazily.
+
+        The passwords are generated with `generate_batch` in chunks of
+        `chunk_size`, so large amounts can be consumed without holding
+        them all in memory. An `issuance_log` records every chunk as a
+        batch.
+
+        :param count: The amount of passwords to generate.
+        :type count: int
+        :param chunk_size: The amount of passwords generated at once.
+        :type chunk_size: int
+        :return: An iterator over `count` passwords.
+        :rtype: Iterator[str]
+        :raises ValidationError: If `count` or `chunk_size` is not a
+                                 positive integer.
+        """
+        is_positive_integer(count)
+        is_positive_integer(chunk_size)
+        return self._generate_chunks(count, chunk_size, args, kwargs)
+
+    def _generate_chunks(self, count, chunk_size, args, kwargs) -> Iterator[str]:
+        while count > 0:
+            chunk = self.generate_batch(min(count, chunk_size), *args, **kwargs)
+            count -= len(chunk)
+            yield from chunk
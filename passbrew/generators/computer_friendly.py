@@ -1,14 +1,59 @@
-import secrets
+from typing import List
 
 from passbrew.generators.base_generator import BasePasswordGenerator
+from passbrew.tokens import URLSAFE, TokenEngine
 from passbrew.validation import validate_length
 
 
 class ComputerFriendlyPasswordGenerator(BasePasswordGenerator):
     """
-    Refactor this later.
+    A class for generating random tokens of an exact length.
+
+    The characters are drawn from an alphabet by a `TokenEngine`, which
+    reads random bytes in bulk.
+
+    Attributes
+    ----------
+    engine : TokenEngine
+        The token engine of the instance.
     """
 
+    __slots__ = ("engine",)
+
+    def __init__(
+        self,
+        word_list_path=BasePasswordGenerator.DEFAULT_WORD_LIST_PATH,
+        blocklist=None,
+        rng=None,
+        settings=None,
+        word_index=None,
+        word_source=None,
+        alphabet: str = URLSAFE,
+    ) -> None:
+        super().__init__(
+            word_list_path, blocklist, rng, settings, word_index, word_source
+        )
+        self.engine = TokenEngine(alphabet, self.rng)
+
     def get(self, length: int) -> str:
+        """
+        Generate a token.
+
+        :param length: The length of the token.
+        :type length: int
+        :return: A random token of exactly `length` characters.
+        :rtype: str
+        :raises ValueError: If `length` is outside of the length range.
+        """
+        if validate_length(length, self.min_length, self.max_length):
+            return self.engine.token(length)
+
+    def generate(self, length: int) -> str:
+        return self.get(length)
+
+    def _generate_candidates(self, count: int, args: tuple, kwargs: dict) -> List[str]:
+        return self._get_many(count, *args, **kwargs)
+
+    def _get_many(self, count: int, length: int) -> List[str]:
         if validate_length(length, self.min_length, self.max_length):
-            return secrets.token_urlsafe(length)
+            return self.engine.tokens(count, length)
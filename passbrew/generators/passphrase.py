@@ -1,8 +1,277 @@
-import random
+import functools
+import itertools
+import math
+import string
+from collections import Counter
+from typing import List
 
+from passbrew.buffers import get_byte_view, write_segments
 from passbrew.exceptions import ValidationError
+from passbrew.generators.base_generator import SETTINGS_LOCK, BasePasswordGenerator
 from passbrew.generators.user_friendly import BaseUserFriendlyPasswordGenerator
-from passbrew.validation import is_greater_than, is_less_than, is_positive_integer
+from passbrew.keyspace import PassphraseKeyspace
+from passbrew.rng import bulk_choices, bulk_randbelow
+from passbrew.validation import (
+    is_greater_than,
+    is_integer,
+    is_less_than,
+    is_positive_integer,
+)
+from passbrew.wordlist import WeightedWordIndex
+
+_ASCII_LOWER = string.ascii_lowercase.encode("ascii")
+_ASCII_UPPER = string.ascii_uppercase.encode("ascii")
+# Translation tables of single bytes, applied to buffers in place.
+_TO_UPPER = bytes.maketrans(_ASCII_LOWER, _ASCII_UPPER)
+_TO_LOWER = bytes.maketrans(_ASCII_UPPER, _ASCII_LOWER)
+_DIGITS = tuple(str(n).encode("ascii") for n in range(10))
+
+
+class PassphraseStyle:
+    """
+    The separators and decorations of passphrases.
+
+    The style is applied while a passphrase is assembled from its words,
+    and to a whole batch at once when passphrases are generated with
+    `generate_batch`, drawing the random choices of all of them together.
+
+    Attributes
+    ----------
+    separators : str
+        The characters put between words. Every gap gets one character
+        chosen at random, so `"-"` always uses hyphens and
+        `string.digits` uses random digits. An empty string joins the
+        words without separators.
+    capitalization : str
+        One of `"none"` (keep the words as they are), `"lower"`,
+        `"upper"`, `"title"` (capitalize every word) or `"random"`
+        (capitalize every word with a probability of one half).
+    digit_amount : int
+        The amount of random digits appended to one randomly chosen word.
+    """
+
+    __slots__ = ("separators", "capitalization", "digit_amount")
+
+    CAPITALIZATIONS = ("none", "lower", "upper", "title", "random")
+
+    _CASE_METHODS = {"lower": str.lower, "upper": str.upper, "title": str.capitalize}
+
+    def __init__(
+        self,
+        separators: str = " ",
+        capitalization: str = "none",
+        digit_amount: int = 0,
+    ) -> None:
+        if not isinstance(separators, str):
+            raise ValidationError(
+                f"Invalid separators: {separators!r}. Expected a string of characters."
+            )
+        if capitalization not in self.CAPITALIZATIONS:
+            raise ValidationError(
+                f"Invalid capitalization: {capitalization!r}. "
+                f"Expected one of {', '.join(self.CAPITALIZATIONS)}."
+            )
+        try:
+            is_integer(digit_amount)
+        except Exception as e:
+            raise ValidationError(e)
+        if digit_amount < 0:
+            raise ValidationError(
+                f"Invalid value for `digit_amount`: {digit_amount}. It must not be negative."
+            )
+
+        self.separators = separators
+        self.capitalization = capitalization
+        self.digit_amount = digit_amount
+
+    @property
+    def separator_length(self) -> int:
+        """
+        Get the length of one separator.
+
+        :return: 1, or 0 if the words are not separated.
+        :rtype: int
+        """
+        return 1 if self.separators else 0
+
+    def get_length(self, word_lengths: int, word_count: int) -> int:
+        """
+        Get the length of a passphrase in this style.
+
+        :param word_lengths: The total length of the words.
+        :type word_lengths: int
+        :param word_count: The amount of words.
+        :type word_count: int
+        :return: The length of the assembled passphrase.
+        :rtype: int
+        """
+        return (
+            word_lengths + (word_count - 1) * self.separator_length + self.digit_amount
+        )
+
+    def get_entropy(self, word_count: int, capitalizable: float = 1.0) -> float:
+        """
+        Get the entropy the decorations add to a passphrase.
+
+        Random separators, random capitalization and the digits with the
+        word they are appended to are counted. Random capitalization adds a
+        bit only to the words it changes, so its bit per word is weighted
+        by `capitalizable`; the default of 1 is an upper bound.
+
+        :param word_count: The amount of words.
+        :type word_count: int
+        :param capitalizable: The probability that capitalizing a drawn
+                              word changes it.
+        :type capitalizable: float
+        :return: The entropy in bits.
+        :rtype: float
+        """
+        bits = 0.0
+        if len(self.separators) > 1:
+            size = len(self.separators)
+            per_gap = -sum(
+                n / size * math.log2(n / size)
+                for n in Counter(self.separators).values()
+            )
+            bits += (word_count - 1) * per_gap
+        if self.capitalization == "random":
+            bits += word_count * capitalizable
+        if self.digit_amount:
+            bits += self.digit_amount * math.log2(10) + math.log2(word_count)
+        return bits
+
+    def apply(self, rows: List[List[str]], rng) -> List[str]:
+        """
+        Assemble rows of words into passphrases.
+
+        The rows are modified in place.
+
+        :param rows: The words of every passphrase.
+        :type rows: List[List[str]]
+        :param rng: The random number generator of the decorations.
+        :type rng: random.Random
+        :return: One passphrase per row.
+        :rtype: List[str]
+        """
+        if self.capitalization == "random":
+            self._capitalize_at_random(rows, rng)
+        elif self.capitalization != "none":
+            method = self._CASE_METHODS[self.capitalization]
+            rows = [list(map(method, row)) for row in rows]
+        if self.digit_amount:
+            self._add_digits(rows, rng)
+        return self._join(rows, rng)
+
+    @staticmethod
+    def _capitalize_at_random(rows: List[List[str]], rng) -> None:
+        total = sum(map(len, rows))
+        flags = f"{rng.getrandbits(total):0{total}b}" if total else ""
+        position = 0
+        for row in rows:
+            for i, flag in enumerate(flags[position : position + len(row)]):
+                if flag == "1":
+                    row[i] = row[i].capitalize()
+            position += len(row)
+
+    def _add_digits(self, rows: List[List[str]], rng) -> None:
+        # One draw covers the digits of every row of the batch.
+        width = self.digit_amount
+        digits = "".join(bulk_choices(rng, string.digits, width * len(rows)))
+        indexes = bulk_randbelow(rng, [len(row) for row in rows])
+        for n, (row, i) in enumerate(zip(rows, indexes)):
+            row[i] += digits[n * width : (n + 1) * width]
+
+    def _join(self, rows: List[List[str]], rng) -> List[str]:
+        if len(self.separators) <= 1:
+            join = self.separators.join
+            return [join(row) for row in rows]
+
+        separators = bulk_choices(rng, self.separators, sum(map(len, rows)) - len(rows))
+        passphrases = []
+        position = 0
+        for row in rows:
+            gaps = len(row) - 1
+            parts = [""] * (2 * gaps + 1)
+            parts[::2] = row
+            parts[1::2] = separators[position : position + gaps]
+            position += gaps
+            passphrases.append("".join(parts))
+        return passphrases
+
+    def write_into(self, buffer, words: List[bytes], rng) -> int:
+        """
+        Assemble encoded words into a passphrase in a buffer.
+
+        The segments are written into `buffer` as they are, and the case
+        of the words is changed in place, so no `str` or `bytes` holding
+        the passphrase is created. The random numbers are the same as
+        those of `apply` for a single row. Case changes only apply to ASCII
+        letters.
+
+        :param buffer: A writable buffer.
+        :param words: The encoded words of the passphrase.
+        :type words: List[bytes]
+        :param rng: The random number generator of the decorations.
+        :type rng: random.Random
+        :return: The amount of bytes written to the start of `buffer`.
+        :rtype: int
+        :raises ValidationError: If the buffer is too small.
+        """
+        count = len(words)
+        if self.capitalization == "random":
+            flags = rng.getrandbits(count) if count else 0
+            cases = [
+                "title" if flags >> (count - 1 - i) & 1 else "none"
+                for i in range(count)
+            ]
+        else:
+            cases = [self.capitalization] * count
+        digits = []
+        digits_after = -1
+        if self.digit_amount:
+            digits = bulk_choices(rng, _DIGITS, self.digit_amount)
+            digits_after = bulk_randbelow(rng, [count])[0]
+        if len(self.separators) > 1:
+            separators = [
+                char.encode("utf-8")
+                for char in bulk_choices(rng, self.separators, count - 1)
+            ]
+        else:
+            separators = [self.separators.encode("utf-8")] * (count - 1)
+
+        segments = []
+        spans = []
+        position = 0
+        for i, wrd in enumerate(words):
+            if i:
+                segments.append(separators[i - 1])
+                position += len(separators[i - 1])
+            segments.append(wrd)
+            spans.append((position, position + len(wrd)))
+            position += len(wrd)
+            if i == digits_after:
+                segments.extend(digits)
+                position += len(digits)
+        size = write_segments(buffer, segments)
+
+        view = get_byte_view(buffer)
+        for (start, end), case in zip(spans, cases):
+            if case == "none" or start == end:
+                continue
+            if case == "title":
+                view[start] = _TO_UPPER[view[start]]
+                start += 1
+            table = _TO_UPPER if case == "upper" else _TO_LOWER
+            for i in range(start, end):
+                view[i] = table[view[i]]
+        return size
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(separators={self.separators!r}, "
+            f"capitalization={self.capitalization!r}, "
+            f"digit_amount={self.digit_amount})"
+        )
 
 
 class PassphraseGenerator(BaseUserFriendlyPasswordGenerator):
@@ -14,26 +283,59 @@ class PassphraseGenerator(BaseUserFriendlyPasswordGenerator):
     random words. The generated passphrase maintains a specified length while
     ensuring that it does not end with an empty space.
 
+    Attributes
+    ----------
+    style : PassphraseStyle
+        The separators and decorations of the passphrases.
+
     Methods
     -------
     generate(pw_length: int) -> str
         Generates and returns a user-friendly passphrase of the specified length.
     """
 
+    __slots__ = ("style",)
+
     # Using 4 to 8 words for a passphrase offers strong security while
     # remaining memorable, balancing complexity and usability.
     _min_word_count = 4
     _max_word_count = 12
 
+    def __init__(
+        self,
+        word_list_path=BasePasswordGenerator.DEFAULT_WORD_LIST_PATH,
+        blocklist=None,
+        rng=None,
+        settings=None,
+        word_index=None,
+        word_source=None,
+        style: PassphraseStyle = None,
+    ) -> None:
+        super().__init__(
+            word_list_path, blocklist, rng, settings, word_index, word_source
+        )
+        self.style = style or PassphraseStyle()
+
+    def _check_settings(self) -> None:
+        super()._check_settings()
+        if self.min_word_count >= self.max_word_count:
+            raise ValidationError(
+                f"Minimum word count {self.min_word_count} must be less than "
+                f"maximum word count {self.max_word_count}."
+            )
+
     @property
     def min_word_count(self) -> int:
-        return self._min_word_count
+        return self._get_setting("min_word_count")
 
     @classmethod
     def set_min_word_count(cls, value: int) -> None:
         try:
-            if is_positive_integer(value) and is_less_than(value, cls._max_word_count):
-                cls._min_word_count = value
+            with SETTINGS_LOCK:
+                if is_positive_integer(value) and is_less_than(
+                    value, cls._max_word_count
+                ):
+                    cls._min_word_count = value
         except ValidationError as e:
             raise ValidationError(e)
         except ValueError as e:
@@ -41,80 +343,181 @@ class PassphraseGenerator(BaseUserFriendlyPasswordGenerator):
 
     @property
     def max_word_count(self) -> int:
-        return self._max_word_count
+        return self._get_setting("max_word_count")
 
     @classmethod
     def set_max_word_count(cls, value: int) -> None:
         try:
-            if is_positive_integer(value) and is_greater_than(
-                value, cls._min_word_count
-            ):
-                cls._max_word_count = value
+            with SETTINGS_LOCK:
+                if is_positive_integer(value) and is_greater_than(
+                    value, cls._min_word_count
+                ):
+                    cls._max_word_count = value
         except ValidationError as e:
             raise ValidationError(e)
         except ValueError as e:
             raise ValidationError(e)
 
-    def _populate_password_prep(self, password_length: int) -> None:
+    def _get_words_of_length(self, length: int, encoded: bool = False) -> list:
         """
-        Populate the _password_prep list with randomly selected words.
+        Select random words that fill a passphrase of an exact length.
+
+        Every word but the last is followed by a separator of the style, so
+        a word is only taken if the rest of the length, minus the separator,
+        can still be filled by at least one more word.
 
-        This method selects random words based on the specified cumulative password
-        length. Each chosen word has an additional space appended to it. To ensure
-        that the final password does not end with an empty space, the collective
-        password length is incremented by one.
+        :param length: The total length of the words and separators.
+        :type length: int
+        :param encoded: Whether to select the UTF-8 encoded words.
+        :type encoded: bool
+        :return: The selected words.
+        :rtype: List[str] or List[bytes]
+        """
+        separator_length = self.style.separator_length
+        if encoded:
+            pick = functools.partial(self.word_index.pick_encoded, self.rng)
+        else:
+            pick = self._pick_a_random_word
+        words = []
+        while length > 0:
+            wrd = pick(length)
+            rest = length - len(wrd)
+            if rest == 0:
+                words.append(wrd)
+                break
+            if rest <= separator_length:
+                continue
+            words.append(wrd)
+            length = rest - separator_length
+        return words
 
-        The last empty space will be removed in the final password preparation step,
-        resulting in a passphrase of the desired length.
+    def _generate_many(
+        self, count: int, password_length: int, use_word_count: bool = True
+    ) -> List[str]:
+        """
+        Generate passphrases, applying the style to all of them at once.
 
-        :param collective_pw_length: The desired length of the passphrase, which
-                                    must be validated against the minimum and
-                                    maximum length constraints.
-        :type collective_pw_length: int
+        :param count: The amount of passphrases.
+        :type count: int
+        :return: A list of `count` passphrases.
+        :rtype: List[str]
+        """
+        rows = self._get_rows(count, password_length, use_word_count)
+        return self.style.apply(rows, self.rng)
 
-        :return: None
+    def _get_rows(
+        self,
+        count: int,
+        password_length: int,
+        use_word_count: bool = True,
+        encoded: bool = False,
+    ) -> List[list]:
         """
+        Select the words of passphrases.
 
-        while password_length > 0:
-            wrd = self._pick_a_random_word(password_length)
-            if len(wrd) == password_length - 1:
-                continue
-            elif password_length == len(wrd):
-                self._password_prep.append(wrd)
-                break
-            else:
-                wrd += " "
-                self._password_prep.append(wrd)
-                password_length -= len(wrd)
+        :param count: The amount of passphrases.
+        :type count: int
+        :param encoded: Whether to select the UTF-8 encoded words.
+        :type encoded: bool
+        :return: The words of every passphrase.
+        :rtype: List[List[str]] or List[List[bytes]]
+        """
+        if use_word_count:
+            self.validate_input(
+                password_length, self.min_word_count, self.max_word_count
+            )
+            self._use_current_words()
+            if encoded:
+                return self.word_index.sample_encoded(self.rng, password_length, count)
+            return self.word_index.sample(self.rng, password_length, count)
+
+        self.validate_input(password_length)
+        words_length = password_length - self.style.digit_amount
+        if words_length <= 0:
+            raise ValidationError(
+                f"Invalid length: {password_length}. It must be greater than "
+                f"the {self.style.digit_amount} digits of the style."
+            )
+        self._use_current_words()
+        return [self._get_words_of_length(words_length, encoded) for _ in range(count)]
+
+    def _generate_candidates(self, count: int, args: tuple, kwargs: dict) -> List[str]:
+        return self._generate_many(count, *args, **kwargs)
 
-    def _get_last_item_index(self) -> int:
+    def get_entropy(self, word_count: int) -> float:
         """
-        Retrieve the index of the last word in the password preparation list.
+        Get the entropy of a passphrase of `word_count` words.
 
-        :return: The index of the last word in the `_password_prep` list.
-        :rtype: int
+        The words count with the entropy of the word index, which accounts
+        for the weights of a `WeightedWordIndex`, and the decorations of
+        the style are added. Random capitalization counts only for the
+        share of the words it changes.
+
+        :param word_count: The amount of words.
+        :type word_count: int
+        :return: The entropy in bits.
+        :rtype: float
+        :raises ValidationError: If `word_count` is not a positive integer.
         """
-        return len(self._password_prep) - 1
+        is_positive_integer(word_count)
+        self._use_current_words()
+        capitalizable = 1.0
+        if self.style.capitalization == "random":
+            capitalizable = self._get_capitalizable_share()
+        return self.word_index.entropy(word_count) + self.style.get_entropy(
+            word_count, capitalizable
+        )
 
-    def _final_password_prep(self) -> None:
+    def _get_capitalizable_share(self) -> float:
         """
-        Finalize the password preparation by removing trailing whitespace.
+        Get the probability that capitalizing a drawn word changes it.
 
-        :return: None
+        :return: The share of the words, by weight for a `WeightedWordIndex`,
+                 that differ from their capitalized form.
+        :rtype: float
         """
-        self._password_prep[self._get_last_item_index()] = self._password_prep[
-            self._get_last_item_index()
-        ]
+        index = self.word_index
+        if isinstance(index, WeightedWordIndex):
+            weights = index.weights
+        else:
+            weights = itertools.repeat(1)
+        total = changed = 0
+        for wrd, weight in zip(index.words, weights):
+            total += weight
+            if wrd.capitalize() != wrd:
+                changed += weight
+        return changed / total
 
-    def _get_words(self, count):
+    def get_keyspace(self, word_count: int, key: bytes = None) -> PassphraseKeyspace:
         """
-        Select a random sample of words and add them to the password preparation list.
+        Get the numbered passphrases of `word_count` words.
 
-        :param count: The number of words to sample.
-        :type count: int
-        :raises ValueError: If `count` is greater than the number of available
-                            words in the `words` attribute."""
-        self._password_prep.extend(random.sample(self.words, k=count))
+        Only styles without random decorations can be numbered: at most one
+        separator, the capitalization `"none"` and no digits.
+
+        :param word_count: The amount of words.
+        :type word_count: int
+        :param key: The secret key permuting the issued passphrases, see
+                    `PassphraseKeyspace`.
+        :type key: bytes
+        :return: The keyspace over the current word list.
+        :rtype: PassphraseKeyspace
+        :raises ValidationError: If `word_count` is outside of the word count
+                                 range or the style has random decorations.
+        """
+        style = self.style
+        if (
+            len(style.separators) > 1
+            or style.capitalization != "none"
+            or style.digit_amount
+        ):
+            raise ValidationError(
+                f"Passphrases of {style!r} cannot be numbered. Use at most one "
+                "separator, no capitalization and no digits."
+            )
+        self.validate_input(word_count, self.min_word_count, self.max_word_count)
+        self._use_current_words()
+        return PassphraseKeyspace(self.word_index, word_count, style.separators, key)
 
     def generate(self, password_length: int, use_word_count: bool = True) -> str:
         """
@@ -123,7 +526,7 @@ class PassphraseGenerator(BaseUserFriendlyPasswordGenerator):
         If `use_word_count` is set to True, the passphrase will be generated
         based on the number of words specified by `password_length`. If set to
         False, the method generates a passphrase based on the specified
-        character length.
+        character length, including the separators and digits of the style.
 
         :param password_length: The desired length of the passphrase, which determines
                         how many words or characters will be included in the generated
@@ -138,16 +541,35 @@ class PassphraseGenerator(BaseUserFriendlyPasswordGenerator):
         :return: The generated randomized passphrase.
         :rtype: str
         """
-        if use_word_count:
-            self.validate_input(
-                password_length, self._min_word_count, self._max_word_count
-            )
-            self._password_prep.clear()
-            self._get_words(password_length)
-            return " ".join(self._password_prep)
-        else:
-            self.validate_input(password_length)
-            self._password_prep.clear()
-            self._populate_password_prep(password_length)
-            self._final_password_prep()
-            return self._get()
+        return self._generate_many(1, password_length, use_word_count)[0]
+
+    def generate_into(
+        self, buffer, password_length: int, use_word_count: bool = True
+    ) -> int:
+        """
+        Build a passphrase into a buffer.
+
+        The passphrase is assembled from the pre-encoded words of the word
+        index and written into `buffer` as UTF-8, so no `str` holding the
+        passphrase, or a part of it, is created. Once the passphrase is
+        used, the buffer can be wiped with `passbrew.buffers.zeroize`, or be
+        borrowed from a `BufferPool`, which does that.
+
+        The arguments and the random numbers are those of `generate`, so
+        with the same seed both return the same passphrase. Lengths are
+        counted in bytes, which equals characters for ASCII word lists such
+        as the default one.
+
+        :param buffer: A writable buffer, e.g. a `bytearray`.
+        :param password_length: The amount of words, or of bytes if
+                                `use_word_count` is False.
+        :type password_length: int
+        :param use_word_count: Whether `password_length` counts words.
+        :type use_word_count: bool
+        :return: The amount of bytes written to the start of `buffer`.
+        :rtype: int
+        :raises ValidationError: If the length is not valid or `buffer` is
+                                 too small.
+        """
+        words = self._get_rows(1, password_length, use_word_count, encoded=True)[0]
+        return self.style.write_into(buffer, words, self.rng)
@@ -0,0 +1,115 @@
+import threading
+from typing import List
+
+from passbrew.generators.base_generator import BasePasswordGenerator
+from passbrew.pattern import PatternPlan, parse_pattern
+from passbrew.validation import is_positive_integer
+
+
+class PatternPasswordGenerator(BasePasswordGenerator):
+    """
+    A class for generating passwords following a pattern.
+
+    Patterns describe formats the other generators cannot express, e.g.
+    `Word-Word-dd-S` for two capitalized words, two digits and a symbol,
+    or `ccvcvc99` for six letters alternating consonants and vowels and
+    two digits; see `passbrew.pattern.parse_pattern` for the syntax.
+
+    Every pattern is compiled once into a `PatternPlan` and the plans of
+    the last `max_plans` patterns are kept, so systems asking for a few
+    formats pay for compiling each of them once. The length of the
+    passwords follows from the pattern; `min_length` and `max_length` do
+    not apply.
+
+    Attributes
+    ----------
+    pattern : str
+        The pattern used when `generate` is not given one.
+    max_plans : int
+        The largest amount of compiled patterns kept.
+    """
+
+    __slots__ = ("pattern", "max_plans", "_plans", "_plans_lock")
+
+    def __init__(
+        self,
+        word_list_path=BasePasswordGenerator.DEFAULT_WORD_LIST_PATH,
+        blocklist=None,
+        rng=None,
+        settings=None,
+        word_index=None,
+        word_source=None,
+        pattern: str = "Word-Word-dd-S",
+        max_plans: int = 128,
+    ) -> None:
+        super().__init__(
+            word_list_path, blocklist, rng, settings, word_index, word_source
+        )
+        parse_pattern(pattern)
+        is_positive_integer(max_plans)
+        self.pattern = pattern
+        self.max_plans = max_plans
+        self._plans = {}
+        self._plans_lock = threading.Lock()
+
+    def _use_current_words(self) -> bool:
+        if super()._use_current_words():
+            # Word tokens hold positions in the old index.
+            self._plans = {}
+            return True
+        return False
+
+    def get_plan(self, pattern: str = None) -> PatternPlan:
+        """
+        Get the compiled plan of a pattern, compiling it on first use.
+
+        :param pattern: The pattern. Defaults to `pattern`.
+        :type pattern: str
+        :return: The plan of the pattern for the current word list.
+        :rtype: PatternPlan
+        :raises ValidationError: If the pattern is invalid or no word
+                                 matches a word token.
+        """
+        self._use_current_words()
+        pattern = self.pattern if pattern is None else pattern
+        plans = self._plans
+        plan = plans.get(pattern)
+        if plan is None:
+            plan = PatternPlan(pattern, self.word_index, self.rng)
+            with self._plans_lock:
+                if len(plans) >= self.max_plans:
+                    # Drop the oldest plan.
+                    plans.pop(next(iter(plans)), None)
+                plans[pattern] = plan
+        return plan
+
+    def get_entropy(self, pattern: str = None) -> float:
+        """
+        Get the entropy of the passwords of a pattern.
+
+        :param pattern: The pattern. Defaults to `pattern`.
+        :type pattern: str
+        :return: The entropy in bits.
+        :rtype: float
+        :raises ValidationError: If the pattern is invalid.
+        """
+        return self.get_plan(pattern).entropy
+
+    def generate(self, pattern: str = None) -> str:
+        """
+        Generate a password following a pattern.
+
+        :param pattern: The pattern. Defaults to `pattern`.
+        :type pattern: str
+        :return: A password following the pattern.
+        :rtype: str
+        :raises ValidationError: If the pattern is invalid or no word
+                                 matches a word token.
+        """
+        return self.get_plan(pattern).generate(1)[0]
+
+    def _generate_candidates(self, count: int, args: tuple, kwargs: dict) -> List[str]:
+        return self._generate_many(count, *args, **kwargs)
+
+    def _generate_many(self, count: int, pattern: str = None) -> List[str]:
+        return self.get_plan(pattern).generate(count)
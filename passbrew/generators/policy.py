@@ -0,0 +1,490 @@
+import threading
+from typing import Dict, Iterable, List
+
+from passbrew.buffers import write_segments
+from passbrew.exceptions import ValidationError
+from passbrew.validation import is_integer, is_positive_integer
+
+from .base_generator import BasePasswordGenerator
+from .user_friendly import UserFriendlyPasswordGenerator
+
+WORD = "word"
+SPECIAL = "special"
+DIGIT = "digit"
+
+
+class PasswordPolicy:
+    """
+    A set of corporate password rules.
+
+    Attributes
+    ----------
+    min_uppercase : int
+        The minimum amount of uppercase letters in a password.
+    no_repeated_class : bool
+        If True, two neighbouring segments (words, special characters,
+        digits) never belong to the same character class.
+    banned_substrings : tuple
+        Substrings that must not appear in a password (case insensitive).
+    max_word_length : int
+        The maximum length of a dictionary word found in a password.
+        `None` means no limit.
+    """
+
+    __slots__ = (
+        "min_uppercase",
+        "no_repeated_class",
+        "banned_substrings",
+        "max_word_length",
+    )
+
+    def __init__(
+        self,
+        min_uppercase: int = 0,
+        no_repeated_class: bool = False,
+        banned_substrings: Iterable[str] = (),
+        max_word_length: int = None,
+    ) -> None:
+        try:
+            is_integer(min_uppercase)
+        except Exception as e:
+            raise ValidationError(e)
+        if min_uppercase < 0:
+            raise ValidationError(
+                f"Invalid value for `min_uppercase`: {min_uppercase}. It must not be negative."
+            )
+        if max_word_length is not None:
+            is_positive_integer(max_word_length)
+
+        self.min_uppercase = min_uppercase
+        self.no_repeated_class = bool(no_repeated_class)
+        self.banned_substrings = tuple(
+            sub.lower() for sub in banned_substrings if sub
+        )
+        self.max_word_length = max_word_length
+
+    def allows_word(self, wrd: str) -> bool:
+        """
+        Check whether a word can be used as a password segment.
+
+        :param wrd: The word to be checked.
+        :type wrd: str
+        :return: True if the word satisfies the policy on its own.
+        :rtype: bool
+        """
+        if self.max_word_length is not None and len(wrd) > self.max_word_length:
+            return False
+        return not any(sub in wrd for sub in self.banned_substrings)
+
+
+class PolicyPasswordGenerator(UserFriendlyPasswordGenerator):
+    """
+    A user-friendly password generator that satisfies a `PasswordPolicy`
+    by construction.
+
+    Passwords are built from the same segments as in
+    `UserFriendlyPasswordGenerator` (words, special characters, numbers and
+    empty spaces), but every rule that can be expressed on the segments is
+    applied while the password is assembled:
+
+    - words longer than `max_word_length` or containing a banned substring
+      are never picked,
+    - the word lengths are sampled from precomputed composition tables, so
+      the words always fill the effective password length exactly,
+    - the amount of words and the order of segments are chosen so that no
+      two neighbouring segments share a character class,
+    - exactly `min_uppercase` letters are capitalized,
+    - empty spaces are put into distinct gaps between segments.
+
+    Banned substrings spanning several segments, and dictionary words formed
+    by neighbouring words, cannot be ruled out up front. Those are checked
+    after assembling and the password is rebuilt if needed. The rejections
+    are counted per constraint, see `rejections` and `retry_rate`.
+
+    Methods:
+        generate(length: int) -> str:
+            Generates a random password of a specified length.
+
+        generate_into(buffer, length: int) -> int:
+            Builds a random password of a specified length into a buffer.
+    """
+
+    __slots__ = (
+        "policy",
+        "attempts",
+        "rejections",
+        "_buckets",
+        "_long_words",
+        "_longest_word",
+        "_composition_tables",
+        "_stats_lock",
+    )
+
+    max_attempts = 100
+
+    def __init__(
+        self,
+        policy: PasswordPolicy = None,
+        word_list_path=BasePasswordGenerator.DEFAULT_WORD_LIST_PATH,
+        blocklist=None,
+        rng=None,
+        settings=None,
+        word_index=None,
+        word_source=None,
+    ) -> None:
+        super().__init__(
+            word_list_path, blocklist, rng, settings, word_index, word_source
+        )
+        self.policy = policy or PasswordPolicy()
+        self._buckets = self._get_word_buckets()
+        self._long_words = self._get_long_words()
+        self._longest_word = max(map(len, self._long_words), default=0)
+        self._composition_tables = {}
+        self.attempts = 0
+        self.rejections = {}
+        self._stats_lock = threading.Lock()
+
+    def _use_current_words(self) -> bool:
+        """
+        Switch to the current version of the word source, rebuilding the
+        word buckets and composition tables if it changed.
+
+        :return: True if the word index changed.
+        :rtype: bool
+        """
+        if not super()._use_current_words():
+            return False
+        self._buckets = self._get_word_buckets()
+        self._long_words = self._get_long_words()
+        self._longest_word = max(map(len, self._long_words), default=0)
+        self._composition_tables = {}
+        return True
+
+    @property
+    def retry_rate(self) -> float:
+        """
+        Get the share of assembled passwords that had to be rebuilt.
+
+        :return: Rejected passwords divided by assembled passwords.
+        :rtype: float
+        """
+        with self._stats_lock:
+            if not self.attempts:
+                return 0.0
+            return sum(self.rejections.values()) / self.attempts
+
+    def _get_word_buckets(self) -> Dict[int, List[str]]:
+        """
+        Group the words allowed by the policy by their length.
+
+        Only alphabetic words are used, so that a word segment consists of
+        lowercase letters only.
+
+        :return: A mapping of word length to a list of words.
+        :rtype: Dict[int, List[str]]
+        """
+        buckets = {}
+        for wrd in dict.fromkeys(x.lower() for x in self.words if x.isalpha()):
+            if self.policy.allows_word(wrd):
+                buckets.setdefault(len(wrd), []).append(wrd)
+        if not buckets:
+            raise ValidationError("The policy does not allow any words from the list.")
+        return buckets
+
+    def _get_long_words(self) -> frozenset:
+        """
+        Collect the dictionary words the policy does not allow in a password.
+
+        :return: A set of lowercase words longer than `max_word_length`.
+        :rtype: frozenset
+        """
+        if self.policy.max_word_length is None:
+            return frozenset()
+        return frozenset(
+            x.lower() for x in self.words if len(x) > self.policy.max_word_length
+        )
+
+    def _get_composition_table(self, length: int) -> List[List[int]]:
+        """
+        Count the word sequences that fill a given length exactly.
+
+        `table[w][n]` is the number of sequences of `w` allowed words whose
+        lengths add up to `n`.
+
+        :param length: The effective password length.
+        :type length: int
+        :return: The composition table for `0 <= w, n <= length`.
+        :rtype: List[List[int]]
+        """
+        table = self._composition_tables.get(length)
+        if table is None:
+            sizes = {k: len(v) for k, v in self._buckets.items() if k <= length}
+            table = [[1] + [0] * length]
+            for _ in range(length):
+                prev = table[-1]
+                row = [0] * (length + 1)
+                for n in range(1, length + 1):
+                    row[n] = sum(
+                        size * prev[n - k] for k, size in sizes.items() if k <= n
+                    )
+                table.append(row)
+            self._composition_tables[length] = table
+        return table
+
+    def _get_word_counts(self, length: int) -> List[int]:
+        """
+        Get the amounts of words that can fill the effective password length.
+
+        :param length: The effective password length.
+        :type length: int
+        :return: The possible amounts of words.
+        :rtype: List[int]
+        :raises ValidationError: If no amount of words satisfies the policy.
+        """
+        table = self._get_composition_table(length)
+        others = self.char_amount + self.num_amount
+        counts = []
+        for w in range(1, length + 1):
+            if not table[w][length]:
+                continue
+            if w + others - 1 < self.empty_space_amount:
+                continue
+            if self.policy.no_repeated_class:
+                total = w + others
+                if max(w, self.char_amount, self.num_amount) > (total + 1) // 2:
+                    continue
+            counts.append(w)
+        if not counts:
+            raise ValidationError(
+                f"The policy cannot be satisfied with the effective password length {length}."
+            )
+        return counts
+
+    def _get_policy_words(self, length: int) -> List[str]:
+        """
+        Pick words that fill the effective password length exactly.
+
+        Every sequence of allowed words is equally likely.
+
+        :param length: The effective password length.
+        :type length: int
+        :return: A list of words.
+        :rtype: List[str]
+        """
+        table = self._get_composition_table(length)
+        counts = self._get_word_counts(length)
+        w = self.rng.choices(counts, [table[c][length] for c in counts])[0]
+
+        words = []
+        while w:
+            r = self.rng.randrange(table[w][length])
+            for k, bucket in self._buckets.items():
+                if k > length:
+                    continue
+                ways = len(bucket) * table[w - 1][length - k]
+                if r < ways:
+                    break
+                r -= ways
+            words.append(self.rng.choice(bucket))
+            length -= k
+            w -= 1
+        return words
+
+    def _get_class_order(self, counts: Dict[str, int]) -> List[str]:
+        """
+        Get a random order of segment classes without neighbouring repeats.
+
+        A class is only chosen if the remaining segments can still be
+        arranged afterwards.
+
+        :param counts: The amount of segments per class.
+        :type counts: Dict[str, int]
+        :return: A list of classes.
+        :rtype: List[str]
+        """
+        counts = dict(counts)
+        remaining = sum(counts.values())
+        order = []
+        last = None
+        while remaining:
+            remaining -= 1
+            candidates = []
+            for c, n in counts.items():
+                if not n or c == last:
+                    continue
+                if n - 1 > remaining // 2:
+                    continue
+                if any(
+                    m > (remaining + 1) // 2 for k, m in counts.items() if k != c
+                ):
+                    continue
+                candidates.append(c)
+            last = self.rng.choices(candidates, [counts[c] for c in candidates])[0]
+            counts[last] -= 1
+            order.append(last)
+        return order
+
+    def _get_segments(self, words: List[str]) -> List[str]:
+        """
+        Arrange words, special characters and numbers into segments.
+
+        :param words: The words of the password.
+        :type words: List[str]
+        :return: A list of segments.
+        :rtype: List[str]
+        """
+        groups = {
+            WORD: words,
+            SPECIAL: self._get_special_chars(),
+            DIGIT: self._get_nums(),
+        }
+        if not self.policy.no_repeated_class:
+            segments = [x for group in groups.values() for x in group]
+            self.rng.shuffle(segments)
+            return segments
+
+        order = self._get_class_order({c: len(g) for c, g in groups.items()})
+        iterators = {c: iter(g) for c, g in groups.items()}
+        return [next(iterators[c]) for c in order]
+
+    def _add_capital_letters(self, segments: List[str]) -> None:
+        """
+        Capitalize exactly `min_uppercase` letters of the word segments.
+
+        :param segments: The segments of the password.
+        :type segments: List[str]
+        :return: None
+        """
+        positions = [
+            (i, j)
+            for i, seg in enumerate(segments)
+            if seg.isalpha()
+            for j in range(len(seg))
+        ]
+        if self.policy.min_uppercase > len(positions):
+            raise ValidationError(
+                f"Cannot capitalize {self.policy.min_uppercase} letters "
+                f"in a password with {len(positions)} letters."
+            )
+        for i, j in self.rng.sample(positions, self.policy.min_uppercase):
+            seg = segments[i]
+            segments[i] = seg[:j] + seg[j].upper() + seg[j + 1 :]
+
+    def _add_blank_space(self, lst: List[str]) -> None:
+        """
+        Adds blank spaces into distinct gaps between segments.
+
+        :param lst: The list to which blank spaces will be added.
+        :type lst: List[str]
+        :return: None
+        """
+        gaps = self.rng.sample(range(1, len(lst)), self.empty_space_amount)
+        for index in sorted(gaps, reverse=True):
+            lst.insert(index, " ")
+
+    def _get_violation(self, password: str) -> str:
+        """
+        Check the constraints that cannot be satisfied by construction.
+
+        :param password: The assembled password.
+        :type password: str
+        :return: The name of the violated constraint, or `None`.
+        :rtype: str
+        """
+        lowered = password.lower()
+        if any(sub in lowered for sub in self.policy.banned_substrings):
+            return "banned_substrings"
+        if self._long_words and not self.policy.no_repeated_class:
+            for i in range(len(lowered)):
+                for n in range(self.policy.max_word_length + 1, self._longest_word + 1):
+                    if lowered[i : i + n] in self._long_words:
+                        return "max_word_length"
+        return None
+
+    def _count_attempts(self, violations: List[str]) -> None:
+        """
+        Add the attempts of one password to the statistics.
+
+        A password takes one attempt more than it had violations, unless
+        it failed every attempt. The statistics are shared by all threads
+        using the generator and updated once per password.
+
+        :param violations: The violations of the rejected attempts.
+        :type violations: List[str]
+        """
+        with self._stats_lock:
+            self.attempts += min(len(violations) + 1, self.max_attempts)
+            for violation in violations:
+                self.rejections[violation] = self.rejections.get(violation, 0) + 1
+
+    def _generate_segments(self, length: int) -> List[str]:
+        """
+        Assemble the segments of a password that satisfies the policy.
+
+        :param length: The desired length of the generated password.
+        :type length: int
+        :return: The segments of the password.
+        :rtype: List[str]
+        :raises ValidationError: If `length` is not valid, or the policy cannot
+                                 be satisfied within `max_attempts`.
+        """
+        self.validate_input(length)
+        self._use_current_words()
+        try:
+            effective_length = self._get_effective_password_length(length)
+        except ValueError as e:
+            raise ValidationError(e)
+
+        violations = []
+        try:
+            for _ in range(self.max_attempts):
+                segments = self._get_segments(self._get_policy_words(effective_length))
+                self._add_capital_letters(segments)
+                self._add_blank_space(segments)
+
+                violation = self._get_violation("".join(segments))
+                if violation is None:
+                    return segments
+                violations.append(violation)
+        finally:
+            self._count_attempts(violations)
+
+        raise ValidationError(
+            f"Could not satisfy the policy in {self.max_attempts} attempts."
+        )
+
+    def generate(self, length: int) -> str:
+        """
+        Generates a password of the specified length that satisfies the policy.
+
+        :param length: The desired length of the generated password. Must be
+                       a positive integer.
+        :return: A string representing the generated password.
+
+        :raises ValidationError: If `length` is not valid, or the policy cannot
+                                 be satisfied within `max_attempts`.
+        """
+        return "".join(self._generate_segments(length))
+
+    def generate_into(self, buffer, length: int) -> int:
+        """
+        Build a password of the specified length that satisfies the policy
+        into a buffer.
+
+        Unlike `UserFriendlyPasswordGenerator.generate_into`, the password
+        does exist as a `str` while it is built, because banned substrings
+        and dictionary words spanning several segments are checked on the
+        assembled password. Only the buffer can be wiped afterwards.
+
+        :param buffer: A writable buffer, e.g. a `bytearray`, of at least
+                       `length` bytes.
+        :param length: The desired length of the generated password.
+        :type length: int
+        :return: The amount of bytes written to the start of `buffer`.
+        :rtype: int
+        :raises ValidationError: If `length` is not valid, `buffer` is too
+                                 small, or the policy cannot be satisfied
+                                 within `max_attempts`.
+        """
+        segments = self._generate_segments(length)
+        return write_segments(buffer, [s.encode("utf-8") for s in segments])
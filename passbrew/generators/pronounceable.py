@@ -0,0 +1,116 @@
+from typing import List
+
+from passbrew.exceptions import SnapshotError, ValidationError
+from passbrew.generators.base_generator import BasePasswordGenerator
+from passbrew.markov import MarkovModel, get_model_key
+from passbrew.validation import is_positive_integer, validate_length
+
+
+class PronounceablePasswordGenerator(BasePasswordGenerator):
+    """
+    A class for generating pronounceable passwords that are not words.
+
+    The characters are sampled from a `MarkovModel` trained on the word
+    list, so the passwords follow the letter patterns of its words.
+    Passwords that are words of the list are rejected and drawn again.
+    Shorter words can still appear inside a password, because the chain
+    restarts at the end of every word it follows. Training takes a few tens
+    of milliseconds for the default word list; with a `model_path`, the
+    compiled model is saved there and loaded by later instances while the
+    word list is unchanged.
+
+    A password of `n` characters has less entropy than `n` random letters;
+    use longer passwords than with the computer-friendly generator.
+
+    Attributes
+    ----------
+    order : int
+        The amount of previous characters the next one depends on.
+    model_path : str
+        The file caching the compiled model, or `None`.
+    model : MarkovModel
+        The model of the current word list.
+    """
+
+    __slots__ = ("order", "model_path", "model", "_word_set")
+
+    def __init__(
+        self,
+        word_list_path=BasePasswordGenerator.DEFAULT_WORD_LIST_PATH,
+        blocklist=None,
+        rng=None,
+        settings=None,
+        word_index=None,
+        word_source=None,
+        order: int = 2,
+        model_path=None,
+    ) -> None:
+        super().__init__(
+            word_list_path, blocklist, rng, settings, word_index, word_source
+        )
+        is_positive_integer(order)
+        self.order = order
+        self.model_path = model_path
+        self.model = self._get_model()
+        self._word_set = self._get_word_set()
+
+    def _get_word_set(self) -> frozenset:
+        # The model only generates lowercase letters.
+        return frozenset(wrd.lower() for wrd in self.words)
+
+    def _get_model(self) -> MarkovModel:
+        """
+        Load the cached model of the current words, or train and cache it.
+        """
+        if self.model_path is not None:
+            try:
+                model = MarkovModel.load(self.model_path)
+            except SnapshotError:
+                pass
+            else:
+                if model.key == get_model_key(self.words, self.order):
+                    return model
+        model = MarkovModel.train(self.words, self.order)
+        if self.model_path is not None:
+            model.save(self.model_path)
+        return model
+
+    def _use_current_words(self) -> bool:
+        if super()._use_current_words():
+            self.model = self._get_model()
+            self._word_set = self._get_word_set()
+            return True
+        return False
+
+    def generate(self, length: int) -> str:
+        """
+        Generate a pronounceable password.
+
+        :param length: The length of the password.
+        :type length: int
+        :return: A password of exactly `length` lowercase letters.
+        :rtype: str
+        :raises ValueError: If `length` is outside of the length range.
+        :raises ValidationError: If only words of the list were generated
+                                 within `max_batch_rounds` attempts.
+        """
+        if validate_length(length, self.min_length, self.max_length):
+            self._use_current_words()
+            for _ in range(self.max_batch_rounds):
+                password = self.model.generate(self.rng, length)
+                if password not in self._word_set:
+                    return password
+            raise ValidationError(
+                f"Could not generate a password that is not a word in "
+                f"{self.max_batch_rounds} attempts."
+            )
+
+    def _generate_candidates(self, count: int, args: tuple, kwargs: dict) -> List[str]:
+        return self._generate_many(count, *args, **kwargs)
+
+    def _generate_many(self, count: int, length: int) -> List[str]:
+        if validate_length(length, self.min_length, self.max_length):
+            self._use_current_words()
+            passwords = self.model.generate_many(self.rng, count, length)
+            # `generate_batch` draws the rejected ones again.
+            return [p for p in passwords if p not in self._word_set]
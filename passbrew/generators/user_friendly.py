@@ -1,14 +1,18 @@
-import random
 from typing import List
 
+from passbrew.buffers import write_segments
 from passbrew.exceptions import ValidationError
-from passbrew.utils import capitalize_random_letter, filter_list
+from passbrew.utils import capitalize_random_letter
 from passbrew.validation import (
     is_positive_integer,
     validate_length,
 )
 
-from .base_generator import BasePasswordGenerator
+from .base_generator import SETTINGS_LOCK, BasePasswordGenerator
+
+# The encoded digits. Single bytes are shared objects in CPython, so
+# picking one copies nothing.
+_DIGITS = tuple(str(n).encode("ascii") for n in range(10))
 
 
 class BaseUserFriendlyPasswordGenerator(BasePasswordGenerator):
@@ -16,16 +20,18 @@ class BaseUserFriendlyPasswordGenerator(BasePasswordGenerator):
     A base class for user-friendly password generators.
     """
 
+    __slots__ = ()
+
     _min_length = 12
     _max_length = 64
-    _password_prep = []
 
     def _pick_a_random_word(self, max_length: int) -> str:
         """
-        Select a random word from a filtered list of words.
+        Select a random word from the word index.
 
-        This method filters the list of available words based on the specified
-        maximum length and returns a randomly chosen word from the filtered list.
+        This method returns a randomly chosen word of at most `max_length`
+        characters. The words are indexed by length, so no filtering of the
+        word list is needed.
 
         :param max_length: The maximum length of words to consider for selection.
         :type max_length: int
@@ -34,12 +40,10 @@ class BaseUserFriendlyPasswordGenerator(BasePasswordGenerator):
 
         :raises: `ValidationError` if `max_length` is less than or
                  equal to zero or not and int.
-                 `TypeError` if list is not a list of strings.
-                 `IndexError` if the list is empty.
+                 `IndexError` if there are no words short enough.
         """
-
-        filtered_words = filter_list(self.words, max_length)
-        return random.choice(filtered_words)
+        is_positive_integer(max_length)
+        return self.word_index.pick(self.rng, max_length)
 
 
 class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
@@ -65,8 +69,13 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
 
         generate(length: int) -> str:
             Generates a random password of a specified length
+
+        generate_into(buffer, length: int) -> int:
+            Builds a random password of a specified length into a buffer.
     """
 
+    __slots__ = ()
+
     _special_chars = [
         "!",
         "#",
@@ -99,7 +108,7 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
         :return: The number of characters.
         :rtype: int
         """
-        return self._char_amount
+        return self._get_setting("char_amount")
 
     @classmethod
     def set_char_amount(kls, value: int) -> None:
@@ -112,8 +121,9 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
         """
         if is_positive_integer(value):
             try:
-                kls.get_extra_chars_amnt(kls, char_amount=value)
-                kls._char_amount = value
+                with SETTINGS_LOCK:
+                    kls._count_extra_chars(char_amount=value)
+                    kls._char_amount = value
             except ValueError as e:
                 raise ValidationError(e)
 
@@ -125,7 +135,7 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
         :return: Amount of numbers.
         :rtype: int
         """
-        return self._num_amount
+        return self._get_setting("num_amount")
 
     @classmethod
     def set_num_amount(kls, value: int) -> None:
@@ -138,8 +148,9 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
         """
         if is_positive_integer(value):
             try:
-                kls.get_extra_chars_amnt(kls, num_amount=value)
-                kls._num_amount = value
+                with SETTINGS_LOCK:
+                    kls._count_extra_chars(num_amount=value)
+                    kls._num_amount = value
             except ValueError as e:
                 raise ValidationError(e)
 
@@ -151,7 +162,7 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
         :return: Number of empty spaces.
         :rtype: int
         """
-        return self._empty_space_amount
+        return self._get_setting("empty_space_amount")
 
     @classmethod
     def set_empty_space_amount(kls, value: int) -> None:
@@ -164,11 +175,19 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
         """
         if is_positive_integer(value):
             try:
-                kls.get_extra_chars_amnt(kls, empty_space_amount=value)
-                kls._empty_space_amount = value
+                with SETTINGS_LOCK:
+                    kls._count_extra_chars(empty_space_amount=value)
+                    kls._empty_space_amount = value
             except ValueError as e:
                 raise ValidationError(e)
 
+    def _check_settings(self) -> None:
+        super()._check_settings()
+        try:
+            self.get_extra_chars_amnt()
+        except ValueError as e:
+            raise ValidationError(e)
+
     def get_extra_chars_amnt(
         self,
         char_amount: int = None,
@@ -204,16 +223,51 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
                             password length.
 
         """
-        char_amount = char_amount or self._char_amount
-        num_amount = num_amount or self._num_amount
-        empty_space_amount = empty_space_amount or self._empty_space_amount
-        password_length = password_length or self._max_length
+        return self._sum_extra_chars(
+            char_amount or self.char_amount,
+            num_amount or self.num_amount,
+            empty_space_amount or self.empty_space_amount,
+            password_length or self.max_length,
+            self.max_length,
+        )
+
+    @classmethod
+    def _count_extra_chars(
+        kls,
+        char_amount: int = None,
+        num_amount: int = None,
+        empty_space_amount: int = None,
+    ) -> int:
+        """
+        Count the extra characters using the class defaults.
+
+        This is the class level counterpart of `get_extra_chars_amnt`, used
+        by the setters to validate a new default.
+
+        :raises ValueError: If the total of extra characters exceeds the
+                            maximum length of the class.
+        """
+        return kls._sum_extra_chars(
+            char_amount or kls._char_amount,
+            num_amount or kls._num_amount,
+            empty_space_amount or kls._empty_space_amount,
+            kls._max_length,
+            kls._max_length,
+        )
 
+    @staticmethod
+    def _sum_extra_chars(
+        char_amount: int,
+        num_amount: int,
+        empty_space_amount: int,
+        password_length: int,
+        max_length: int,
+    ) -> int:
         extra_chars_amnt = char_amount + num_amount + empty_space_amount
-        if extra_chars_amnt >= self._max_length or extra_chars_amnt >= password_length:
+        if extra_chars_amnt >= max_length or extra_chars_amnt >= password_length:
             raise ValueError(
                 f"Error calculating extra characters: Total extra characters ({extra_chars_amnt}) "
-                f"exceeds the maximum allowed length ({self._max_length}) "
+                f"exceeds the maximum allowed length ({max_length}) "
                 f"or the specified password length ({password_length})."
             )
         return extra_chars_amnt
@@ -243,27 +297,37 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
             password_length=password_length
         )
 
-    def _get_random_words(self, password_length: int) -> None:
+    def _get_random_words(self, password_length: int, encoded: bool = False) -> list:
         """
         Generate and collect random words to form a password.
 
         This method retrieves random words based on the specified password length
         while ensuring that the total length of words does not exceed the given
-        password length. The words are appended to the `_password_prep` list.
+        password length.
 
         :param password_length: The desired total length of the password.
         :type password_length: int
 
+        :param encoded: Whether to pick the UTF-8 encoded words of the index,
+                        with the same random numbers.
+        :type encoded: bool
+
         :raises ValueError: If `password_length` is outside the allowed range
                             defined by `self.min_length` and `self.max_length`.
-        :return: None
+        :return: The words, the start of the segments of a password.
+        :rtype: List[str] or List[bytes]
         """
-        if validate_length(password_length, self._min_length, self._max_length):
+        words = []
+        if validate_length(password_length, self.min_length, self.max_length):
             pw_length = self._get_effective_password_length(password_length)
             while pw_length > 0:
-                wrd = self._pick_a_random_word(pw_length)
-                self._password_prep.append(wrd)
+                if encoded:
+                    wrd = self.word_index.pick_encoded(self.rng, pw_length)
+                else:
+                    wrd = self._pick_a_random_word(pw_length)
+                words.append(wrd)
                 pw_length -= len(wrd)
+        return words
 
     def _get_special_chars(self) -> List:
         """
@@ -282,7 +346,7 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
             raise ValidationError(
                 f"Invalid value for `char_amount`: {self.char_amount}. It must be a positive integer."
             )
-        return random.choices(self._special_chars, k=self.char_amount)
+        return self.rng.choices(self._special_chars, k=self.char_amount)
 
     def _get_nums(self) -> List[int]:
         """
@@ -298,29 +362,33 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
         """
         nums = []
         for i in range(self.num_amount):
-            nums.append(str(random.randint(0, 9)))
+            nums.append(str(self.rng.randint(0, 9)))
         return nums
 
-    def _add_a_capital_letter(self) -> None:
+    def _add_a_capital_letter(self, segments: List[str]) -> None:
         """
-        Adds a capital letter to a randomly selected word from the password preparation
-        list.
+        Adds a capital letter to a randomly selected word of the segments.
 
-        This method selects a word from the `_password_prep` attribute, randomly chooses
-        a position within that word, and capitalizes the letter at that position.
-        The updated word replaces the original word in the `_password_prep` list.
+        This method selects a word from `segments`, randomly chooses a position
+        within that word, and capitalizes the letter at that position.
+        The updated word replaces the original word in `segments`.
 
         This function is intended to enhance the complexity of generated passwords by
         ensuring that at least one letter is capitalized.
 
-        :raises IndexError: If the list `_password_prep` is empty or if the selected word
-                            does not contain enough characters to capitalize a letter.
+        :param segments: The segments of a password.
+        :type segments: List[str]
+        :raises IndexError: If `segments` does not contain a word with enough
+                            characters to capitalize a letter.
         """
 
-        wrd = random.choice(self._password_prep)
-        n = random.randint(1, len(wrd) - 1)
-        index = self._password_prep[wrd]
-        self._password_prep[index] = capitalize_random_letter(wrd, n)
+        indexes = [
+            i for i, item in enumerate(segments) if len(item) > 1 and item.isalpha()
+        ]
+        index = self.rng.choice(indexes)
+        wrd = segments[index]
+        n = self.rng.randint(1, len(wrd) - 1)
+        segments[index] = capitalize_random_letter(wrd, n)
 
     @property
     def _extra_chars_group(self) -> List:
@@ -338,15 +406,31 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
         extra_chars.extend(self._get_nums())
         return extra_chars
 
-    def _get_collective_password_prep(self) -> None:
+    def _get_encoded_extra_chars(self) -> List[bytes]:
+        """
+        Get the encoded special characters and digits of a password.
+
+        The random numbers are the same as those of `_extra_chars_group`.
+
+        :return: The encoded extra characters.
+        :rtype: List[bytes]
+        """
+        extra_chars = [char.encode("utf-8") for char in self._get_special_chars()]
+        for _ in range(self.num_amount):
+            extra_chars.append(_DIGITS[self.rng.randint(0, 9)])
+        return extra_chars
+
+    def _get_collective_password_prep(self, segments: List[str]) -> None:
         """
-        Adds extra characters to the password preparation list.
+        Adds extra characters to the segments of a password.
 
+        :param segments: The segments of a password.
+        :type segments: List[str]
         :return: None
         """
-        self._password_prep.extend(self._extra_chars_group)
+        segments.extend(self._extra_chars_group)
 
-    def _add_blank_space(self, lst: List[str]) -> None:
+    def _add_blank_space(self, lst: list, space=" ") -> None:
         # TODO Spaces cannot be added consecutively
         """
         Adds blank spaces into the password list.
@@ -355,22 +439,27 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
 
         :param lst: The list to which blank spaces will be added.
         :type lst: List[str]
+        :param space: The blank space, `b" "` for encoded segments.
+        :type space: str or bytes
         :return: None
         """
         for _ in range(self.empty_space_amount):
-            index = random.randint(1, len(lst) - 2)
-            lst.insert(index, " ")
+            index = self.rng.randint(1, len(lst) - 1)
+            lst.insert(index, space)
 
-    def _shuffle(self) -> None:
+    def _shuffle(self, segments: List[str]) -> None:
         """
-        Randomizes the order of items in the `_password_prep` list.
+        Randomizes the order of the segments of a password.
 
-        This method uses the `random.shuffle` function to reorder the elements in
-        the `_password_prep` list in place. Shuffling the items can help enhance
+        This method uses the `shuffle` method of the generator's `rng` to reorder
+        `segments` in place. Shuffling the items can help enhance
         the unpredictability of the generated password by ensuring that the order
         of words or characters does not follow a specific pattern.
+
+        :param segments: The segments of a password.
+        :type segments: List[str]
         """
-        random.shuffle(self._password_prep)
+        self.rng.shuffle(segments)
 
     def generate(self, length: int) -> str:
         """
@@ -379,12 +468,14 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
         This method orchestrates the password generation process by performing the
         following steps:
         1. Validates the input using `validate_input`.
-        2. Clears the existing `_password_prep` list to start fresh.
-        3. Retrieves a set of random words using `_get_random_words`.
-        4. Populates the `_password_prep` list by calling `_get_collective_password_prep`.
-        5. Randomizes the order of items in the `_password_prep` list using `_shuffle`.
-        6. Adds blank spaces to the password elements by calling `_add_blank_space`.
-        7. Constructs and returns the final password using `_get`..
+        2. Retrieves a set of random words using `_get_random_words`.
+        3. Adds the extra characters by calling `_get_collective_password_prep`.
+        4. Randomizes the order of the segments using `_shuffle`.
+        5. Adds blank spaces to the password elements by calling `_add_blank_space`.
+        6. Constructs and returns the final password using `_get`.
+
+        The segments are local to the call, so one generator can be used by
+        many threads at once.
 
         :param length: The desired length of the generated password. Must be
                        a positive integer.
@@ -393,9 +484,41 @@ class UserFriendlyPasswordGenerator(BaseUserFriendlyPasswordGenerator):
         :raises ValiadtionError: If `length` is not valid.
         """
         self.validate_input(length)
-        self._password_prep.clear()
-        self._get_random_words(length)
-        self._get_collective_password_prep()
-        self._shuffle()
-        self._add_blank_space(self._password_prep)
-        return self._get()
+        self._use_current_words()
+        segments = self._get_random_words(length)
+        self._get_collective_password_prep(segments)
+        self._shuffle(segments)
+        self._add_blank_space(segments)
+        return self._get(segments)
+
+    def generate_into(self, buffer, length: int) -> int:
+        """
+        Build a password of the specified length into a buffer.
+
+        The password is assembled from the pre-encoded words of the word
+        index and written into `buffer` as UTF-8, so no `str` holding the
+        password, or a part of it, is created. Once the password is used,
+        the buffer can be wiped with `passbrew.buffers.zeroize`, or be
+        borrowed from a `BufferPool`, which does that.
+
+        The same random numbers are used as by `generate`, so with the same
+        seed both return the same password. Lengths are counted in bytes,
+        which equals characters for ASCII word lists such as the default
+        one.
+
+        :param buffer: A writable buffer, e.g. a `bytearray`, of at least
+                       `length` bytes.
+        :param length: The desired length of the generated password.
+        :type length: int
+        :return: The amount of bytes written to the start of `buffer`.
+        :rtype: int
+        :raises ValidationError: If `length` is not valid or `buffer` is too
+                                 small.
+        """
+        self.validate_input(length)
+        self._use_current_words()
+        segments = self._get_random_words(length, encoded=True)
+        segments.extend(self._get_encoded_extra_chars())
+        self._shuffle(segments)
+        self._add_blank_space(segments, b" ")
+        return write_segments(buffer, segments)
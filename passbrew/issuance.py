@@ -0,0 +1,435 @@
+import bisect
+import hashlib
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from typing import Iterable, List, NamedTuple, Optional
+
+from passbrew.exceptions import SnapshotError, ValidationError
+from passbrew.validation import is_positive_integer
+
+MAGIC = b"PBISSUE\x00"
+FORMAT_VERSION = 1
+
+FINGERPRINT_SIZE = 16
+
+# The magic, the format version, the CRC32 of the compressed body, the
+# amount of records, the length of the compressed body, the key id, and
+# the first and last fingerprints of the segment.
+_HEADER = struct.Struct(f"<8sIIIQ8s{FINGERPRINT_SIZE}s{FINGERPRINT_SIZE}s")
+
+# Stops the writer thread.
+_STOP = object()
+
+
+def get_key_id(key: bytes) -> bytes:
+    """
+    Get the id of a fingerprint key, stored in every segment.
+
+    :param key: The key.
+    :type key: bytes
+    :return: An 8 byte id, from which the key cannot be recovered.
+    :rtype: bytes
+    """
+    return hashlib.blake2b(key, digest_size=8, person=b"passbrew-keyid").digest()
+
+
+class _Segment(NamedTuple):
+    offset: int
+    count: int
+    size: int
+    crc: int
+    first: bytes
+    last: bytes
+
+
+class IssuanceLog:
+    """
+    An append-only log of the fingerprints of issued passwords.
+
+    Passwords are never stored: `record` turns every password into a
+    fingerprint, a BLAKE2b hash keyed with the secret `key`, and keeps it
+    with the time of its batch. The records are buffered and cut into
+    segments of `segment_records` records, which a background thread
+    sorts, compresses and appends to the file, so generating a batch only
+    pays for hashing its passwords. `flush` writes the remaining records as
+    a shorter segment and waits until everything is written.
+
+    Every segment has a header with a CRC32 of its compressed body and the
+    range of its fingerprints. Lookups sort the fingerprints they look for
+    and merge them with the sorted records of the segments whose range
+    covers them; decompressed segments are kept in a small cache.
+
+    A segment left incomplete by a crash is cut off when the log is opened
+    again. A log must always be opened with the same key.
+
+    :param path: The path of the log file, created if it does not exist.
+    :param key: The secret key of the fingerprints, 16 to 64 bytes.
+    :type key: bytes
+    :param segment_records: The amount of records of a full segment.
+    :type segment_records: int
+    :param sync: Whether to `fsync` the file after every segment.
+    :type sync: bool
+    :param cache_size: The amount of decompressed segments kept.
+    :type cache_size: int
+    :raises ValidationError: If the key is invalid or differs from the key
+                             the log was written with.
+    :raises SnapshotError: If the file is not an issuance log.
+
+    Attributes
+    ----------
+    path : str
+        The path of the log file.
+    segment_records : int
+        The amount of records of a full segment.
+    """
+
+    __slots__ = (
+        "path",
+        "segment_records",
+        "sync",
+        "cache_size",
+        "_hash",
+        "_key_id",
+        "_file",
+        "_segments",
+        "_cache",
+        "_pending",
+        "_queued",
+        "_count",
+        "_lock",
+        "_queue",
+        "_error",
+        "_thread",
+    )
+
+    def __init__(
+        self,
+        path,
+        key: bytes,
+        segment_records: int = 4096,
+        sync: bool = True,
+        cache_size: int = 16,
+    ) -> None:
+        if not isinstance(key, bytes) or not 16 <= len(key) <= 64:
+            raise ValidationError("The key must be 16 to 64 bytes.")
+        is_positive_integer(segment_records)
+        is_positive_integer(cache_size)
+        self.path = path
+        self.segment_records = segment_records
+        self.sync = sync
+        self.cache_size = cache_size
+        # Copying a keyed hash is faster than keying a new one.
+        self._hash = hashlib.blake2b(key=key, digest_size=FINGERPRINT_SIZE)
+        self._key_id = get_key_id(key)
+        self._file = open(path, "a+b")
+        try:
+            self._segments = self._read_segments()
+        except Exception:
+            self._file.close()
+            raise
+        self._cache = OrderedDict()
+        self._pending = []
+        # The batches handed to the writer thread and not yet in
+        # `_segments`, oldest first.
+        self._queued = deque()
+        self._count = sum(s.count for s in self._segments)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._write_segments, daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, password: str) -> bool:
+        return self.lookup([password])[0] is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _read_segments(self) -> List[_Segment]:
+        """
+        Read the segment headers, cutting off an incomplete last segment.
+
+        A tail is only cut off if it follows a segment or starts like one,
+        so a file that is not a log is never changed.
+        """
+        f = self._file
+        end = f.seek(0, os.SEEK_END)
+        segments = []
+        offset = 0
+        while offset < end:
+            f.seek(offset)
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                if not segments and not MAGIC.startswith(header[: len(MAGIC)]):
+                    raise SnapshotError(f"{self.path} is not an issuance log.")
+                break
+            magic, version, crc, count, size, key_id, first, last = _HEADER.unpack(
+                header
+            )
+            if magic != MAGIC:
+                raise SnapshotError(f"{self.path} is not an issuance log.")
+            if version != FORMAT_VERSION:
+                raise SnapshotError(f"Unsupported log format version {version}.")
+            if key_id != self._key_id:
+                raise ValidationError(
+                    f"{self.path} was written with another fingerprint key."
+                )
+            if offset + _HEADER.size + size > end:
+                break
+            segments.append(_Segment(offset, count, size, crc, first, last))
+            offset += _HEADER.size + size
+        if segments:
+            # A crash can leave the last segment with its full length but
+            # without all of its body written.
+            last = segments[-1]
+            body = os.pread(f.fileno(), last.size, last.offset + _HEADER.size)
+            if zlib.crc32(body) != last.crc:
+                segments.pop()
+                offset = last.offset
+        if offset < end:
+            f.truncate(offset)
+        return segments
+
+    def fingerprint(self, password: str) -> bytes:
+        """
+        Get the fingerprint of a password.
+
+        :param password: The password.
+        :type password: str
+        :return: The keyed hash stored in the log.
+        :rtype: bytes
+        """
+        return self.fingerprint_many([password])[0]
+
+    def fingerprint_many(self, passwords: Iterable[str]) -> List[bytes]:
+        """
+        Get the fingerprints of many passwords.
+
+        :param passwords: The passwords.
+        :type passwords: Iterable[str]
+        :return: The keyed hashes stored in the log, in order.
+        :rtype: List[bytes]
+        """
+        copy = self._hash.copy
+        fingerprints = []
+        for password in passwords:
+            digest = copy()
+            digest.update(password.encode("utf-8"))
+            fingerprints.append(digest.digest())
+        return fingerprints
+
+    def _check_error(self) -> None:
+        if self._file.closed:
+            raise ValueError("The issuance log is closed.")
+        if self._error is not None:
+            raise self._error
+
+    def record(self, passwords: Iterable[str], issued_at: float = None) -> None:
+        """
+        Record the fingerprints of a batch of issued passwords.
+
+        :param passwords: The passwords of the batch.
+        :type passwords: Iterable[str]
+        :param issued_at: The time of the batch in seconds since the epoch.
+                          Defaults to now.
+        :type issued_at: float
+        :raises OSError: If the writer thread failed to write a segment.
+        :raises ValueError: If the log is closed.
+        """
+        self._check_error()
+        if issued_at is None:
+            issued_at = time.time()
+        stamp = int(issued_at * 1_000_000)
+        records = [(fp, stamp) for fp in self.fingerprint_many(passwords)]
+        size = self.segment_records
+        with self._lock:
+            pending = self._pending
+            pending.extend(records)
+            self._count += len(records)
+            while len(pending) >= size:
+                self._enqueue(pending[:size])
+                del pending[:size]
+
+    def flush(self) -> None:
+        """
+        Write the buffered records and wait until all segments are written.
+
+        :raises OSError: If the writer thread failed to write a segment.
+        :raises ValueError: If the log is closed.
+        """
+        self._check_error()
+        with self._lock:
+            if self._pending:
+                self._enqueue(self._pending)
+                self._pending = []
+        self._queue.join()
+        self._check_error()
+
+    def _enqueue(self, records: list) -> None:
+        # Called with `_lock` held, so lookups see every record either
+        # pending, queued or in a segment.
+        self._queued.append(records)
+        self._queue.put(records)
+
+    def close(self) -> None:
+        """
+        Flush the log and stop its writer thread.
+        """
+        if self._file.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._file.close()
+
+    def _write_segments(self) -> None:
+        while True:
+            records = self._queue.get()
+            if records is _STOP:
+                self._queue.task_done()
+                return
+            segment = None
+            try:
+                if self._error is None:
+                    segment = self._write_segment(records)
+            except OSError as e:
+                self._error = e
+            finally:
+                with self._lock:
+                    if segment is not None:
+                        self._segments = self._segments + [segment]
+                    self._queued.popleft()
+                self._queue.task_done()
+
+    def _write_segment(self, records: list) -> _Segment:
+        # Sorts a copy, lookups may be reading the queued batch.
+        records = sorted(records)
+        fingerprints = b"".join(fp for fp, _ in records)
+        stamps = struct.pack(f"<{len(records)}Q", *(stamp for _, stamp in records))
+        # Fingerprints are random and barely compress; the timestamps of a
+        # batch are equal and compress well, so they are kept in a column.
+        body = zlib.compress(fingerprints + stamps)
+        crc = zlib.crc32(body)
+        first, last = records[0][0], records[-1][0]
+        header = _HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            crc,
+            len(records),
+            len(body),
+            self._key_id,
+            first,
+            last,
+        )
+        f = self._file
+        offset = f.seek(0, os.SEEK_END)
+        f.write(header + body)
+        f.flush()
+        if self.sync:
+            os.fsync(f.fileno())
+        return _Segment(offset, len(records), len(body), crc, first, last)
+
+    def _read_records(self, segment: _Segment):
+        """
+        Get the sorted fingerprints and the timestamps of a segment.
+        """
+        with self._lock:
+            cached = self._cache.get(segment.offset)
+            if cached is not None:
+                self._cache.move_to_end(segment.offset)
+                return cached
+        body = os.pread(
+            self._file.fileno(), segment.size, segment.offset + _HEADER.size
+        )
+        if len(body) != segment.size or zlib.crc32(body) != segment.crc:
+            raise SnapshotError(
+                f"The segment at {segment.offset} of {self.path} is corrupt."
+            )
+        data = zlib.decompress(body)
+        end = segment.count * FINGERPRINT_SIZE
+        fingerprints = [
+            data[i : i + FINGERPRINT_SIZE] for i in range(0, end, FINGERPRINT_SIZE)
+        ]
+        stamps = struct.unpack(f"<{segment.count}Q", data[end:])
+        with self._lock:
+            self._cache[segment.offset] = (fingerprints, stamps)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return fingerprints, stamps
+
+    def lookup_fingerprints(self, fingerprints: List[bytes]) -> List[Optional[float]]:
+        """
+        Find when fingerprints were issued.
+
+        :param fingerprints: The fingerprints.
+        :type fingerprints: List[bytes]
+        :return: The time each fingerprint was first issued, in seconds
+                 since the epoch, or `None` if it was not.
+        :rtype: List[Optional[float]]
+        :raises SnapshotError: If a segment is corrupt.
+        """
+        wanted = set(fingerprints)
+        queries = sorted(wanted)
+        issued = {}
+
+        def found(fp: bytes, stamp: int) -> None:
+            if fp not in issued or stamp < issued[fp]:
+                issued[fp] = stamp
+
+        # A batch moves from `_pending` to `_queued` to `_segments` under
+        # the lock, so the snapshot holds every record exactly once.
+        with self._lock:
+            segments = self._segments
+            pending = [record for batch in self._queued for record in batch]
+            pending.extend(self._pending)
+        for segment in segments:
+            lo = bisect.bisect_left(queries, segment.first)
+            hi = bisect.bisect_right(queries, segment.last, lo)
+            if lo == hi:
+                continue
+            records, stamps = self._read_records(segment)
+            if hi - lo > len(records):
+                # Fewer records than queries: check every record instead.
+                for fp, stamp in zip(records, stamps):
+                    if fp in wanted:
+                        found(fp, stamp)
+                continue
+            j = 0
+            # Both sides are sorted, so every search starts where the
+            # previous one ended.
+            for query in queries[lo:hi]:
+                j = bisect.bisect_left(records, query, j)
+                while j < len(records) and records[j] == query:
+                    found(query, stamps[j])
+                    j += 1
+        if pending:
+            for fp, stamp in pending:
+                if fp in wanted:
+                    found(fp, stamp)
+        return [issued[fp] / 1_000_000 if fp in issued else None for fp in fingerprints]
+
+    def lookup(self, passwords: Iterable[str]) -> List[Optional[float]]:
+        """
+        Find when passwords were issued.
+
+        :param passwords: The passwords.
+        :type passwords: Iterable[str]
+        :return: The time each password was first issued, in seconds since
+                 the epoch, or `None` if it was not.
+        :rtype: List[Optional[float]]
+        :raises SnapshotError: If a segment is corrupt.
+        """
+        return self.lookup_fingerprints(self.fingerprint_many(passwords))
@@ -0,0 +1,359 @@
+import bisect
+import hashlib
+import math
+from typing import Dict, List, Sequence, Union
+
+from passbrew.exceptions import ValidationError
+from passbrew.validation import is_positive_integer
+from passbrew.wordlist import BaseWordIndex
+
+# The largest keyspace, in bits, a `FeistelPermutation` can permute.
+MAX_BITS = 1024
+
+
+def rank_permutation(positions: Sequence[int], n: int) -> int:
+    """
+    Get the rank of a sequence of distinct positions.
+
+    The sequences of `k` distinct positions below `n` are numbered from 0
+    to `math.perm(n, k) - 1` in lexicographic order. Every position is a
+    digit of a mixed-radix number: the first one counts among `n`
+    positions, the second among the `n - 1` positions left, and so on.
+
+    :param positions: The distinct positions.
+    :type positions: Sequence[int]
+    :param n: The amount of positions to choose from.
+    :type n: int
+    :return: The rank of the sequence.
+    :rtype: int
+    :raises ValidationError: If a position is out of range or repeated.
+    """
+    rank = 0
+    used = []
+    for i, position in enumerate(positions):
+        before = bisect.bisect_left(used, position)
+        if not 0 <= position < n or used[before : before + 1] == [position]:
+            raise ValidationError(
+                f"Invalid positions: {list(positions)!r}. Expected distinct "
+                f"positions below {n}."
+            )
+        rank = rank * (n - i) + position - before
+        used.insert(before, position)
+    return rank
+
+
+def unrank_permutation(rank: int, n: int, k: int) -> List[int]:
+    """
+    Get the sequence of distinct positions of a rank.
+
+    This is the inverse of `rank_permutation`.
+
+    :param rank: The rank, below `math.perm(n, k)`.
+    :type rank: int
+    :param n: The amount of positions to choose from.
+    :type n: int
+    :param k: The amount of positions.
+    :type k: int
+    :return: The `k` distinct positions.
+    :rtype: List[int]
+    :raises ValidationError: If the rank is out of range.
+    """
+    size = math.perm(n, k)
+    if not isinstance(rank, int) or not 0 <= rank < size:
+        raise ValidationError(f"Invalid rank: {rank!r}. Expected 0 to {size - 1}.")
+    digits = [0] * k
+    for i in range(k - 1, -1, -1):
+        rank, digits[i] = divmod(rank, n - i)
+    positions = []
+    used = []
+    for digit in digits:
+        # The digit counts the unused positions; skip the used ones below.
+        for position in used:
+            if position > digit:
+                break
+            digit += 1
+        positions.append(digit)
+        bisect.insort(used, digit)
+    return positions
+
+
+class FeistelPermutation:
+    """
+    A keyed pseudorandom permutation of the integers below `size`.
+
+    The integers are enciphered with a balanced Feistel network over the
+    smallest even amount of bits covering `size`, with keyed BLAKE2b as the
+    round function. Results at or above `size` are enciphered again (cycle
+    walking) until they fall into the range, which takes fewer than four
+    encipherings on average because the network's domain is less than four
+    times `size`.
+
+    Without the key the order of the permuted integers cannot be predicted,
+    so the key must be kept secret, and shared by every party walking the
+    same keyspace.
+
+    :param size: The amount of integers permuted.
+    :type size: int
+    :param key: The secret key, 16 to 64 bytes.
+    :type key: bytes
+    :param rounds: The amount of Feistel rounds.
+    :type rounds: int
+    :raises ValidationError: If `size` is not a positive integer or larger
+                             than `2 ** MAX_BITS`, or the key is invalid.
+
+    Attributes
+    ----------
+    size : int
+        The amount of integers permuted.
+    rounds : int
+        The amount of Feistel rounds.
+    """
+
+    __slots__ = ("size", "rounds", "_half", "_mask", "_width", "_round_hashes")
+
+    def __init__(self, size: int, key: bytes, rounds: int = 10) -> None:
+        is_positive_integer(size)
+        is_positive_integer(rounds)
+        if not isinstance(key, bytes) or not 16 <= len(key) <= 64:
+            raise ValidationError("The key must be 16 to 64 bytes.")
+        bits = (size - 1).bit_length()
+        if bits > MAX_BITS:
+            raise ValidationError(
+                f"Keyspace of {bits} bits is larger than {MAX_BITS} bits."
+            )
+        self.size = size
+        self.rounds = rounds
+        self._half = max(1, (bits + 1) // 2)
+        self._mask = (1 << self._half) - 1
+        self._width = (self._half + 7) // 8
+        prefix = size.to_bytes((size.bit_length() + 7) // 8, "little")
+        # One keyed hash per round, bound to the size of the keyspace, is
+        # copied for every call of the round function.
+        self._round_hashes = [
+            hashlib.blake2b(
+                prefix,
+                key=key,
+                digest_size=self._width,
+                salt=r.to_bytes(16, "little"),
+                person=b"passbrew-feistel",
+            )
+            for r in range(rounds)
+        ]
+
+    def _round(self, r: int, value: int) -> int:
+        digest = self._round_hashes[r].copy()
+        digest.update(value.to_bytes(self._width, "little"))
+        return int.from_bytes(digest.digest(), "little") & self._mask
+
+    def _encipher(self, value: int) -> int:
+        half = self._half
+        left, right = value >> half, value & self._mask
+        for r in range(self.rounds):
+            left, right = right, left ^ self._round(r, right)
+        return (left << half) | right
+
+    def _decipher(self, value: int) -> int:
+        half = self._half
+        left, right = value >> half, value & self._mask
+        for r in range(self.rounds - 1, -1, -1):
+            left, right = right ^ self._round(r, left), left
+        return (left << half) | right
+
+    def _check(self, value: int) -> None:
+        if not isinstance(value, int) or not 0 <= value < self.size:
+            raise ValidationError(
+                f"Invalid value: {value!r}. Expected 0 to {self.size - 1}."
+            )
+
+    def permute(self, value: int) -> int:
+        """
+        Map an integer to its place in the permutation.
+
+        :param value: An integer below `size`.
+        :type value: int
+        :return: The permuted integer, below `size`.
+        :rtype: int
+        :raises ValidationError: If `value` is out of range.
+        """
+        self._check(value)
+        value = self._encipher(value)
+        while value >= self.size:
+            value = self._encipher(value)
+        return value
+
+    def invert(self, value: int) -> int:
+        """
+        Map a permuted integer back to the original one.
+
+        :param value: An integer below `size`.
+        :type value: int
+        :return: The integer `permute` maps to `value`.
+        :rtype: int
+        :raises ValidationError: If `value` is out of range.
+        """
+        self._check(value)
+        value = self._decipher(value)
+        while value >= self.size:
+            value = self._decipher(value)
+        return value
+
+
+class PassphraseKeyspace:
+    """
+    The passphrases of `word_count` distinct words of a word index, numbered.
+
+    `unrank` and `rank` map between the integers below `size` and the
+    passphrases, in the lexicographic order of the positions of their words
+    in the index. With a `key`, `issue` walks counters through a
+    `FeistelPermutation` first, so consecutive counters give passphrases
+    that are unique but unpredictable. Nodes issuing passphrases without
+    coordination each take a disjoint `shard` of the counters.
+
+    Passphrases are unique as long as the words of the index are distinct
+    and do not contain the separator. The words are drawn uniformly,
+    ignoring the weights of a `WeightedWordIndex`. `rank` builds a map of
+    every word to its position on first use.
+
+    :param word_index: The words.
+    :type word_index: BaseWordIndex
+    :param word_count: The amount of words of a passphrase.
+    :type word_count: int
+    :param separator: The string between the words.
+    :type separator: str
+    :param key: The secret key of the permutation, 16 to 64 bytes, or
+                `None` to issue passphrases in rank order.
+    :type key: bytes
+    :raises ValidationError: If `word_count` is not a positive integer or
+                             larger than the index, or the key is invalid.
+
+    Attributes
+    ----------
+    word_index : BaseWordIndex
+        The words.
+    word_count : int
+        The amount of words of a passphrase.
+    separator : str
+        The string between the words.
+    size : int
+        The amount of passphrases.
+    permutation : FeistelPermutation
+        The permutation of the counters, or `None`.
+    """
+
+    __slots__ = (
+        "word_index",
+        "word_count",
+        "separator",
+        "size",
+        "permutation",
+        "_positions",
+    )
+
+    def __init__(
+        self,
+        word_index: BaseWordIndex,
+        word_count: int,
+        separator: str = " ",
+        key: bytes = None,
+    ) -> None:
+        is_positive_integer(word_count)
+        if word_count > len(word_index):
+            raise ValidationError(
+                f"Invalid word count: {word_count}. The index has "
+                f"{len(word_index)} words."
+            )
+        self.word_index = word_index
+        self.word_count = word_count
+        self.separator = separator
+        self.size = math.perm(len(word_index), word_count)
+        self.permutation = None if key is None else FeistelPermutation(self.size, key)
+        self._positions: Dict[str, int] = None
+
+    def unrank(self, rank: int) -> str:
+        """
+        Get the passphrase of a rank.
+
+        :param rank: The rank, below `size`.
+        :type rank: int
+        :return: The passphrase.
+        :rtype: str
+        :raises ValidationError: If the rank is out of range.
+        """
+        positions = unrank_permutation(rank, len(self.word_index), self.word_count)
+        return self.separator.join(self.word_index.get_many(positions))
+
+    def rank(self, passphrase: Union[str, Sequence[str]]) -> int:
+        """
+        Get the rank of a passphrase.
+
+        :param passphrase: The passphrase, or its words if the separator is
+                           empty.
+        :type passphrase: Union[str, Sequence[str]]
+        :return: The rank of the passphrase.
+        :rtype: int
+        :raises ValidationError: If the passphrase is not in the keyspace.
+        """
+        if isinstance(passphrase, str):
+            if not self.separator:
+                raise ValidationError(
+                    "Passphrases without separators are ranked by their words."
+                )
+            words = passphrase.split(self.separator)
+        else:
+            words = list(passphrase)
+        if self._positions is None:
+            self._positions = {wrd: i for i, wrd in enumerate(self.word_index)}
+        try:
+            positions = [self._positions[wrd] for wrd in words]
+        except KeyError as e:
+            raise ValidationError(f"Unknown word: {e.args[0]!r}.")
+        if len(positions) != self.word_count:
+            raise ValidationError(
+                f"Expected {self.word_count} words, got {len(positions)}."
+            )
+        return rank_permutation(positions, len(self.word_index))
+
+    def shard(self, node: int, nodes: int) -> range:
+        """
+        Get the counters of one of `nodes` issuing nodes.
+
+        The shards of the nodes are disjoint and together cover the
+        keyspace.
+
+        :param node: The number of the node, from 0 to `nodes - 1`.
+        :type node: int
+        :param nodes: The amount of nodes.
+        :type nodes: int
+        :return: The counters of the node.
+        :rtype: range
+        :raises ValidationError: If `node` is out of range.
+        """
+        is_positive_integer(nodes)
+        if not isinstance(node, int) or not 0 <= node < nodes:
+            raise ValidationError(f"Invalid node: {node!r}. Expected 0 to {nodes - 1}.")
+        return range(node * self.size // nodes, (node + 1) * self.size // nodes)
+
+    def issue(self, counters: Sequence[int]) -> List[str]:
+        """
+        Get the passphrases of counters.
+
+        Every counter is permuted, if the keyspace has a key, and unranked;
+        the words of all passphrases are fetched with one `get_many`.
+
+        :param counters: The counters, each below `size`, e.g. a slice of a
+                         `shard`.
+        :type counters: Sequence[int]
+        :return: One passphrase per counter.
+        :rtype: List[str]
+        :raises ValidationError: If a counter is out of range.
+        """
+        n = len(self.word_index)
+        k = self.word_count
+        if self.permutation is not None:
+            counters = map(self.permutation.permute, counters)
+        positions = []
+        for rank in counters:
+            positions.extend(unrank_permutation(rank, n, k))
+        words = self.word_index.get_many(positions)
+        join = self.separator.join
+        return [join(words[i : i + k]) for i in range(0, len(words), k)]
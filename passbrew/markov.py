@@ -0,0 +1,299 @@
+import hashlib
+import json
+import os
+import random
+import struct
+import zlib
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List
+
+from passbrew.alias import build_alias_table, get_limit, random_words
+from passbrew.exceptions import SnapshotError, ValidationError
+from passbrew.validation import is_positive_integer
+
+MAGIC = b"PBMARKOV"
+FORMAT_VERSION = 1
+
+# The magic, the format version, the CRC32 of the body and the length of
+# the metadata.
+_HEADER = struct.Struct("<8sIIQ")
+_ARRAYS = (
+    "offsets",
+    "totals",
+    "thresholds",
+    "accept_symbols",
+    "accept_states",
+    "alias_symbols",
+    "alias_states",
+)
+
+# Pads the context of the first characters of a word.
+_START = "\x00"
+# The symbol ending a word.
+_END = ""
+# The largest amount of random integers drawn at once.
+_MAX_DRAWS = 1 << 16
+
+
+def get_model_key(words: Iterable[str], order: int) -> str:
+    """
+    Get the key identifying a model trained on `words`.
+
+    :param words: The training words.
+    :type words: Iterable[str]
+    :param order: The order of the model.
+    :type order: int
+    :return: A hexadecimal BLAKE2b digest of the order and the words.
+    :rtype: str
+    """
+    digest = hashlib.blake2b(f"{order}\n".encode("ascii"), digest_size=32)
+    for wrd in words:
+        digest.update(wrd.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def _get_draws(length: int) -> int:
+    # Word ends take a draw without adding a character, about one in eight
+    # draws for English words.
+    return length + length // 4 + 2
+
+
+class MarkovModel:
+    """
+    A character-level Markov model compiled into flat alias tables.
+
+    The model of order `n` predicts a character from the `n` characters
+    before it, with the frequencies of the training words. The successors
+    of every context are compiled into one alias table, and the tables of
+    all contexts are concatenated into flat lists indexed by state, so
+    sampling a character costs one random integer, a division and a
+    comparison. Every entry stores its character and the state that
+    follows, so no context strings are built while sampling.
+
+    When a word ends, sampling continues with a new word; generated text
+    is a run of pronounceable pseudo-words without separators.
+
+    Create models with `train` or `load`.
+
+    Attributes
+    ----------
+    order : int
+        The amount of characters of a context.
+    key : str
+        The key of the training words, see `get_model_key`.
+    symbols : List[str]
+        The characters of the model, after the empty word end symbol.
+    """
+
+    __slots__ = (
+        "order",
+        "key",
+        "symbols",
+        "_arrays",
+        "_states",
+        "_thresholds",
+        "_accept_chars",
+        "_accept_states",
+        "_alias_chars",
+        "_alias_states",
+    )
+
+    def __init__(
+        self, order: int, key: str, symbols: List[str], arrays: Dict[str, list]
+    ) -> None:
+        self.order = order
+        self.key = key
+        self.symbols = symbols
+        self._arrays = arrays
+        offsets = arrays["offsets"]
+        totals = arrays["totals"]
+        # The modulus, rejection limit, total weight and first entry of
+        # every state, unpacked in one step while sampling.
+        self._states = []
+        for state, total in enumerate(totals):
+            modulus = (offsets[state + 1] - offsets[state]) * total
+            self._states.append((modulus, get_limit(modulus), total, offsets[state]))
+        self._thresholds = arrays["thresholds"]
+        self._accept_chars = [symbols[i] for i in arrays["accept_symbols"]]
+        self._accept_states = arrays["accept_states"]
+        self._alias_chars = [symbols[i] for i in arrays["alias_symbols"]]
+        self._alias_states = arrays["alias_states"]
+
+    @classmethod
+    def train(kls, words: Iterable[str], order: int = 2) -> "MarkovModel":
+        """
+        Train a model on words.
+
+        Only alphabetic words are used, in lowercase.
+
+        :param words: The training words.
+        :type words: Iterable[str]
+        :param order: The amount of characters of a context.
+        :type order: int
+        :return: The compiled model.
+        :rtype: MarkovModel
+        :raises ValidationError: If `order` is not a positive integer, or
+                                 there are no alphabetic words.
+        """
+        is_positive_integer(order)
+        words = list(words)
+        counts = {}
+        for wrd in words:
+            if not wrd.isalpha():
+                continue
+            padded = _START * order + wrd.lower()
+            for i in range(order, len(padded)):
+                context = padded[i - order : i]
+                counts.setdefault(context, Counter())[padded[i]] += 1
+            counts.setdefault(padded[-order:], Counter())[_END] += 1
+        if not counts:
+            raise ValidationError("There are no alphabetic words to train on.")
+
+        start = _START * order
+        contexts = [start] + sorted(c for c in counts if c != start)
+        state_ids = {context: i for i, context in enumerate(contexts)}
+        symbols = [_END] + sorted({c for s in counts.values() for c in s} - {_END})
+        symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+
+        def next_state(context, symbol):
+            return 0 if symbol == _END else state_ids[(context + symbol)[-order:]]
+
+        arrays = {name: [] for name in _ARRAYS}
+        arrays["offsets"].append(0)
+        for context in contexts:
+            successors = sorted(counts[context].items())
+            thresholds, aliases, total = build_alias_table([n for _, n in successors])
+            for (symbol, _), threshold, alias in zip(successors, thresholds, aliases):
+                alias_symbol = successors[alias][0]
+                arrays["thresholds"].append(threshold)
+                arrays["accept_symbols"].append(symbol_ids[symbol])
+                arrays["accept_states"].append(next_state(context, symbol))
+                arrays["alias_symbols"].append(symbol_ids[alias_symbol])
+                arrays["alias_states"].append(next_state(context, alias_symbol))
+            arrays["offsets"].append(len(arrays["thresholds"]))
+            arrays["totals"].append(total)
+        return kls(order, get_model_key(words, order), symbols, arrays)
+
+    def save(self, path) -> None:
+        """
+        Save the compiled model.
+
+        The file is written to a temporary name and renamed, so readers
+        never see a partial model.
+
+        :param path: The path of the model file.
+        """
+        metadata = {"order": self.order, "key": self.key, "symbols": self.symbols}
+        body = [array("Q", self._arrays[name]).tobytes() for name in _ARRAYS]
+        metadata["sizes"] = [len(data) for data in body]
+        encoded = json.dumps(metadata, separators=(",", ":")).encode("utf-8")
+        body = b"".join([encoded] + body)
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, zlib.crc32(body), len(encoded))
+
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(kls, path) -> "MarkovModel":
+        """
+        Load a model saved with `save`.
+
+        :param path: The path of the model file.
+        :return: The model.
+        :rtype: MarkovModel
+        :raises SnapshotError: If the file cannot be read or is not a
+                               valid model.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            raise SnapshotError(f"Cannot open model {path}: {e}")
+        if len(data) < _HEADER.size:
+            raise SnapshotError(f"{path} is not a Markov model.")
+        magic, version, crc, size = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path} is not a Markov model.")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Unsupported model format version {version}.")
+        body = memoryview(data)[_HEADER.size :]
+        if zlib.crc32(body) != crc:
+            raise SnapshotError(f"The model {path} is corrupt.")
+
+        metadata = json.loads(bytes(body[:size]))
+        arrays = {}
+        offset = size
+        for name, length in zip(_ARRAYS, metadata["sizes"]):
+            values = array("Q")
+            values.frombytes(body[offset : offset + length])
+            arrays[name] = values.tolist()
+            offset += length
+        return kls(metadata["order"], metadata["key"], metadata["symbols"], arrays)
+
+    def _generate(self, rng: random.Random, length: int, values: Iterator[int]) -> str:
+        states = self._states
+        thresholds = self._thresholds
+        accept_chars = self._accept_chars
+        accept_states = self._accept_states
+        alias_chars = self._alias_chars
+        alias_states = self._alias_states
+        chars = []
+        state = 0
+        while True:
+            for value in values:
+                modulus, limit, total, offset = states[state]
+                if value >= limit:
+                    value = rng.randrange(modulus)
+                column, rest = divmod(value % modulus, total)
+                entry = offset + column
+                if rest < thresholds[entry]:
+                    char = accept_chars[entry]
+                    state = accept_states[entry]
+                else:
+                    char = alias_chars[entry]
+                    state = alias_states[entry]
+                if char:
+                    chars.append(char)
+                    if len(chars) == length:
+                        return "".join(chars)
+            # Word ends consumed more values than expected.
+            values = iter(random_words(rng, length))
+
+    def generate(self, rng: random.Random, length: int) -> str:
+        """
+        Generate pronounceable text.
+
+        :param rng: The random number generator.
+        :type rng: random.Random
+        :param length: The amount of characters.
+        :type length: int
+        :return: Text of exactly `length` characters.
+        :rtype: str
+        """
+        return self._generate(rng, length, iter(random_words(rng, _get_draws(length))))
+
+    def generate_many(self, rng: random.Random, count: int, length: int) -> List[str]:
+        """
+        Generate many texts from a few large reads of random bytes.
+
+        :param rng: The random number generator.
+        :type rng: random.Random
+        :param count: The amount of texts.
+        :type count: int
+        :param length: The amount of characters of every text.
+        :type length: int
+        :return: `count` texts of exactly `length` characters.
+        :rtype: List[str]
+        """
+        texts = []
+        chunk_size = max(1, _MAX_DRAWS // _get_draws(length))
+        while len(texts) < count:
+            chunk = min(count - len(texts), chunk_size)
+            values = iter(random_words(rng, chunk * _get_draws(length)))
+            texts.extend(self._generate(rng, length, values) for _ in range(chunk))
+        return texts
@@ -0,0 +1,289 @@
+import functools
+import itertools
+import math
+import string
+from typing import List, Tuple
+
+from passbrew.alias import get_limit, random_words
+from passbrew.exceptions import ValidationError
+from passbrew.rng import DEFAULT_RNG
+from passbrew.tokens import ALPHANUMERIC, HEX, TokenEngine
+from passbrew.wordlist import BaseWordIndex, WeightedWordIndex
+
+CONSONANTS = "bcdfghjklmnpqrstvwxyz"
+VOWELS = "aeiou"
+SYMBOLS = "!#$%^&*(),.-_+=<>?"
+
+# The characters of the pattern language standing for one random character.
+CHARACTER_CLASSES = {
+    "a": string.ascii_lowercase,
+    "A": string.ascii_uppercase,
+    "c": CONSONANTS,
+    "C": CONSONANTS.upper(),
+    "v": VOWELS,
+    "V": VOWELS.upper(),
+    "d": string.digits,
+    "9": string.digits,
+    "x": HEX,
+    "X": HEX.upper(),
+    "*": ALPHANUMERIC,
+    "S": SYMBOLS,
+}
+
+# The word tokens and the case they give their words.
+WORD_CASES = {
+    "word": str.lower,
+    "Word": str.capitalize,
+    "WORD": str.upper,
+}
+
+
+def _parse_bounds(pattern: str, i: int) -> Tuple[tuple, int]:
+    # Parses an optional `{n}` or `{m,n}` at `i`.
+    if not pattern.startswith("{", i):
+        return None, i
+    end = pattern.find("}", i)
+    if end == -1:
+        raise ValidationError(f"Unclosed '{{' at position {i} of {pattern!r}.")
+    try:
+        bounds = tuple(int(part) for part in pattern[i + 1 : end].split(","))
+    except ValueError:
+        bounds = ()
+    if len(bounds) == 1:
+        bounds *= 2
+    if len(bounds) != 2 or not 0 < bounds[0] <= bounds[1]:
+        raise ValidationError(
+            f"Invalid bounds {pattern[i : end + 1]!r} at position {i} of "
+            f"{pattern!r}. Expected {{n}} or {{m,n}} with 0 < m <= n."
+        )
+    return bounds, end + 1
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_pattern(pattern: str) -> Tuple[tuple, ...]:
+    """
+    Parse a password pattern into its tokens.
+
+    A pattern is a sequence of:
+
+    - `word`, `Word` or `WORD`: a random word in lower, capitalized or
+      upper case, optionally followed by `{n}` or `{m,n}` to only use words
+      of `n` or of `m` to `n` characters,
+    - one of the character classes of `CHARACTER_CLASSES`, e.g. `d` for a
+      digit, `c` for a consonant, `v` for a vowel or `S` for a symbol,
+      optionally followed by `{n}` for `n` characters of the class,
+    - `[...]`: one character of the listed ones, optionally followed by
+      `{n}`,
+    - `\\` followed by any character, which is taken literally,
+    - any other character, which is taken literally.
+
+    For example, `Word-Word-dd-S` gives passwords like `Apple-Tree-42-!`
+    and `ccvcvc99` gives passwords like `brakul07`.
+
+    Adjacent characters of the same class are merged into one token, and
+    adjacent literal characters into one literal. Patterns are parsed
+    once; later calls with the same pattern return the cached tokens.
+
+    :param pattern: The pattern.
+    :type pattern: str
+    :return: The tokens, each `("literal", text)`,
+             `("chars", alphabet, count)` or
+             `("word", min_length, max_length, case)`, where `max_length`
+             is `None` without bounds.
+    :rtype: Tuple[tuple, ...]
+    :raises ValidationError: If the pattern is empty or invalid.
+    """
+    if not isinstance(pattern, str) or not pattern:
+        raise ValidationError(f"Invalid pattern: {pattern!r}.")
+    tokens = []
+    literal = []
+
+    def add(token: tuple) -> None:
+        if literal:
+            tokens.append(("literal", "".join(literal)))
+            literal.clear()
+        if token[0] == "chars" and tokens and tokens[-1][:2] == token[:2]:
+            tokens[-1] = ("chars", token[1], tokens[-1][2] + token[2])
+        else:
+            tokens.append(token)
+
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        case = pattern[i : i + 4]
+        if case in WORD_CASES:
+            bounds, i = _parse_bounds(pattern, i + 4)
+            min_length, max_length = bounds or (1, None)
+            add(("word", min_length, max_length, case))
+            continue
+        if char == "\\":
+            if i + 1 == len(pattern):
+                raise ValidationError(f"Pattern {pattern!r} ends with an escape.")
+            literal.append(pattern[i + 1])
+            i += 2
+            continue
+        if char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                raise ValidationError(f"Unclosed '[' at position {i} of {pattern!r}.")
+            alphabet = pattern[i + 1 : end]
+            if len(set(alphabet)) != len(alphabet) or not alphabet:
+                raise ValidationError(
+                    f"Invalid class {pattern[i : end + 1]!r} at position {i} of "
+                    f"{pattern!r}. Expected distinct characters."
+                )
+            i = end + 1
+        elif char in CHARACTER_CLASSES:
+            alphabet = CHARACTER_CLASSES[char]
+            i += 1
+        elif char in "]{}":
+            raise ValidationError(
+                f"Unexpected {char!r} at position {i} of {pattern!r}."
+            )
+        else:
+            literal.append(char)
+            i += 1
+            continue
+        bounds, end = _parse_bounds(pattern, i)
+        if bounds is not None and bounds[0] != bounds[1]:
+            raise ValidationError(
+                f"Character classes take an exact count, got "
+                f"{pattern[i:end]!r} at position {i} of {pattern!r}."
+            )
+        count = bounds[0] if bounds else 1
+        i = end
+        if len(alphabet) == 1:
+            literal.append(alphabet * count)
+        else:
+            add(("chars", alphabet, count))
+    if literal:
+        tokens.append(("literal", "".join(literal)))
+    return tuple(tokens)
+
+
+class PatternPlan:
+    """
+    A pattern compiled for a word index.
+
+    Compiling resolves everything that does not depend on the random
+    draws: every character class gets a `TokenEngine`, and every word
+    token the range of positions of its words in the index, which is
+    sorted by length, so a word is one uniform draw in that range. The
+    entropy and the lengths of the passwords are computed once.
+
+    `generate` builds a whole batch column by column: every token is drawn
+    for all passwords at once, from a few large reads of the random number
+    generator, and the columns are joined at the end.
+
+    Words are drawn uniformly, so weighted word indexes are not supported.
+
+    :param pattern: The pattern, see `parse_pattern`.
+    :type pattern: str
+    :param word_index: The words of the word tokens.
+    :type word_index: BaseWordIndex
+    :param rng: The random number generator. Defaults to a shared
+                `SecureRandom`.
+    :type rng: random.Random
+    :raises ValidationError: If the pattern is invalid, no word matches the
+                             bounds of a word token, or the index is
+                             weighted.
+
+    Attributes
+    ----------
+    pattern : str
+        The pattern.
+    word_index : BaseWordIndex
+        The words of the word tokens.
+    rng : random.Random
+        The random number generator.
+    entropy : float
+        The entropy of a password in bits.
+    min_length : int
+        The length of the shortest possible password.
+    max_length : int
+        The length of the longest possible password.
+    """
+
+    __slots__ = (
+        "pattern",
+        "word_index",
+        "rng",
+        "entropy",
+        "min_length",
+        "max_length",
+        "_steps",
+    )
+
+    def __init__(self, pattern: str, word_index: BaseWordIndex, rng=None) -> None:
+        tokens = parse_pattern(pattern)
+        self.pattern = pattern
+        self.word_index = word_index
+        self.rng = rng if rng is not None else DEFAULT_RNG
+        self.entropy = 0.0
+        self.min_length = 0
+        self.max_length = 0
+        steps = []
+        for token in tokens:
+            if token[0] == "literal":
+                steps.append(token)
+                self.min_length += len(token[1])
+                self.max_length += len(token[1])
+            elif token[0] == "chars":
+                _, alphabet, count = token
+                steps.append(("chars", TokenEngine(alphabet, self.rng), count))
+                self.entropy += count * math.log2(len(alphabet))
+                self.min_length += count
+                self.max_length += count
+            else:
+                steps.append(self._compile_word(*token[1:]))
+                _, start, size, _ = steps[-1]
+                self.entropy += math.log2(size)
+                self.min_length += len(word_index[start])
+                self.max_length += len(word_index[start + size - 1])
+        self._steps = tuple(steps)
+
+    def _compile_word(self, min_length: int, max_length: int, case: str) -> tuple:
+        index = self.word_index
+        if isinstance(index, WeightedWordIndex):
+            raise ValidationError(
+                "Patterns draw words uniformly and cannot use a weighted index."
+            )
+        start = index.count(min_length - 1)
+        end = len(index) if max_length is None else index.count(max_length)
+        if end <= start:
+            bounds = f"{min_length} to {max_length}" if max_length else min_length
+            raise ValidationError(
+                f"No words of {bounds} characters for pattern {self.pattern!r}."
+            )
+        return ("word", start, end - start, WORD_CASES[case])
+
+    def _draw_words(self, step: tuple, count: int) -> List[str]:
+        _, start, size, case = step
+        limit = get_limit(size)
+        randrange = self.rng.randrange
+        positions = [
+            start + (value % size if value < limit else randrange(size))
+            for value in random_words(self.rng, count)
+        ]
+        return list(map(case, self.word_index.get_many(positions)))
+
+    def generate(self, count: int) -> List[str]:
+        """
+        Generate passwords following the pattern.
+
+        :param count: The amount of passwords.
+        :type count: int
+        :return: A list of `count` passwords.
+        :rtype: List[str]
+        """
+        columns = []
+        for step in self._steps:
+            if step[0] == "literal":
+                columns.append(itertools.repeat(step[1], count))
+            elif step[0] == "chars":
+                columns.append(step[1].tokens(count, step[2]))
+            else:
+                columns.append(self._draw_words(step, count))
+        if len(columns) == 1:
+            return list(columns[0])
+        return ["".join(parts) for parts in zip(*columns)]
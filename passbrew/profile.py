@@ -0,0 +1,397 @@
+import argparse
+import array
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, List, NamedTuple, TextIO
+
+from passbrew.generators.base_generator import BasePasswordGenerator
+from passbrew.generators.computer_friendly import ComputerFriendlyPasswordGenerator
+from passbrew.generators.passphrase import PassphraseGenerator
+from passbrew.generators.policy import PasswordPolicy, PolicyPasswordGenerator
+from passbrew.generators.pronounceable import PronounceablePasswordGenerator
+from passbrew.generators.user_friendly import UserFriendlyPasswordGenerator
+from passbrew.settings import GeneratorSettings
+from passbrew.validation import is_positive_integer
+
+PROFILERS = ("cprofile", "sampling")
+
+
+class AllocationReport(NamedTuple):
+    """
+    The memory allocated by repeated calls of a function.
+
+    Attributes
+    ----------
+    calls : int
+        The amount of calls.
+    mean_peak : float
+        The mean of the bytes allocated at once during a call.
+    max_peak : int
+        The most bytes allocated at once during a call.
+    retained : int
+        The bytes still allocated after all calls.
+    top_lines : List[tracemalloc.StatisticDiff]
+        The source lines allocating most memory over all calls.
+    """
+
+    calls: int
+    mean_peak: float
+    max_peak: int
+    retained: int
+    top_lines: List[tracemalloc.StatisticDiff]
+
+
+def _get_frame_name(code) -> str:
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def _get_function_name(function: tuple) -> str:
+    filename, lineno, name = function
+    if filename == "~":
+        # Built-in functions have no source file.
+        return name
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def _collapse_stats(stats: pstats.Stats) -> Dict[str, float]:
+    """
+    Turn the call graph of a cProfile run into collapsed stacks.
+
+    cProfile records the callers of every function but not whole stacks,
+    so the own time of a function is split among its call paths in
+    proportion to the calls made along every edge. Recursive paths are cut
+    at the first repeated function.
+    """
+    entries = stats.stats
+    stacks = Counter()
+
+    def walk(function, path, weight):
+        callers = entries[function][4] if function in entries else {}
+        callers = {c: v for c, v in callers.items() if c not in path}
+        total = sum(v[1] for v in callers.values())
+        if not total:
+            stacks[";".join(map(_get_function_name, reversed(path)))] += weight
+            return
+        for caller, values in callers.items():
+            walk(caller, path + (caller,), weight * values[1] / total)
+
+    for function, (_, _, tottime, _, _) in entries.items():
+        if tottime:
+            walk(function, (function,), tottime)
+    return dict(stacks)
+
+
+def _run_cprofile(function: Callable, iterations: int) -> Dict[str, float]:
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(iterations):
+        function()
+    profiler.disable()
+    return _collapse_stats(pstats.Stats(profiler))
+
+
+def _run_sampling(
+    function: Callable, iterations: int, interval: float
+) -> Dict[str, float]:
+    stacks = Counter()
+
+    def loop():
+        for _ in range(iterations):
+            function()
+
+    loop_code = loop.__code__
+
+    def record(frame):
+        names = []
+        # Frames below the loop belong to the caller of the profiler.
+        while frame is not None and frame.f_code is not loop_code:
+            names.append(_get_frame_name(frame.f_code))
+            frame = frame.f_back
+        if names and frame is not None:
+            stacks[";".join(reversed(names))] += 1
+
+    if hasattr(signal, "setitimer") and (
+        threading.current_thread() is threading.main_thread()
+    ):
+        # A CPU time timer interrupts the profiled code between two
+        # bytecodes, wherever it is.
+        previous = signal.signal(signal.SIGPROF, lambda _, frame: record(frame))
+        signal.setitimer(signal.ITIMER_PROF, interval, interval)
+        try:
+            loop()
+        finally:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, previous)
+        return dict(stacks)
+
+    # Without timer signals a thread samples the stack. It only gets the
+    # GIL when the profiled code releases it, which overrepresents system
+    # calls such as reading `os.urandom`.
+    thread_id = threading.get_ident()
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(interval):
+            record(sys._current_frames().get(thread_id))
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        loop()
+    finally:
+        done.set()
+        sampler.join()
+    return dict(stacks)
+
+
+def profile_calls(
+    function: Callable,
+    iterations: int,
+    profiler: str = "cprofile",
+    interval: float = 0.001,
+) -> Dict[str, float]:
+    """
+    Profile repeated calls of a function into collapsed stacks.
+
+    The result maps every call stack, written root first as frame names
+    separated by `;`, to its weight. With `"cprofile"` the weight is the
+    own time of the innermost function in seconds, estimated from the
+    call graph. With `"sampling"` the stack is recorded every `interval`
+    seconds of CPU time, using `SIGPROF` where available, and the weight
+    is the amount of samples; this disturbs the run less, but short runs
+    get few samples.
+
+    :param function: The function to call, without arguments.
+    :type function: Callable
+    :param iterations: The amount of calls.
+    :type iterations: int
+    :param profiler: `"cprofile"` or `"sampling"`.
+    :type profiler: str
+    :param interval: The time between two samples in seconds.
+    :type interval: float
+    :return: The weight of every stack.
+    :rtype: Dict[str, float]
+    :raises ValueError: If `profiler` is unknown.
+    """
+    is_positive_integer(iterations)
+    if profiler == "cprofile":
+        return _run_cprofile(function, iterations)
+    if profiler == "sampling":
+        return _run_sampling(function, iterations, interval)
+    raise ValueError(
+        f"Unknown profiler: {profiler!r}. Expected one of {', '.join(PROFILERS)}."
+    )
+
+
+def write_collapsed(stacks: Dict[str, float], file: TextIO, scale: float = 1) -> None:
+    """
+    Write collapsed stacks in the format of `flamegraph.pl` and speedscope.
+
+    Every line holds a stack and its weight, multiplied by `scale` and
+    rounded to an integer. Stacks rounding to zero are left out.
+
+    :param stacks: The weight of every stack, as from `profile_calls`.
+    :type stacks: Dict[str, float]
+    :param file: The file to write to.
+    :type file: TextIO
+    :param scale: The factor of the weights, e.g. `1e6` for microseconds.
+    :type scale: float
+    """
+    for stack, weight in sorted(stacks.items()):
+        count = round(weight * scale)
+        if count:
+            file.write(f"{stack} {count}\n")
+
+
+def trace_allocations(
+    function: Callable, iterations: int, top: int = 10
+) -> AllocationReport:
+    """
+    Measure the memory allocated by repeated calls of a function.
+
+    Allocations are traced with `tracemalloc`, which slows the calls down
+    considerably, so this is run separately from the profilers.
+
+    :param function: The function to call, without arguments.
+    :type function: Callable
+    :param iterations: The amount of calls.
+    :type iterations: int
+    :param top: The amount of source lines in the report.
+    :type top: int
+    :return: The allocations of the calls.
+    :rtype: AllocationReport
+    """
+    is_positive_integer(iterations)
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        # Preallocated, so storing the peaks does not count as retained.
+        peaks = array.array("q", [0]) * iterations
+        before = tracemalloc.take_snapshot()
+        start, _ = tracemalloc.get_traced_memory()
+        for i in range(iterations):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            function()
+            peaks[i] = tracemalloc.get_traced_memory()[1] - current
+        end, _ = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ]
+    stats = after.filter_traces(filters).compare_to(
+        before.filter_traces(filters), "lineno"
+    )
+    return AllocationReport(
+        calls=iterations,
+        mean_peak=sum(peaks) / iterations,
+        max_peak=max(peaks),
+        retained=end - start,
+        top_lines=stats[:top],
+    )
+
+
+def get_generator(
+    name: str,
+    word_list_path=BasePasswordGenerator.DEFAULT_WORD_LIST_PATH,
+    settings: GeneratorSettings = None,
+    policy: PasswordPolicy = None,
+) -> BasePasswordGenerator:
+    """
+    Create a generator by the name used on the command line.
+
+    :param name: `computer-friendly`, `user-friendly`, `passphrase`,
+                 `policy` or `pronounceable`.
+    :type name: str
+    :return: The generator.
+    :rtype: BasePasswordGenerator
+    """
+    kwargs = {"word_list_path": word_list_path, "settings": settings}
+    if name == "computer-friendly":
+        return ComputerFriendlyPasswordGenerator(**kwargs)
+    if name == "user-friendly":
+        return UserFriendlyPasswordGenerator(**kwargs)
+    if name == "passphrase":
+        return PassphraseGenerator(**kwargs)
+    if name == "policy":
+        return PolicyPasswordGenerator(policy, **kwargs)
+    if name == "pronounceable":
+        return PronounceablePasswordGenerator(**kwargs)
+    raise ValueError(f"Unknown generator: {name!r}.")
+
+
+def _print_allocations(report: AllocationReport, file: TextIO) -> None:
+    print(f"Allocations of {report.calls} calls:", file=file)
+    print(f"  mean peak per call: {report.mean_peak:,.0f} B", file=file)
+    print(f"  max peak per call:  {report.max_peak:,} B", file=file)
+    print(f"  retained:           {report.retained:,} B", file=file)
+    for stat in report.top_lines:
+        print(f"  {stat}", file=file)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m passbrew.profile",
+        description="Profile a password generator and write collapsed stacks "
+        "for flamegraphs.",
+    )
+    parser.add_argument(
+        "generator",
+        choices=(
+            "computer-friendly",
+            "user-friendly",
+            "passphrase",
+            "policy",
+            "pronounceable",
+        ),
+    )
+    parser.add_argument("length", type=int, help="The argument of `generate`.")
+    parser.add_argument("-n", "--iterations", type=int, default=10_000)
+    parser.add_argument("--profiler", choices=PROFILERS, default="cprofile")
+    parser.add_argument(
+        "--interval", type=float, default=0.001, help="Seconds between samples."
+    )
+    parser.add_argument(
+        "-o", "--output", help="Collapsed stack output (default: stdout)."
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Also trace the allocations of the calls.",
+    )
+    parser.add_argument(
+        "--word-list", default=BasePasswordGenerator.DEFAULT_WORD_LIST_PATH
+    )
+    parser.add_argument(
+        "--characters",
+        action="store_true",
+        help="Give passphrase lengths in characters instead of words.",
+    )
+    parser.add_argument("--min-length", type=int)
+    parser.add_argument("--max-length", type=int)
+    parser.add_argument("--max-word-count", type=int)
+    parser.add_argument("--min-uppercase", type=int, default=0)
+    parser.add_argument("--no-repeated-class", action="store_true")
+    parser.add_argument("--banned", nargs="*", default=())
+    parser.add_argument("--max-word-length", type=int)
+    args = parser.parse_args(argv)
+
+    settings = GeneratorSettings(
+        min_length=args.min_length,
+        max_length=args.max_length,
+        max_word_count=args.max_word_count,
+    )
+    policy = PasswordPolicy(
+        min_uppercase=args.min_uppercase,
+        no_repeated_class=args.no_repeated_class,
+        banned_substrings=args.banned,
+        max_word_length=args.max_word_length,
+    )
+    generator = get_generator(args.generator, args.word_list, settings, policy)
+    if args.generator == "passphrase":
+        call_args = (args.length, not args.characters)
+    else:
+        call_args = (args.length,)
+
+    def call():
+        generator.generate(*call_args)
+
+    start = time.perf_counter()
+    stacks = profile_calls(call, args.iterations, args.profiler, args.interval)
+    elapsed = time.perf_counter() - start
+    # cProfile weights are seconds; write them as microseconds.
+    scale = 1e6 if args.profiler == "cprofile" else 1
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            write_collapsed(stacks, f, scale)
+    else:
+        write_collapsed(stacks, sys.stdout, scale)
+
+    report = sys.stderr if args.output is None else sys.stdout
+    print(
+        f"{args.iterations} calls in {elapsed:.3f} s "
+        f"({args.iterations / elapsed:,.0f} calls/s under {args.profiler})",
+        file=report,
+    )
+    if args.memory:
+        _print_allocations(trace_allocations(call, args.iterations), report)
+
+
+if __name__ == "__main__":
+    main()
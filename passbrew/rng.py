@@ -0,0 +1,243 @@
+import functools
+import hashlib
+import itertools
+import random
+import struct
+import threading
+import warnings
+from typing import Callable, List, Sequence, Tuple
+
+from passbrew.exceptions import InsecureRandomWarning
+from passbrew.validation import is_integer
+
+
+class SecureRandom(random.SystemRandom):
+    """
+    The default random number generator of the password generators.
+
+    All randomness comes from `os.urandom`, the same source the `secrets`
+    module uses. Instances hold no state, so they cannot be seeded.
+    """
+
+    is_secure = True
+
+
+class SeededRandom(random.Random):
+    """
+    A fast, explicitly seeded random number generator for testing.
+
+    WARNING: This generator is NOT cryptographically secure. Its output is
+    fully determined by the seed and can be predicted from earlier output.
+    Use it only for reproducible tests and benchmarks, never to issue
+    real credentials. Creating one emits an `InsecureRandomWarning`.
+
+    Every instance has its own Mersenne Twister state, so generators using
+    different instances do not affect each other or the global `random`
+    module. Parallel workers should use distinct `stream` numbers with the
+    same seed to get independent, reproducible streams.
+
+    :param seed: The seed of the generator.
+    :type seed: int
+    :param stream: The number of the stream derived from the seed.
+    :type stream: int
+    """
+
+    is_secure = False
+
+    def __init__(self, seed: int, stream: int = 0) -> None:
+        is_integer(seed)
+        is_integer(stream)
+        self.seed_value = seed
+        self.stream = stream
+        warnings.warn(
+            "SeededRandom is not cryptographically secure, "
+            "do not use it to generate real passwords.",
+            InsecureRandomWarning,
+            stacklevel=2,
+        )
+        super().__init__(self._derive_seed(seed, stream))
+
+    @staticmethod
+    def _derive_seed(seed: int, stream: int) -> int:
+        """
+        Mix a seed and a stream number into the seed of one stream.
+
+        Hashing keeps the streams of neighbouring numbers unrelated.
+        """
+        digest = hashlib.blake2b(f"{seed}:{stream}".encode("ascii")).digest()
+        return int.from_bytes(digest, "big")
+
+    def spawn(self, stream: int) -> "SeededRandom":
+        """
+        Create an independent generator with the same seed and another stream.
+
+        :param stream: The number of the new stream.
+        :type stream: int
+        :return: A new seeded generator.
+        :rtype: SeededRandom
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", InsecureRandomWarning)
+            return SeededRandom(self.seed_value, stream)
+
+
+class ThreadLocalRandom(random.Random):
+    """
+    A random number generator with an independent instance per thread.
+
+    Every thread calling it for the first time gets its own generator from
+    `factory`, so threads sharing a password generator never share random
+    number generator state. This matters for stateful generators such as
+    `SeededRandom`, whose methods would otherwise be contended, or lose
+    their reproducibility, when called by several threads, and on
+    free-threaded Python builds, where nothing serializes the calls.
+
+    All methods of `random.Random` are built on `random`, `getrandbits`
+    and `randbytes`, which are forwarded to the instance of the calling
+    thread.
+
+    :param factory: Creates the generator of a thread. Defaults to
+                    `SecureRandom`.
+    :type factory: Callable[[], random.Random]
+    """
+
+    def __init__(self, factory: Callable[[], random.Random] = None) -> None:
+        self._factory = factory or SecureRandom
+        self._local = threading.local()
+        super().__init__()
+
+    @classmethod
+    def seeded(kls, seed: int) -> "ThreadLocalRandom":
+        """
+        Give every thread its own stream of a `SeededRandom`.
+
+        Threads get the streams 0, 1, 2, ... in the order of their first
+        call, so the output is reproducible when the threads start in a
+        fixed order.
+
+        :param seed: The seed of all streams.
+        :type seed: int
+        :return: The per-thread generator.
+        :rtype: ThreadLocalRandom
+        """
+        streams = itertools.count()
+        lock = threading.Lock()
+
+        def factory():
+            with lock:
+                stream = next(streams)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", InsecureRandomWarning)
+                return SeededRandom(seed, stream)
+
+        warnings.warn(
+            "SeededRandom is not cryptographically secure, "
+            "do not use it to generate real passwords.",
+            InsecureRandomWarning,
+            stacklevel=2,
+        )
+        return kls(factory)
+
+    @property
+    def current(self) -> random.Random:
+        """
+        Get the generator of the calling thread.
+
+        :return: The generator, created on first use.
+        :rtype: random.Random
+        """
+        try:
+            return self._local.rng
+        except AttributeError:
+            rng = self._local.rng = self._factory()
+            return rng
+
+    @property
+    def is_secure(self) -> bool:
+        return getattr(self.current, "is_secure", False)
+
+    def seed(self, *args, **kwargs) -> None:
+        # Called by `random.Random.__init__`; the thread instances are
+        # seeded by the factory.
+        return None
+
+    def random(self) -> float:
+        return self.current.random()
+
+    def getrandbits(self, k: int) -> int:
+        return self.current.getrandbits(k)
+
+    def randbytes(self, n: int) -> bytes:
+        return self.current.randbytes(n)
+
+    def getstate(self):
+        raise NotImplementedError("ThreadLocalRandom has no single state.")
+
+    def setstate(self, state):
+        raise NotImplementedError("ThreadLocalRandom has no single state.")
+
+
+@functools.lru_cache(maxsize=None)
+def _get_byte_tables(size: int) -> Tuple[int, bytes, bytes]:
+    # Bytes below `limit` map to `byte % size`; the others are rejected.
+    limit = 256 - 256 % size
+    return limit, bytes(i % size for i in range(256)), bytes(range(limit, 256))
+
+
+def bulk_choices(rng: random.Random, population: Sequence, k: int) -> list:
+    """
+    Choose `k` elements of a population with replacement, in bulk.
+
+    `random.Random.choices` draws a float per element, which costs a system
+    call per element with `SecureRandom`. This draws random bytes in large
+    reads instead and maps them to the population with rejection sampling,
+    so every element is equally likely.
+
+    :param rng: The random number generator.
+    :type rng: random.Random
+    :param population: At most 256 elements to choose from.
+    :type population: Sequence
+    :param k: The amount of elements to choose.
+    :type k: int
+    :return: A list of `k` randomly chosen elements.
+    :rtype: list
+    :raises ValueError: If the population is empty or larger than 256.
+    """
+    size = len(population)
+    if not 0 < size <= 256:
+        raise ValueError(f"Expected 1 to 256 elements, got {size}.")
+    limit, table, rejected = _get_byte_tables(size)
+    indexes = b""
+    while len(indexes) < k:
+        missing = k - len(indexes)
+        # Draw a little more than needed to make a second read unlikely.
+        data = rng.randbytes(missing + missing * (256 - limit) // limit + 8)
+        indexes += data.translate(table, rejected)
+    return [population[i] for i in indexes[:k]]
+
+
+def bulk_randbelow(rng: random.Random, limits: Sequence[int]) -> List[int]:
+    """
+    Draw one random integer below each of many small limits.
+
+    :param rng: The random number generator.
+    :type rng: random.Random
+    :param limits: Positive limits, at most 65536.
+    :type limits: Sequence[int]
+    :return: A random integer `0 <= n < limit` for every limit.
+    :rtype: List[int]
+    """
+    # Read little-endian, so seeded draws are the same on every platform.
+    values = struct.unpack(f"<{len(limits)}H", rng.randbytes(2 * len(limits)))
+    result = []
+    for value, limit in zip(values, limits):
+        if value < 65536 - 65536 % limit:
+            result.append(value % limit)
+        else:
+            result.append(rng.randrange(limit))
+    return result
+
+
+# SecureRandom holds no state, so one instance is shared by all generators
+# that were not given their own.
+DEFAULT_RNG = SecureRandom()
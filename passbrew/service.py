@@ -0,0 +1,336 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+from passbrew.exceptions import ValidationError
+from passbrew.generators.base_generator import BasePasswordGenerator
+from passbrew.generators.computer_friendly import ComputerFriendlyPasswordGenerator
+from passbrew.generators.passphrase import PassphraseGenerator
+from passbrew.generators.user_friendly import UserFriendlyPasswordGenerator
+
+
+class _Request:
+    __slots__ = ("key", "count", "args", "done", "result", "error")
+
+    def __init__(self, name: str, count: int, args: tuple) -> None:
+        self.key = (name, args)
+        self.count = count
+        self.args = args
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BatchCoalescer:
+    """
+    Merge concurrent generation requests into batched generation.
+
+    Requests are queued and served by a single worker thread. The worker
+    takes the first pending request, waits up to `max_delay` seconds for
+    more to arrive (or until `max_batch` passwords are requested), and then
+    calls `generate_batch` once per distinct generator and arguments.
+
+    Generators can be shared between threads, so the single worker is not
+    needed for safety: it exists so concurrent requests end up in one
+    `generate_batch` call, which amortizes the random reads, the blocklist
+    lookup and the issuance log record over the whole batch.
+
+    :param generators: The generators by name.
+    :type generators: Dict[str, BasePasswordGenerator]
+    :param max_batch: The maximum amount of passwords generated at once.
+    :type max_batch: int
+    :param max_delay: The maximum time in seconds a request waits for others.
+    :type max_delay: float
+    """
+
+    def __init__(
+        self,
+        generators: Dict[str, BasePasswordGenerator],
+        max_batch: int = 4096,
+        max_delay: float = 0.001,
+    ) -> None:
+        self.generators = generators
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.requests = 0
+        self.batches = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, name: str, count: int, args: tuple = ()) -> List[str]:
+        """
+        Generate passwords, sharing a batch with concurrent requests.
+
+        :param name: The name of the generator.
+        :type name: str
+        :param count: The amount of passwords.
+        :type count: int
+        :param args: The arguments passed on to `generate`.
+        :type args: tuple
+        :return: A list of `count` passwords.
+        :rtype: List[str]
+        :raises: Any exception raised by the generator.
+        """
+        request = _Request(name, count, args)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def close(self) -> None:
+        """
+        Stop the worker thread once the pending requests are served.
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        pending = [first]
+        total = first.count
+        deadline = time.monotonic() + self.max_delay
+        while total < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)
+                break
+            pending.append(request)
+            total += request.count
+        return pending
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            groups = {}
+            for request in self._collect(first):
+                groups.setdefault(request.key, []).append(request)
+
+            for (name, args), requests in groups.items():
+                self.requests += len(requests)
+                self.batches += 1
+                try:
+                    passwords = self.generators[name].generate_batch(
+                        sum(r.count for r in requests), *args
+                    )
+                except Exception as e:
+                    for request in requests:
+                        request.error = e
+                        request.done.set()
+                    continue
+
+                start = 0
+                for request in requests:
+                    request.result = passwords[start : start + request.count]
+                    start += request.count
+                    request.done.set()
+
+
+class PassbrewRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serve generated passwords over HTTP/1.1 with keep-alive.
+
+    Endpoints, all answering `GET` requests:
+
+    - `/computer-friendly?length=16&count=1`
+    - `/user-friendly?length=20&count=1`
+    - `/passphrase?length=5&count=1&use_word_count=true`
+
+    Up to `stream_threshold` passwords are returned as a JSON object
+    `{"passwords": [...]}`. Larger counts are streamed with chunked
+    transfer encoding as JSON lines, one password per line.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "passbrew"
+    # Headers and body are written separately; with Nagle's algorithm the
+    # body of a keep-alive response would wait for the delayed ACK.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, data: dict) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+
+    def _get_int(self, params: dict, name: str, default: int = None) -> int:
+        values = params.get(name)
+        if not values:
+            if default is None:
+                raise ValidationError(f"Missing parameter: {name}.")
+            return default
+        try:
+            return int(values[0])
+        except ValueError:
+            raise ValidationError(f"Invalid parameter {name}: {values[0]!r}.")
+
+    def _get_args(self, name: str, params: dict) -> tuple:
+        length = self._get_int(params, "length")
+        if name == "passphrase":
+            use_word_count = params.get("use_word_count", ["true"])[0].lower()
+            if use_word_count in ("1", "true", "yes"):
+                return length, True
+            if use_word_count in ("0", "false", "no"):
+                return length, False
+            raise ValidationError(
+                f"Invalid parameter use_word_count: {use_word_count!r}."
+            )
+        return (length,)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        name = url.path.strip("/")
+        if name not in self.server.coalescer.generators:
+            self._send_json(404, {"error": f"Unknown generator: {name!r}."})
+            return
+
+        params = parse_qs(url.query)
+        try:
+            args = self._get_args(name, params)
+            count = self._get_int(params, "count", 1)
+            if not 0 < count <= self.server.max_count:
+                raise ValidationError(
+                    f"Invalid count: {count}. It must be between 1 and {self.server.max_count}."
+                )
+            if count <= self.server.stream_threshold:
+                passwords = self.server.coalescer.submit(name, count, args)
+            else:
+                # Generate the first chunk up front, so invalid arguments are
+                # still reported with a proper status code.
+                chunk_size = self.server.stream_threshold
+                passwords = self.server.coalescer.submit(name, chunk_size, args)
+        except (ValidationError, ValueError, TypeError) as e:
+            # Some generators validate with plain `ValueError`, and arguments
+            # a generator does not take raise `TypeError`.
+            self._send_json(400, {"error": str(e)})
+            return
+
+        if count <= self.server.stream_threshold:
+            self._send_json(200, {"passwords": passwords})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        remaining = count
+        while True:
+            lines = "".join(json.dumps(p) + "\n" for p in passwords)
+            self._write_chunk(lines.encode("utf-8"))
+            remaining -= len(passwords)
+            if not remaining:
+                break
+            passwords = self.server.coalescer.submit(
+                name, min(remaining, chunk_size), args
+            )
+        self._write_chunk(b"")
+
+
+class PassbrewServer(ThreadingHTTPServer):
+    """
+    A threaded HTTP server for the password generators.
+
+    :param address: The host and port to listen on.
+    :type address: Tuple[str, int]
+    :param generators: The generators by name. Defaults to one instance of
+                       each generator, named as in `PassbrewRequestHandler`.
+    :type generators: Dict[str, BasePasswordGenerator]
+    :param stream_threshold: The largest count answered with a single JSON
+                             response, and the chunk size of streams.
+    :type stream_threshold: int
+    :param max_count: The largest count accepted.
+    :type max_count: int
+    :param quiet: Whether to suppress the request log.
+    :type quiet: bool
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        generators: Dict[str, BasePasswordGenerator] = None,
+        stream_threshold: int = 1000,
+        max_count: int = 1_000_000,
+        quiet: bool = False,
+    ) -> None:
+        super().__init__(address, PassbrewRequestHandler)
+        self.coalescer = BatchCoalescer(generators or get_default_generators())
+        self.stream_threshold = stream_threshold
+        self.max_count = max_count
+        self.quiet = quiet
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.coalescer.close()
+
+
+def get_default_generators(
+    word_list_path=BasePasswordGenerator.DEFAULT_WORD_LIST_PATH,
+) -> Dict[str, BasePasswordGenerator]:
+    """
+    Create one instance of each generator.
+
+    :param word_list_path: The word list of the generators.
+    :return: The generators by endpoint name.
+    :rtype: Dict[str, BasePasswordGenerator]
+    """
+    return {
+        "computer-friendly": ComputerFriendlyPasswordGenerator(word_list_path),
+        "user-friendly": UserFriendlyPasswordGenerator(word_list_path),
+        "passphrase": PassphraseGenerator(word_list_path),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m passbrew.service",
+        description="Serve the password generators over HTTP.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--word-list", default=BasePasswordGenerator.DEFAULT_WORD_LIST_PATH
+    )
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    server = PassbrewServer(
+        (args.host, args.port),
+        get_default_generators(args.word_list),
+        quiet=args.quiet,
+    )
+    print(f"Serving passbrew on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
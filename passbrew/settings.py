@@ -0,0 +1,113 @@
+from passbrew.exceptions import ValidationError
+from passbrew.validation import is_positive_integer
+
+
+class GeneratorSettings:
+    """
+    Per-instance settings of a password generator.
+
+    The classmethod setters of the generators (`set_min_length`,
+    `set_char_amount`, ...) change the defaults of every instance of a class.
+    A `GeneratorSettings` object overrides them for the generators it is
+    passed to, which allows many differently configured generators, e.g.
+    one per tenant, to share one class and one word index.
+
+    Settings left as `None` fall back to the class defaults. The object is
+    slotted, so it costs a fixed few dozen bytes per field.
+
+    Attributes
+    ----------
+    min_length : int
+        The minimum length of the generated password.
+    max_length : int
+        The maximum length of the generated password.
+    char_amount : int
+        The amount of special characters in a user-friendly password.
+    num_amount : int
+        The amount of numbers in a user-friendly password.
+    empty_space_amount : int
+        The amount of empty spaces in a user-friendly password.
+    min_word_count : int
+        The minimum amount of words in a passphrase.
+    max_word_count : int
+        The maximum amount of words in a passphrase.
+    """
+
+    __slots__ = (
+        "min_length",
+        "max_length",
+        "char_amount",
+        "num_amount",
+        "empty_space_amount",
+        "min_word_count",
+        "max_word_count",
+    )
+
+    def __init__(
+        self,
+        min_length: int = None,
+        max_length: int = None,
+        char_amount: int = None,
+        num_amount: int = None,
+        empty_space_amount: int = None,
+        min_word_count: int = None,
+        max_word_count: int = None,
+    ) -> None:
+        self.min_length = self._check_amount(min_length)
+        self.max_length = self._check_amount(max_length)
+        self.char_amount = self._check_amount(char_amount)
+        self.num_amount = self._check_amount(num_amount)
+        self.empty_space_amount = self._check_amount(empty_space_amount)
+        self.min_word_count = self._check_amount(min_word_count)
+        self.max_word_count = self._check_amount(max_word_count)
+
+        self._check_range("min_length", min_length, "max_length", max_length)
+        self._check_range(
+            "min_word_count", min_word_count, "max_word_count", max_word_count
+        )
+
+        # Amounts left as `None` add the class defaults on top, so only the
+        # amounts set here can be checked up front.
+        extra_chars = sum(
+            amount
+            for amount in (char_amount, num_amount, empty_space_amount)
+            if amount is not None
+        )
+        if max_length is not None and extra_chars >= max_length:
+            raise ValidationError(
+                f"Total extra characters ({extra_chars}) must be less than "
+                f"{max_length} of `max_length`."
+            )
+
+    @staticmethod
+    def _check_amount(value: int) -> int:
+        """
+        Check that a setting is `None` or a positive integer.
+
+        :raises ValidationError: If the value is not a positive integer.
+        """
+        if value is not None:
+            is_positive_integer(value)
+        return value
+
+    @staticmethod
+    def _check_range(low: str, low_value: int, high: str, high_value: int) -> None:
+        """
+        Check that the lower bound of a range is less than its upper bound.
+
+        :raises ValidationError: If both are set and `low_value` is not less
+                                 than `high_value`.
+        """
+        if None not in (low_value, high_value) and low_value >= high_value:
+            raise ValidationError(
+                f"Value {low_value} of `{low}` must be less than "
+                f"{high_value} of `{high}`."
+            )
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)}"
+            for name in self.__slots__
+            if getattr(self, name) is not None
+        )
+        return f"{type(self).__name__}({fields})"
@@ -0,0 +1,501 @@
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections.abc import Sequence, Set
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+from passbrew.exceptions import SnapshotError
+from passbrew.generators.base_generator import BasePasswordGenerator
+from passbrew.generators.computer_friendly import ComputerFriendlyPasswordGenerator
+from passbrew.generators.passphrase import PassphraseGenerator, PassphraseStyle
+from passbrew.generators.policy import PasswordPolicy, PolicyPasswordGenerator
+from passbrew.generators.user_friendly import UserFriendlyPasswordGenerator
+from passbrew.rng import DEFAULT_RNG
+from passbrew.settings import GeneratorSettings
+from passbrew.tokens import ALPHABETS, URLSAFE, TokenEngine
+from passbrew.wordlist import BaseWordIndex, WeightedWordIndex
+
+MAGIC = b"PBSNAP\x00\x00"
+FORMAT_VERSION = 1
+
+# The magic, the format version, the CRC32 of the metadata and its length.
+_HEADER = struct.Struct("<8sIIQ")
+_ALIGNMENT = 8
+
+GENERATORS = {
+    "computer-friendly": ComputerFriendlyPasswordGenerator,
+    "user-friendly": UserFriendlyPasswordGenerator,
+    "passphrase": PassphraseGenerator,
+    "policy": PolicyPasswordGenerator,
+}
+
+
+class MappedStrings(Sequence):
+    """
+    A read-only sequence of strings stored in a buffer.
+
+    The strings are UTF-8 encoded back to back in `data`, and `offsets`
+    holds the start of every string and the end of the last one. Strings
+    are decoded when they are accessed.
+    """
+
+    __slots__ = ("_data", "_offsets", "_start", "_stop")
+
+    def __init__(self, data, offsets, start: int = 0, stop: int = None) -> None:
+        self._data = data
+        self._offsets = offsets
+        self._start = start
+        self._stop = len(offsets) - 1 if stop is None else stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def _get(self, i: int) -> str:
+        offsets = self._offsets
+        return str(self._data[offsets[i] : offsets[i + 1]], "utf-8")
+
+    def _get_bytes(self, i: int) -> bytes:
+        offsets = self._offsets
+        return bytes(self._data[offsets[i] : offsets[i + 1]])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("MappedStrings index out of range")
+        return self._get(self._start + i)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._start, self._stop):
+            yield self._get(i)
+
+
+class MappedStringSet(Set):
+    """
+    A read-only set of strings stored in a buffer.
+
+    The strings are decoded into a `frozenset` on the first membership
+    test, which is far faster than searching the buffer for every test.
+    """
+
+    __slots__ = ("_strings", "_set")
+
+    def __init__(self, strings: MappedStrings) -> None:
+        self._strings = strings
+        self._set = None
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._strings)
+
+    def __contains__(self, value) -> bool:
+        if self._set is None:
+            self._set = frozenset(self._strings)
+        return value in self._set
+
+
+class MappedWordIndex(BaseWordIndex):
+    """
+    A word index stored in a memory-mapped snapshot.
+
+    Opening it only reads the length table; the words are decoded from the
+    mapped file when they are used.
+
+    Attributes
+    ----------
+    histogram : Dict[int, int]
+        The amount of words per length.
+    """
+
+    def __init__(self, words: MappedStrings, histogram: Dict[int, int]) -> None:
+        self._words = words
+        self.histogram = histogram
+        self._lengths = sorted(histogram)
+        self._ends = []
+        total = 0
+        for length in self._lengths:
+            total += histogram[length]
+            self._ends.append(total)
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __getitem__(self, i):
+        return self._words[i]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._words)
+
+    def count(self, max_length: int) -> int:
+        b = bisect.bisect_right(self._lengths, max_length)
+        return self._ends[b - 1] if b else 0
+
+    def get_many(self, positions: Iterable[int]) -> List[str]:
+        get = self._words._get
+        return [get(i) for i in positions]
+
+    def get_many_encoded(self, positions: Iterable[int]) -> List[bytes]:
+        get = self._words._get_bytes
+        return [get(i) for i in positions]
+
+
+class _LazyTables(dict):
+    """
+    Composition tables decoded from the snapshot on first use.
+    """
+
+    def __init__(self, buffer, sections: Dict[int, list]) -> None:
+        super().__init__()
+        self._buffer = buffer
+        self._sections = sections
+
+    def get(self, length, default=None):
+        if length not in self and length in self._sections:
+            offset, size = self._sections[length]
+            self[length] = json.loads(bytes(self._buffer[offset : offset + size]))
+        return super().get(length, default)
+
+
+def get_checksum(path) -> str:
+    """
+    Get the checksum of a file.
+
+    :param path: The path of the file.
+    :return: The hexadecimal BLAKE2b digest of the contents.
+    :rtype: str
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _get_source(path) -> dict:
+    stat = os.stat(path)
+    return {
+        "path": str(Path(path).resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "checksum": get_checksum(path),
+    }
+
+
+def _is_current(source: dict, path) -> bool:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if stat.st_size != source["size"]:
+        return False
+    if stat.st_mtime_ns == source["mtime_ns"]:
+        return True
+    # Touched but maybe not changed.
+    return get_checksum(path) == source["checksum"]
+
+
+def _get_config(
+    name: str,
+    settings: GeneratorSettings = None,
+    policy: PasswordPolicy = None,
+    style: PassphraseStyle = None,
+    alphabet: str = None,
+) -> dict:
+    def fields(obj):
+        if obj is None:
+            return None
+        return {k: getattr(obj, k) for k in obj.__slots__}
+
+    config = {"generator": name, "settings": fields(settings)}
+    if name == "policy":
+        config["policy"] = fields(policy or PasswordPolicy())
+        config["policy"]["banned_substrings"] = list(
+            config["policy"]["banned_substrings"]
+        )
+    elif name == "passphrase":
+        config["style"] = fields(style or PassphraseStyle())
+    elif name == "computer-friendly":
+        config["alphabet"] = ALPHABETS.get(alphabet, alphabet) or URLSAFE
+    return config
+
+
+def _get_generator_config(generator: BasePasswordGenerator) -> dict:
+    for name, cls in GENERATORS.items():
+        if type(generator) is cls:
+            break
+    else:
+        raise SnapshotError(f"Cannot snapshot a {type(generator).__name__}.")
+    return _get_config(
+        name,
+        generator.settings,
+        getattr(generator, "policy", None),
+        getattr(generator, "style", None),
+        generator.engine.alphabet if name == "computer-friendly" else None,
+    )
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.sections = []
+        self.size = 0
+
+    def add(self, data: bytes) -> list:
+        padding = -self.size % _ALIGNMENT
+        if padding:
+            self.sections.append(b"\x00" * padding)
+            self.size += padding
+        ref = [self.size, len(data)]
+        self.sections.append(data)
+        self.size += len(data)
+        return ref
+
+    def add_strings(self, strings: Iterable[str]) -> dict:
+        encoded = [x.encode("utf-8") for x in strings]
+        offsets = [0]
+        for x in encoded:
+            offsets.append(offsets[-1] + len(x))
+        if offsets[-1] >= 1 << 32:
+            raise SnapshotError("The words of a snapshot must be under 4 GiB.")
+        return {
+            "offsets": self.add(struct.pack(f"<{len(offsets)}I", *offsets)),
+            "data": self.add(b"".join(encoded)),
+        }
+
+
+def save_snapshot(
+    generator: BasePasswordGenerator,
+    path,
+    word_list_path=BasePasswordGenerator.DEFAULT_WORD_LIST_PATH,
+) -> None:
+    """
+    Save a fully initialized generator.
+
+    The snapshot holds the word index, the configuration and, for a
+    `PolicyPasswordGenerator`, the word buckets, the long words and the
+    composition tables of every length between the minimum and maximum
+    password length. The file is written to a temporary name and renamed,
+    so readers never see a partial snapshot.
+
+    :param generator: The generator, not following a word source and
+                      without a `WeightedWordIndex`.
+    :type generator: BasePasswordGenerator
+    :param path: The path of the snapshot.
+    :param word_list_path: The word list the generator was built from. Its
+                           checksum decides whether the snapshot is current.
+    :raises SnapshotError: If the generator cannot be saved.
+    """
+    if generator.word_source is not None:
+        raise SnapshotError("Generators following a word source cannot be saved.")
+    if isinstance(generator.word_index, WeightedWordIndex):
+        raise SnapshotError("Generators with a weighted word index cannot be saved.")
+    metadata = _get_generator_config(generator)
+    metadata["source"] = _get_source(word_list_path)
+
+    writer = _Writer()
+    index = generator.word_index
+    metadata["histogram"] = sorted(index.histogram.items())
+    metadata["words"] = writer.add_strings(index)
+
+    if isinstance(generator, PolicyPasswordGenerator):
+        for length in range(generator.min_length, generator.max_length + 1):
+            try:
+                effective_length = generator._get_effective_password_length(length)
+            except ValueError:
+                continue
+            generator._get_composition_table(effective_length)
+        bucket_words = []
+        buckets = []
+        for length, bucket in generator._buckets.items():
+            buckets.append([length, len(bucket_words), len(bucket_words) + len(bucket)])
+            bucket_words.extend(bucket)
+        metadata["buckets"] = buckets
+        metadata["bucket_words"] = writer.add_strings(bucket_words)
+        metadata["long_words"] = writer.add_strings(generator._long_words)
+        metadata["longest_word"] = generator._longest_word
+        metadata["tables"] = {
+            str(length): writer.add(json.dumps(table, separators=(",", ":")).encode())
+            for length, table in generator._composition_tables.items()
+        }
+
+    encoded = json.dumps(metadata, separators=(",", ":")).encode("utf-8")
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, zlib.crc32(encoded), len(encoded))
+    start = _HEADER.size + len(encoded)
+    start += -start % _ALIGNMENT
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(encoded)
+        f.write(b"\x00" * (start - f.tell()))
+        for section in writer.sections:
+            f.write(section)
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f"Cannot open snapshot {path}: {e}")
+
+    if len(buffer) < _HEADER.size:
+        raise SnapshotError(f"{path} is not a snapshot.")
+    magic, version, crc, size = _HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise SnapshotError(f"{path} is not a snapshot.")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot format version {version}.")
+    encoded = buffer[_HEADER.size : _HEADER.size + size]
+    if zlib.crc32(encoded) != crc:
+        raise SnapshotError(f"The snapshot {path} is corrupt.")
+    metadata = json.loads(encoded)
+
+    # The sections start at the first aligned offset after the metadata.
+    start = _HEADER.size + size
+    start += -start % _ALIGNMENT
+    return metadata, memoryview(buffer)[start:]
+
+
+def _get_strings(view, ref: dict) -> MappedStrings:
+    offset, size = ref["offsets"]
+    offsets = view[offset : offset + size]
+    if sys.byteorder == "little":
+        # The offsets are stored little-endian and used in place.
+        offsets = offsets.cast("I")
+    else:
+        offsets = array("I", bytes(offsets))
+        offsets.byteswap()
+    offset, size = ref["data"]
+    return MappedStrings(view[offset : offset + size], offsets)
+
+
+def load_snapshot(
+    path,
+    word_list_path=BasePasswordGenerator.DEFAULT_WORD_LIST_PATH,
+    rng=None,
+    blocklist=None,
+) -> BasePasswordGenerator:
+    """
+    Restore a generator saved with `save_snapshot`.
+
+    The file is memory-mapped and only its metadata is parsed; words and
+    composition tables are decoded when they are used.
+
+    :param path: The path of the snapshot.
+    :param word_list_path: The word list the snapshot must be built from,
+                           or `None` to skip the check.
+    :param rng: The random number generator of the restored generator.
+    :type rng: random.Random
+    :param blocklist: The blocklist of the restored generator.
+    :type blocklist: Blocklist
+    :return: The restored generator.
+    :rtype: BasePasswordGenerator
+    :raises SnapshotError: If the file is not a valid snapshot, or the word
+                           list changed since it was saved.
+    """
+    metadata, view = _read(path)
+    if word_list_path is not None and not _is_current(
+        metadata["source"], word_list_path
+    ):
+        raise SnapshotError(f"The word list {word_list_path} changed.")
+
+    cls = GENERATORS[metadata["generator"]]
+    generator = cls.__new__(cls)
+    generator.word_index = MappedWordIndex(
+        _get_strings(view, metadata["words"]), dict(metadata["histogram"])
+    )
+    generator.word_source = None
+    generator.blocklist = blocklist
+    generator.issuance_log = None
+    generator.rng = rng if rng is not None else DEFAULT_RNG
+    settings = metadata["settings"]
+    generator.settings = GeneratorSettings(**settings) if settings else None
+    generator._check_settings()
+
+    if cls is PolicyPasswordGenerator:
+        generator.policy = PasswordPolicy(**metadata["policy"])
+        bucket_words = _get_strings(view, metadata["bucket_words"])
+        generator._buckets = {
+            length: MappedStrings(bucket_words._data, bucket_words._offsets, a, b)
+            for length, a, b in metadata["buckets"]
+        }
+        long_words = _get_strings(view, metadata["long_words"])
+        generator._long_words = MappedStringSet(long_words)
+        generator._longest_word = metadata["longest_word"]
+        generator._composition_tables = _LazyTables(
+            view, {int(k): v for k, v in metadata["tables"].items()}
+        )
+        generator.attempts = 0
+        generator.rejections = {}
+        generator._stats_lock = threading.Lock()
+    elif cls is PassphraseGenerator:
+        generator.style = PassphraseStyle(**metadata["style"])
+    elif cls is ComputerFriendlyPasswordGenerator:
+        generator.engine = TokenEngine(metadata["alphabet"], generator.rng)
+    return generator
+
+
+def warm_start(
+    path,
+    generator: str,
+    word_list_path=BasePasswordGenerator.DEFAULT_WORD_LIST_PATH,
+    settings: GeneratorSettings = None,
+    policy: PasswordPolicy = None,
+    style: PassphraseStyle = None,
+    alphabet: str = None,
+    rng=None,
+    blocklist=None,
+) -> BasePasswordGenerator:
+    """
+    Restore a generator from a snapshot, or build it and save a snapshot.
+
+    The snapshot is used if it is valid, was built from the current
+    contents of the word list and holds the same configuration. Otherwise
+    the generator is built from the word list and the snapshot replaced.
+
+    :param path: The path of the snapshot.
+    :param generator: The name of the generator, a key of `GENERATORS`.
+    :type generator: str
+    :param word_list_path: The path of the word list.
+    :return: The generator.
+    :rtype: BasePasswordGenerator
+    """
+    config = _get_config(generator, settings, policy, style, alphabet)
+    try:
+        restored = load_snapshot(path, word_list_path, rng, blocklist)
+        if _get_generator_config(restored) == config:
+            return restored
+    except SnapshotError:
+        pass
+
+    kwargs = {
+        "word_list_path": word_list_path,
+        "blocklist": blocklist,
+        "rng": rng,
+        "settings": settings,
+    }
+    if generator == "policy":
+        built = PolicyPasswordGenerator(policy, **kwargs)
+    elif generator == "passphrase":
+        built = PassphraseGenerator(style=style, **kwargs)
+    elif generator == "computer-friendly":
+        built = ComputerFriendlyPasswordGenerator(
+            alphabet=alphabet or URLSAFE, **kwargs
+        )
+    else:
+        built = GENERATORS[generator](**kwargs)
+    save_snapshot(built, path, word_list_path)
+    return built
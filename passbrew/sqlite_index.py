@@ -0,0 +1,241 @@
+import argparse
+import bisect
+import itertools
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List
+
+from passbrew.validation import is_positive_integer
+from passbrew.wordlist import BaseWordIndex
+
+# SQLite limits the amount of parameters of a statement.
+_MAX_PARAMETERS = 500
+
+_SCHEMA = """
+CREATE TABLE words (
+    rank INTEGER PRIMARY KEY,
+    word TEXT NOT NULL
+);
+CREATE TABLE lengths (
+    length INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL,
+    end_rank INTEGER NOT NULL
+);
+"""
+
+
+def build_sqlite_word_index(
+    words: Iterable[str], path, batch_size: int = 10_000
+) -> int:
+    """
+    Write a word list into an SQLite database for `SQLiteWordIndex`.
+
+    The words are deduplicated and ranked by length and then
+    alphabetically. Ranks are the integer primary key, so the words up to
+    a length are the ranks below the `end_rank` of that length in the
+    `lengths` table, and a word is found by rank with one index lookup.
+
+    :param words: The words. Blank lines are skipped.
+    :type words: Iterable[str]
+    :param path: The path of the new database. An existing file is
+                 replaced.
+    :param batch_size: The amount of words inserted per statement.
+    :type batch_size: int
+    :return: The amount of words written.
+    :rtype: int
+    """
+    is_positive_integer(batch_size)
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            connection.executescript(
+                "DROP TABLE IF EXISTS words; DROP TABLE IF EXISTS lengths;"
+                "DROP TABLE IF EXISTS staging;"
+                "CREATE TEMP TABLE staging (word TEXT PRIMARY KEY) WITHOUT ROWID;"
+                + _SCHEMA
+            )
+            stripped = (w.strip() for w in words)
+            rows = ((w,) for w in stripped if w)
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    break
+                connection.executemany(
+                    "INSERT OR IGNORE INTO staging (word) VALUES (?)", batch
+                )
+            connection.execute(
+                "INSERT INTO words (rank, word) "
+                "SELECT ROW_NUMBER() OVER (ORDER BY length(word), word) - 1, word "
+                "FROM staging"
+            )
+            connection.execute(
+                "INSERT INTO lengths (length, count, end_rank) "
+                "SELECT length(word), COUNT(*), MAX(rank) + 1 "
+                "FROM words GROUP BY length(word)"
+            )
+            connection.execute("DROP TABLE staging")
+        connection.execute("VACUUM")
+        return connection.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+    finally:
+        connection.close()
+
+
+class SQLiteWordIndex(BaseWordIndex):
+    """
+    A word index stored in an SQLite database.
+
+    Only the length table is kept in memory, so dictionaries of millions of
+    words can be shared by many processes without loading them. Random
+    picks query one word by rank, samples fetch all their words in one
+    query, and recently used words are kept in a small LRU cache; short
+    words, which end most user-friendly passwords, mostly come from it.
+
+    The connection is shared by all threads of the process and guarded by
+    a lock. Create the database with `build_sqlite_word_index` or
+    `python -m passbrew.sqlite_index`.
+
+    :param path: The path of the database.
+    :param cache_size: The maximum amount of cached words.
+    :type cache_size: int
+
+    Attributes
+    ----------
+    histogram : Dict[int, int]
+        The amount of words per length.
+    hits : int
+        The amount of words served from the cache.
+    misses : int
+        The amount of words fetched from the database.
+    """
+
+    def __init__(self, path, cache_size: int = 4096) -> None:
+        is_positive_integer(cache_size)
+        self.path = path
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            f"file:{path}?mode=ro", uri=True, check_same_thread=False
+        )
+        rows = self._connection.execute(
+            "SELECT length, count, end_rank FROM lengths ORDER BY length"
+        ).fetchall()
+        self.histogram: Dict[int, int] = {length: count for length, count, _ in rows}
+        self._lengths = [length for length, _, _ in rows]
+        self._ends = [end for _, _, end in rows]
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self._connection.close()
+
+    def __enter__(self) -> "SQLiteWordIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._ends[-1] if self._ends else 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.get_many(range(*i.indices(len(self))))
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("SQLiteWordIndex index out of range")
+        return self.get_many((i,))[0]
+
+    def __iter__(self) -> Iterator[str]:
+        # Words are read in pages, without going through the cache.
+        start = 0
+        while start < len(self):
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT word FROM words WHERE rank >= ? ORDER BY rank LIMIT 10000",
+                    (start,),
+                ).fetchall()
+            if not rows:
+                return
+            for (wrd,) in rows:
+                yield wrd
+            start += len(rows)
+
+    @property
+    def words(self) -> "SQLiteWordIndex":
+        """
+        Get all words, sorted by length.
+
+        The index itself is returned, so the words are not loaded into
+        memory; iterating over it reads them in pages.
+
+        :return: The index.
+        :rtype: SQLiteWordIndex
+        """
+        return self
+
+    def count(self, max_length: int) -> int:
+        b = bisect.bisect_right(self._lengths, max_length)
+        return self._ends[b - 1] if b else 0
+
+    def get_many(self, positions: Iterable[int]) -> List[str]:
+        positions = list(positions)
+        with self._lock:
+            cache = self._cache
+            found = {}
+            missing = []
+            for i in positions:
+                wrd = cache.get(i)
+                if wrd is None:
+                    missing.append(i)
+                else:
+                    cache.move_to_end(i)
+                    found[i] = wrd
+            self.hits += len(positions) - len(missing)
+
+            missing = list(dict.fromkeys(missing))
+            self.misses += len(missing)
+            for start in range(0, len(missing), _MAX_PARAMETERS):
+                chunk = missing[start : start + _MAX_PARAMETERS]
+                rows = self._connection.execute(
+                    "SELECT rank, word FROM words WHERE rank IN (%s)"
+                    % ",".join("?" * len(chunk)),
+                    chunk,
+                ).fetchall()
+                for rank, wrd in rows:
+                    found[rank] = wrd
+                    cache[rank] = wrd
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+        try:
+            return [found[i] for i in positions]
+        except KeyError as e:
+            raise IndexError(f"No word at position {e.args[0]}.")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m passbrew.sqlite_index",
+        description="Store a word list in an SQLite database.",
+    )
+    parser.add_argument("input", nargs="+", help="Word lists, one word per line.")
+    parser.add_argument("-o", "--output", required=True, help="Output database.")
+    args = parser.parse_args(argv)
+
+    def lines():
+        for path in args.input:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                yield from f
+
+    count = build_sqlite_word_index(lines(), args.output)
+    print(f"{count} words written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
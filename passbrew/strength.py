@@ -0,0 +1,321 @@
+import bisect
+import math
+import re
+import threading
+import weakref
+from collections import OrderedDict, deque
+from typing import Iterable, List, NamedTuple, Sequence
+
+from passbrew.validation import is_positive_integer
+
+# Characters commonly substituted for letters, folded back before matching.
+LEET_SUBSTITUTIONS = {
+    "4": "a",
+    "@": "a",
+    "8": "b",
+    "(": "c",
+    "3": "e",
+    "6": "g",
+    "1": "i",
+    "!": "i",
+    "|": "i",
+    "0": "o",
+    "5": "s",
+    "$": "s",
+    "7": "t",
+    "+": "t",
+    "2": "z",
+}
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+# Code 0 is reserved for characters that cannot be part of a word. The rows
+# of the transition table are wide enough for every code that can come out
+# of `_encode`, so the hot loop needs no bounds checks.
+_CODES = len(ALPHABET) + 1
+_WIDTH = 64
+
+_DIGIT_RE = re.compile(r"\d")
+
+_SCORE_THRESHOLDS = (28, 36, 60, 80)
+
+# Entropy per character, indexed by a bit mask of the character classes
+# present: lowercase, uppercase, digits, other.
+_POOL_BITS = tuple(
+    math.log2(
+        max(
+            (26 if flags & 1 else 0)
+            + (26 if flags & 2 else 0)
+            + (10 if flags & 4 else 0)
+            + (33 if flags & 8 else 0),
+            2,
+        )
+    )
+    for flags in range(16)
+)
+
+# The checkers of the most recently used word lists, see `get_checker`.
+_CACHE_SIZE = 8
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class StrengthResult(NamedTuple):
+    """
+    The outcome of a password strength check.
+
+    score : int
+        The strength of the password from 0 (very weak) to 4 (very strong).
+    entropy : float
+        The estimated entropy of the password in bits.
+    covered : int
+        The amount of characters covered by dictionary words.
+    word_count : int
+        The amount of dictionary words found in the password.
+    """
+
+    score: int
+    entropy: float
+    covered: int
+    word_count: int
+
+
+def _get_translation_table() -> dict:
+    """
+    Build a `str.translate` table mapping characters to automaton codes.
+
+    Letters of both cases map to codes 1-26, leetspeak substitutions map to
+    the code of the letter they stand for, everything else maps to code 0.
+    """
+    table = {i: 0 for i in range(256)}
+    for code, letter in enumerate(ALPHABET, start=1):
+        table[ord(letter)] = code
+        table[ord(letter.upper())] = code
+    for char, letter in LEET_SUBSTITUTIONS.items():
+        table[ord(char)] = ALPHABET.index(letter) + 1
+    return table
+
+
+_TRANSLATION_TABLE = _get_translation_table()
+
+
+def _encode(password: str) -> bytes:
+    """
+    Convert a password into automaton codes, one byte per character.
+
+    Characters outside of latin-1 are encoded as `?`, whose code is below
+    `_WIDTH` and leads back to the root state.
+    """
+    return password.translate(_TRANSLATION_TABLE).encode("latin-1", "replace")
+
+
+class StrengthChecker:
+    """
+    A password strength checker that finds dictionary words in passwords.
+
+    The words are compiled into an Aho-Corasick automaton, flattened into
+    a deterministic transition table, so every character of a password costs
+    a single list lookup no matter how many words the dictionary holds.
+    States are stored premultiplied by the row width of the table.
+    Matching is case insensitive and folds common leetspeak substitutions.
+
+    Building the automaton is expensive, use `get_checker` to share one
+    checker per word list.
+
+    Methods
+    -------
+    check(password: str) -> StrengthResult
+        Score a single password.
+    check_batch(passwords: Iterable[str]) -> List[StrengthResult]
+        Score many passwords.
+    find_words(password: str) -> List[str]
+        Get the dictionary words found in a password.
+    """
+
+    def __init__(self, words: Iterable[str], min_word_length: int = 3) -> None:
+        is_positive_integer(min_word_length)
+        self.min_word_length = min_word_length
+        words = {
+            x.lower()
+            for x in words
+            if len(x) >= min_word_length and x.isascii() and x.isalpha()
+        }
+        self.word_count = len(words)
+        self._word_bits = math.log2(max(self.word_count, 2))
+        self._build(words)
+
+    def _build(self, words: Iterable[str]) -> None:
+        """
+        Build the flat transition table and the match lengths.
+
+        `longest[state]` is the length of the longest word ending in a
+        state, indexed by the premultiplied state like the table itself.
+
+        :param words: The lowercase words to be matched.
+        :type words: Iterable[str]
+        :return: None
+        """
+        goto = [{}]
+        longest = [0]
+        for wrd in words:
+            state = 0
+            for char in wrd:
+                code = ALPHABET.index(char) + 1
+                nxt = goto[state].get(code)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][code] = nxt
+                    goto.append({})
+                    longest.append(0)
+                state = nxt
+            longest[state] = len(wrd)
+
+        delta = [0] * (len(goto) * _WIDTH)
+        fail = [0] * len(goto)
+        queue = deque()
+        for code, nxt in goto[0].items():
+            delta[code] = nxt * _WIDTH
+            queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            longest[state] = max(longest[state], longest[fail[state]])
+            base = state * _WIDTH
+            fail_base = fail[state] * _WIDTH
+            for code in range(1, _CODES):
+                nxt = goto[state].get(code)
+                if nxt is None:
+                    delta[base + code] = delta[fail_base + code]
+                else:
+                    fail[nxt] = delta[fail_base + code] // _WIDTH
+                    delta[base + code] = nxt * _WIDTH
+                    queue.append(nxt)
+
+        self._delta = delta
+        self._longest = [0] * len(delta)
+        for state, length in enumerate(longest):
+            self._longest[state * _WIDTH] = length
+
+    def check(self, password: str) -> StrengthResult:
+        """
+        Score a password.
+
+        :param password: The password to be checked.
+        :type password: str
+        :return: The strength of the password.
+        :rtype: StrengthResult
+        """
+        return self.check_batch((password,))[0]
+
+    def check_batch(self, passwords: Iterable[str]) -> List[StrengthResult]:
+        """
+        Score many passwords.
+
+        Characters outside of dictionary words are counted at the full
+        entropy of the character pool in use, every dictionary word is
+        counted as one pick from the dictionary. The entropy is converted
+        into a score using `_SCORE_THRESHOLDS`.
+
+        :param passwords: The passwords to be checked.
+        :type passwords: Iterable[str]
+        :return: The strength of every password, in order.
+        :rtype: List[StrengthResult]
+        """
+        delta = self._delta
+        longest = self._longest
+        word_bits = self._word_bits
+        pool_bits = _POOL_BITS
+        digit_search = _DIGIT_RE.search
+        results = []
+        append = results.append
+        for password in passwords:
+            state = 0
+            mask = 0
+            frontier = -1
+            word_count = 0
+            for i, code in enumerate(_encode(password)):
+                state = delta[state + code]
+                length = longest[state]
+                if length:
+                    start = i - length + 1
+                    mask |= ((1 << length) - 1) << start
+                    if start > frontier:
+                        word_count += 1
+                    frontier = i
+
+            covered = bin(mask).count("1")
+            pool = pool_bits[
+                (password != password.upper())
+                | (password != password.lower()) << 1
+                | (digit_search(password) is not None) << 2
+                | (not password.isalnum()) << 3
+            ]
+            entropy = (len(password) - covered) * pool + word_count * word_bits
+            score = bisect.bisect_right(_SCORE_THRESHOLDS, entropy)
+            append(StrengthResult(score, entropy, covered, word_count))
+        return results
+
+    def find_words(self, password: str) -> List[str]:
+        """
+        Get the longest dictionary word ending at every matched position.
+
+        The words are returned in their folded (lowercase, de-leeted) form.
+
+        :param password: The password to be scanned.
+        :type password: str
+        :return: A list of words in order of appearance.
+        :rtype: List[str]
+        """
+        codes = _encode(password)
+        folded = "".join(ALPHABET[c - 1] if 0 < c < _CODES else " " for c in codes)
+        state = 0
+        found = []
+        for i, code in enumerate(codes):
+            state = self._delta[state + code]
+            length = self._longest[state]
+            if length:
+                found.append(folded[i - length + 1 : i + 1])
+        return found
+
+
+def get_checker(words: Sequence[str], min_word_length: int = 3) -> StrengthChecker:
+    """
+    Get a strength checker for a word list, building it only once.
+
+    The checkers of the last few word lists are cached by the identity of
+    the list, and by its `version` if it is a `WordList`, so a `WordList`
+    that changed gets a new checker. Other sequences, such as the `words`
+    of a word index, are expected not to change. Generators sharing a word
+    index share one automaton.
+
+    :param words: The dictionary, e.g. `BasePasswordGenerator.words`.
+    :type words: Sequence[str]
+    :param min_word_length: The minimum length of a word to be matched.
+    :type min_word_length: int
+    :return: The strength checker for the word list.
+    :rtype: StrengthChecker
+    """
+    key = (id(words), min_word_length)
+    version = getattr(words, "version", None)
+    with _cache_lock:
+        entry = _cache.get(key)
+        # A different list can only have the id of one that was freed.
+        if entry is not None and entry[0]() is words and entry[1] == version:
+            _cache.move_to_end(key)
+            return entry[2]
+
+    checker = StrengthChecker(words, min_word_length)
+    with _cache_lock:
+        _cache[key] = (_reference(words), version, checker)
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return checker
+
+
+def _reference(words: Sequence[str]):
+    try:
+        return weakref.ref(words)
+    except TypeError:
+        # Plain lists cannot be referenced weakly. The entry keeps them
+        # alive instead, so their id is not reused while it is cached.
+        return lambda: words
@@ -0,0 +1,132 @@
+import math
+import string
+from typing import List
+
+from passbrew.exceptions import ValidationError
+from passbrew.rng import DEFAULT_RNG
+from passbrew.validation import is_positive_integer
+
+HEX = "0123456789abcdef"
+BASE32 = string.ascii_uppercase + "234567"
+URLSAFE = string.ascii_letters + string.digits + "-_"
+ALPHANUMERIC = string.ascii_letters + string.digits
+
+ALPHABETS = {
+    "hex": HEX,
+    "base32": BASE32,
+    "urlsafe": URLSAFE,
+    "alphanumeric": ALPHANUMERIC,
+}
+
+# The largest single read from the random number generator.
+_MAX_READ = 1 << 22
+
+
+class TokenEngine:
+    """
+    Generate random tokens of an exact length from an alphabet.
+
+    Random bytes are read in bulk and mapped to the alphabet with one
+    `bytes.translate` call per read: a byte `b` becomes `alphabet[b % n]`,
+    and the bytes at or above the largest multiple of `n` are deleted, so
+    every character is equally likely. Alphabets of 16, 32, 64, 128 or 256
+    characters use every byte.
+
+    Nothing is kept between calls: characters read beyond a call's need
+    are discarded, so no future secrets stay in memory and a forked child
+    never repeats the tokens of its parent. Batches of tokens should be
+    generated with `tokens`, which takes them all from one read.
+
+    :param alphabet: The characters of the tokens, a name from `ALPHABETS`
+                     or a string of 2 to 256 distinct characters with code
+                     points below 256.
+    :type alphabet: str
+    :param rng: The random number generator. Defaults to a shared
+                `SecureRandom`.
+    :type rng: random.Random
+    """
+
+    __slots__ = ("alphabet", "rng", "_table", "_rejected", "_ratio")
+
+    def __init__(self, alphabet: str = URLSAFE, rng=None) -> None:
+        alphabet = ALPHABETS.get(alphabet, alphabet)
+        if not isinstance(alphabet, str) or not 2 <= len(alphabet) <= 256:
+            raise ValidationError(
+                f"Invalid alphabet: {alphabet!r}. Expected 2 to 256 characters "
+                f"or one of {', '.join(ALPHABETS)}."
+            )
+        if len(set(alphabet)) != len(alphabet):
+            raise ValidationError(f"Alphabet {alphabet!r} repeats characters.")
+        try:
+            encoded = alphabet.encode("latin-1")
+        except UnicodeEncodeError:
+            raise ValidationError(
+                f"Alphabet {alphabet!r} has characters above code point 255."
+            )
+
+        size = len(alphabet)
+        limit = 256 - 256 % size
+        self.alphabet = alphabet
+        self.rng = rng if rng is not None else DEFAULT_RNG
+        self._table = bytes(encoded[b % size] for b in range(256))
+        self._rejected = bytes(range(limit, 256))
+        # The expected amount of bytes read per character.
+        self._ratio = 256 / limit
+
+    @property
+    def bits_per_character(self) -> float:
+        """
+        Get the entropy of one character of a token.
+
+        :return: The entropy in bits.
+        :rtype: float
+        """
+        return math.log2(len(self.alphabet))
+
+    def _read(self, amount: int) -> str:
+        """
+        Read exactly `amount` random characters.
+        """
+        parts = []
+        missing = amount
+        while missing > 0:
+            # A little more than the expected need, so a second read for
+            # the few rejected bytes is unlikely.
+            size = min(_MAX_READ, int(missing * self._ratio) + 64)
+            data = self.rng.randbytes(size).translate(self._table, self._rejected)
+            parts.append(data.decode("latin-1"))
+            missing -= len(data)
+        if missing < 0:
+            parts[-1] = parts[-1][:missing]
+        return "".join(parts)
+
+    def token(self, length: int) -> str:
+        """
+        Generate one token.
+
+        :param length: The length of the token.
+        :type length: int
+        :return: A random token of exactly `length` characters.
+        :rtype: str
+        :raises ValidationError: If `length` is not a positive integer.
+        """
+        is_positive_integer(length)
+        return self._read(length)
+
+    def tokens(self, count: int, length: int) -> List[str]:
+        """
+        Generate many tokens from a few large reads.
+
+        :param count: The amount of tokens.
+        :type count: int
+        :param length: The length of every token.
+        :type length: int
+        :return: A list of `count` random tokens of `length` characters.
+        :rtype: List[str]
+        :raises ValidationError: If `count` or `length` is not a positive
+                                 integer.
+        """
+        is_positive_integer(count)
+        is_positive_integer(length)
+        chars = self._read(count * length)
+        return [chars[i : i + length] for i in range(0, count * length, length)]
@@ -1,4 +1,7 @@
-from typing import List
+import threading
+import weakref
+from collections import OrderedDict
+from typing import List, Tuple
 
 from passbrew.validation import is_list_of_strings, is_positive_integer
 
@@ -23,13 +26,170 @@ def filter_list(lst: List[str], max_length: int) -> List[str]:
              `ValidationError` if `max_length` is 0, negative number,
              or not an int.
 
+    A `WordList` is only filtered once per version and maximum length, see
+    `cached_filter_list`; the result is a new list either way.
     """
+    if isinstance(lst, WordList):
+        return list(_FILTER_CACHE.get(lst, max_length))
+    return _filter_list(lst, max_length)
+
+
+def _filter_list(lst: List[str], max_length: int) -> List[str]:
     if is_list_of_strings(lst) and is_positive_integer(max_length):
         return [x for x in lst if len(x) <= max_length]
     else:
         raise TypeError(f"Input should be a list of string. Recieved: {type(lst)}")
 
 
+def _counts_modifications(name):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        # Bumped after the change, so a reader never caches the old words
+        # under the new version.
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.version += 1
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+class WordList(list):
+    """
+    A list of words that counts its modifications.
+
+    `version` is incremented by every method that changes the list, which
+    lets `cached_filter_list` notice a change without looking at the words,
+    and the list can be referenced weakly, so caches do not keep it alive.
+    Assigning to the list from outside these methods, e.g. through
+    `list.append(word_list, ...)`, is not noticed.
+    """
+
+    __slots__ = ("version", "__weakref__")
+
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+        self.version = 0
+
+    __setitem__ = _counts_modifications("__setitem__")
+    __delitem__ = _counts_modifications("__delitem__")
+    __iadd__ = _counts_modifications("__iadd__")
+    __imul__ = _counts_modifications("__imul__")
+    append = _counts_modifications("append")
+    extend = _counts_modifications("extend")
+    insert = _counts_modifications("insert")
+    pop = _counts_modifications("pop")
+    remove = _counts_modifications("remove")
+    clear = _counts_modifications("clear")
+    sort = _counts_modifications("sort")
+    reverse = _counts_modifications("reverse")
+
+
+class FilterCache:
+    """
+    A bounded LRU cache of `filter_list` results of `WordList` objects.
+
+    Results are keyed by the identity of the list and the maximum length,
+    and store the `version` of the list they were built from. An entry
+    whose version no longer matches is rebuilt, so changes to the list
+    invalidate its results in constant time. Entries only reference their
+    list weakly: a list that is no longer used elsewhere is freed, and its
+    entries are never hit again and are evicted in LRU order.
+
+    Other lists cannot be checked for changes without a pass over their
+    words, which is the cost the cache saves, so they are filtered on every
+    call.
+
+    Results are returned as tuples shared by all callers, which cannot be
+    modified by accident.
+
+    :param maxsize: The maximum amount of cached results.
+    :type maxsize: int
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        is_positive_integer(maxsize)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, lst: List[str], max_length: int) -> Tuple[str, ...]:
+        """
+        Get the strings of a list no longer than a maximum length.
+
+        :param lst: A list of strings to be filtered, cached if it is a
+                    `WordList`.
+        :type lst: List[str]
+        :param max_length: The maximum length of the strings.
+        :type max_length: int
+        :return: The strings no longer than `max_length`, in list order.
+        :rtype: Tuple[str, ...]
+        :raises: The exceptions of `filter_list`.
+        """
+        if not isinstance(lst, WordList):
+            return tuple(_filter_list(lst, max_length))
+        is_positive_integer(max_length)
+        key = (id(lst), max_length)
+        version = lst.version
+        with self._lock:
+            entry = self._entries.get(key)
+            # A dead reference means the id was reused by a new list.
+            if entry is not None and entry[0]() is lst and entry[1] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+
+        result = tuple(_filter_list(lst, max_length))
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (weakref.ref(lst), version, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """
+        Remove all cached results.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+_FILTER_CACHE = FilterCache()
+
+
+def cached_filter_list(lst: List[str], max_length: int) -> Tuple[str, ...]:
+    """
+    Filter elements of a list based on their length, caching the result.
+
+    A variant of `filter_list` for code that filters the same list with a
+    few maximum lengths over and over. The results of a `WordList` are
+    kept in a module-wide `FilterCache`, see its documentation for how
+    changes to the list are detected; other lists are filtered every time.
+
+    :param lst: A list of strings to be filtered. Pass a `WordList` to
+                cache the results.
+    :type lst: List[str]
+    :param max_length: The maximum length of strings to include in
+                        the output.
+    :type max_length: int
+    :return: A read-only tuple of the strings that are less than or equal
+             to the specified maximum length.
+    :rtype: Tuple[str, ...]
+    :raises: The exceptions of `filter_list`.
+    """
+    return _FILTER_CACHE.get(lst, max_length)
+
+
 def capitalize_random_letter(wrd: str, index: int) -> str:
     """
     Capitalize a letter in a string at a specified index.
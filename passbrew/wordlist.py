@@ -0,0 +1,1146 @@
+import abc
+import argparse
+import bisect
+import heapq
+import itertools
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from passbrew.alias import AliasTable, random_words
+from passbrew.exceptions import ValidationError
+from passbrew.validation import is_positive_integer
+
+# Sidecar files hold the precomputed length histogram of a word list and
+# are stored next to it, e.g. `words.txt.lengths.json`.
+HISTOGRAM_SUFFIX = ".lengths.json"
+HISTOGRAM_VERSION = 1
+
+LOWERCASE_LETTERS = "a-z"
+
+
+def get_histogram_path(path) -> Path:
+    """
+    Get the path of the length histogram of a word list.
+
+    :param path: The path of the word list.
+    :return: The path of the sidecar file.
+    :rtype: Path
+    """
+    path = Path(path)
+    return path.with_name(path.name + HISTOGRAM_SUFFIX)
+
+
+def normalize_word(wrd: str, lowercase: bool = True) -> str:
+    """
+    Normalize a word to plain ASCII.
+
+    Accents are removed by decomposing the word (NFKD) and dropping the
+    combining marks, characters without an ASCII equivalent are dropped.
+
+    :param wrd: The word to be normalized.
+    :type wrd: str
+    :param lowercase: Whether to convert the word to lowercase.
+    :type lowercase: bool
+    :return: The normalized word.
+    :rtype: str
+    """
+    wrd = unicodedata.normalize("NFKD", wrd.strip())
+    wrd = wrd.encode("ascii", "ignore").decode("ascii")
+    return wrd.lower() if lowercase else wrd
+
+
+def _sort_key(wrd: str) -> Tuple[int, str]:
+    return len(wrd), wrd
+
+
+def _write_run(words: List[str], directory: str) -> str:
+    words.sort(key=_sort_key)
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.writelines(f"{wrd}\n" for wrd in words)
+    return path
+
+
+def _read_run(path: str) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+def build_word_list(
+    lines: Iterable[str],
+    output_path,
+    min_length: int = 1,
+    max_length: int = None,
+    charset: str = LOWERCASE_LETTERS,
+    lowercase: bool = True,
+    chunk_size: int = 1_000_000,
+) -> Dict[int, int]:
+    """
+    Build an optimized word list from a corpus of words.
+
+    The corpus is streamed: every word is normalized with `normalize_word`
+    and filtered by length and character set, chunks of `chunk_size` words
+    are sorted in memory and written to temporary runs, and the runs are
+    merged into the output file while duplicates are dropped. The output is
+    sorted by length, then alphabetically, and its length histogram is
+    written next to it (see `get_histogram_path`), so generators can load
+    it without scanning the words.
+
+    :param lines: The words of the corpus, one per line, e.g. an open file.
+    :type lines: Iterable[str]
+    :param output_path: The path of the word list to be written.
+    :param min_length: The minimum length of a word.
+    :type min_length: int
+    :param max_length: The maximum length of a word. `None` means no limit.
+    :type max_length: int
+    :param charset: The allowed characters, as the body of a regular
+                    expression character class.
+    :type charset: str
+    :param lowercase: Whether to convert the words to lowercase.
+    :type lowercase: bool
+    :param chunk_size: The maximum amount of words held in memory.
+    :type chunk_size: int
+    :return: The amount of words per length.
+    :rtype: Dict[int, int]
+    :raises ValidationError: If a length or `chunk_size` is not a positive integer.
+    """
+    is_positive_integer(min_length)
+    if max_length is not None:
+        is_positive_integer(max_length)
+    is_positive_integer(chunk_size)
+    allowed = re.compile(f"[{charset}]+")
+
+    directory = os.path.dirname(os.path.abspath(output_path))
+    runs = []
+    try:
+        chunk = []
+        for line in lines:
+            wrd = normalize_word(line, lowercase)
+            if len(wrd) < min_length:
+                continue
+            if max_length is not None and len(wrd) > max_length:
+                continue
+            if not allowed.fullmatch(wrd):
+                continue
+            chunk.append(wrd)
+            if len(chunk) >= chunk_size:
+                runs.append(_write_run(chunk, directory))
+                chunk = []
+        if chunk or not runs:
+            runs.append(_write_run(chunk, directory))
+
+        histogram = {}
+        previous = None
+        with open(output_path, "w", encoding="utf-8") as f:
+            merged = heapq.merge(*(_read_run(run) for run in runs), key=_sort_key)
+            for wrd in merged:
+                if wrd != previous:
+                    f.write(f"{wrd}\n")
+                    histogram[len(wrd)] = histogram.get(len(wrd), 0) + 1
+                    previous = wrd
+    finally:
+        for run in runs:
+            os.remove(run)
+
+    write_histogram(output_path, histogram)
+    return histogram
+
+
+def write_histogram(path, histogram: Dict[int, int]) -> None:
+    """
+    Write the length histogram of a word list sorted by length.
+
+    :param path: The path of the word list.
+    :param histogram: The amount of words per length.
+    :type histogram: Dict[int, int]
+    :return: None
+    """
+    data = {
+        "version": HISTOGRAM_VERSION,
+        "count": sum(histogram.values()),
+        "lengths": {str(k): v for k, v in sorted(histogram.items())},
+    }
+    with open(get_histogram_path(path), "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def read_histogram(path) -> Dict[int, int]:
+    """
+    Read the length histogram of a word list, if there is a valid one.
+
+    :param path: The path of the word list.
+    :return: The amount of words per length, or `None`.
+    :rtype: Dict[int, int]
+    """
+    try:
+        with open(get_histogram_path(path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != HISTOGRAM_VERSION:
+        return None
+    return {int(k): v for k, v in data["lengths"].items()}
+
+
+def load_word_list(path) -> Tuple[List[str], Dict[int, int]]:
+    """
+    Load a word list and its length histogram.
+
+    A list built by `build_word_list` is taken as it is. Any other list
+    has its blank lines and duplicates removed, and its histogram counted.
+
+    :param path: The path of the word list.
+    :return: The words and the amount of words per length.
+    :rtype: Tuple[List[str], Dict[int, int]]
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        words = [x.strip() for x in f]
+
+    histogram = read_histogram(path)
+    if histogram is not None and sum(histogram.values()) == len(words):
+        return words, histogram
+
+    words = [x for x in dict.fromkeys(words) if x]
+    histogram = {}
+    for wrd in words:
+        histogram[len(wrd)] = histogram.get(len(wrd), 0) + 1
+    return words, histogram
+
+
+class BaseWordIndex(Sequence):
+    """
+    The interface of the word lists of the generators.
+
+    A word index is a sequence of words ordered by length, so the words up
+    to a given length form a prefix of it. Subclasses implement `__len__`,
+    `__getitem__` for integer positions, `count` and `get_many`; random
+    picks and samples are built on them.
+
+    Attributes
+    ----------
+    version : int
+        Changes whenever the words change.
+    """
+
+    version = 0
+
+    @abc.abstractmethod
+    def count(self, max_length: int) -> int:
+        """
+        Get the amount of words of at most `max_length` characters.
+
+        :param max_length: The maximum length of a word.
+        :type max_length: int
+        :return: The amount of words.
+        :rtype: int
+        """
+
+    @abc.abstractmethod
+    def get_many(self, positions: Iterable[int]) -> List[str]:
+        """
+        Get the words at many positions at once.
+
+        :param positions: The positions of the words.
+        :type positions: Iterable[int]
+        :return: The words, in the order of `positions`.
+        :rtype: List[str]
+        """
+
+    def get_many_encoded(self, positions: Iterable[int]) -> List[bytes]:
+        """
+        Get the UTF-8 encoded words at many positions at once.
+
+        Indexes that do not store their words encoded encode them here.
+
+        :param positions: The positions of the words.
+        :type positions: Iterable[int]
+        :return: The encoded words, in the order of `positions`.
+        :rtype: List[bytes]
+        """
+        return [wrd.encode("utf-8") for wrd in self.get_many(positions)]
+
+    @property
+    def words(self) -> Sequence:
+        """
+        Get all words, sorted by length.
+
+        :return: The words.
+        :rtype: Sequence[str]
+        """
+        return list(self)
+
+    def pick(self, rng, max_length: int) -> str:
+        """
+        Pick a random word of at most `max_length` characters.
+
+        :param rng: The random number generator to use.
+        :type rng: random.Random
+        :param max_length: The maximum length of a word.
+        :type max_length: int
+        :return: A random word.
+        :rtype: str
+        :raises IndexError: If there are no words short enough.
+        """
+        count = self.count(max_length)
+        if not count:
+            raise IndexError("No words of the requested length.")
+        return self[rng.randrange(count)]
+
+    def pick_encoded(self, rng, max_length: int) -> bytes:
+        """
+        Pick a random UTF-8 encoded word of at most `max_length` characters.
+
+        The same random numbers are used as by `pick`.
+
+        :param rng: The random number generator to use.
+        :type rng: random.Random
+        :param max_length: The maximum length of a word.
+        :type max_length: int
+        :return: A random encoded word.
+        :rtype: bytes
+        :raises IndexError: If there are no words short enough.
+        """
+        count = self.count(max_length)
+        if not count:
+            raise IndexError("No words of the requested length.")
+        return self.get_many_encoded((rng.randrange(count),))[0]
+
+    def sample(self, rng, k: int, rows: int = 1) -> List[List[str]]:
+        """
+        Draw random samples of distinct words.
+
+        The positions of all rows are drawn first and the words are fetched
+        with a single `get_many`. The random numbers used are the same as
+        for `rng.sample(index, k)` once per row.
+
+        :param rng: The random number generator to use.
+        :type rng: random.Random
+        :param k: The amount of words per row.
+        :type k: int
+        :param rows: The amount of samples.
+        :type rows: int
+        :return: `rows` lists of `k` distinct words.
+        :rtype: List[List[str]]
+        :raises ValueError: If `k` is larger than the index.
+        """
+        words = self.get_many(self._draw_positions(rng, k, rows))
+        return [words[i : i + k] for i in range(0, rows * k, k)]
+
+    def sample_encoded(self, rng, k: int, rows: int = 1) -> List[List[bytes]]:
+        """
+        Draw random samples of distinct UTF-8 encoded words.
+
+        The same random numbers are used as by `sample`.
+
+        :param rng: The random number generator to use.
+        :type rng: random.Random
+        :param k: The amount of words per row.
+        :type k: int
+        :param rows: The amount of samples.
+        :type rows: int
+        :return: `rows` lists of `k` distinct encoded words.
+        :rtype: List[List[bytes]]
+        :raises ValueError: If `k` is larger than the index.
+        """
+        words = self.get_many_encoded(self._draw_positions(rng, k, rows))
+        return [words[i : i + k] for i in range(0, rows * k, k)]
+
+    def _draw_positions(self, rng, k: int, rows: int) -> Iterator[int]:
+        positions = range(len(self))
+        sample = rng.sample
+        drawn = [sample(positions, k) for _ in range(rows)]
+        return itertools.chain.from_iterable(drawn)
+
+    def entropy(self, k: int = 1, max_length: int = None) -> float:
+        """
+        Get the entropy of `k` distinct words drawn in order.
+
+        All words are equally likely, so this is the base 2 logarithm of
+        the amount of possible ordered samples.
+
+        :param k: The amount of words.
+        :type k: int
+        :param max_length: The maximum length of the words, or `None` for
+                           all words.
+        :type max_length: int
+        :return: The entropy in bits.
+        :rtype: float
+        :raises ValueError: If there are fewer than `k` words.
+        """
+        n = len(self) if max_length is None else self.count(max_length)
+        if k > n:
+            raise ValueError("Sample larger than population.")
+        return sum(math.log2(n - i) for i in range(k))
+
+    def min_entropy(self, k: int = 1, max_length: int = None) -> float:
+        """
+        Get the min-entropy of `k` distinct words drawn in order.
+
+        The min-entropy is the negative base 2 logarithm of the probability
+        of the most likely sample, the strength against an attacker who
+        tries the likely samples first. For uniform picks it equals the
+        entropy.
+
+        :param k: The amount of words.
+        :type k: int
+        :param max_length: The maximum length of the words, or `None` for
+                           all words.
+        :type max_length: int
+        :return: The min-entropy in bits.
+        :rtype: float
+        :raises ValueError: If there are fewer than `k` words.
+        """
+        return self.entropy(k, max_length)
+
+
+class WordIndex(BaseWordIndex):
+    """
+    An immutable word list indexed by word length.
+
+    The words are grouped into one tuple per length, ordered by length, so
+    the words up to a given length form a prefix of the sequence. A random
+    word of at most `max_length` characters is picked with a single random
+    index into that prefix, instead of filtering the whole list.
+
+    Indexes are never changed in place. `apply` returns a new version that
+    shares every untouched length bucket with the old one (copy-on-write),
+    so a reader holding a version always sees a consistent word list.
+
+    Attributes
+    ----------
+    histogram : Dict[int, int]
+        The amount of words per length.
+    version : int
+        The version of the index, incremented by `apply`.
+    """
+
+    def __init__(
+        self, words: Iterable[str] = (), histogram: Dict[int, int] = None
+    ) -> None:
+        words = list(words)
+        buckets = {}
+        if histogram is not None and self._is_sorted_by_length(words, histogram):
+            start = 0
+            for length in sorted(histogram):
+                end = start + histogram[length]
+                buckets[length] = tuple(words[start:end])
+                start = end
+        else:
+            for wrd in words:
+                buckets.setdefault(len(wrd), []).append(wrd)
+            buckets = {k: tuple(v) for k, v in buckets.items()}
+        self._set_buckets(buckets, 0)
+
+    @staticmethod
+    def _is_sorted_by_length(words: List[str], histogram: Dict[int, int]) -> bool:
+        if sum(histogram.values()) != len(words):
+            return False
+        return all(len(a) <= len(b) for a, b in zip(words, words[1:]))
+
+    @classmethod
+    def _from_buckets(cls, buckets: Dict[int, tuple], version: int) -> "WordIndex":
+        index = cls.__new__(cls)
+        index._set_buckets(buckets, version)
+        return index
+
+    def _set_buckets(self, buckets: Dict[int, tuple], version: int) -> None:
+        self.version = version
+        self._lengths = sorted(k for k, v in buckets.items() if v)
+        self._buckets = [buckets[k] for k in self._lengths]
+        self._cumulative = list(itertools.accumulate(len(b) for b in self._buckets))
+        self.histogram = {k: len(b) for k, b in zip(self._lengths, self._buckets)}
+        self._words = None
+        self._encoded_buckets = None
+
+    @property
+    def words(self) -> List[str]:
+        """
+        Get the words as a list, sorted by length.
+
+        The list is built on first access and shared afterwards, do not
+        modify it.
+
+        :return: The words.
+        :rtype: List[str]
+        """
+        if self._words is None:
+            self._words = list(itertools.chain.from_iterable(self._buckets))
+        return self._words
+
+    def __len__(self) -> int:
+        return self._cumulative[-1] if self._cumulative else 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.words[i]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("WordIndex index out of range")
+        b = bisect.bisect_right(self._cumulative, i)
+        return self._buckets[b][i - self._cumulative[b] + len(self._buckets[b])]
+
+    def __iter__(self) -> Iterator[str]:
+        return itertools.chain.from_iterable(self._buckets)
+
+    def count(self, max_length: int) -> int:
+        """
+        Get the amount of words of at most `max_length` characters.
+
+        :param max_length: The maximum length of a word.
+        :type max_length: int
+        :return: The amount of words.
+        :rtype: int
+        """
+        b = bisect.bisect_right(self._lengths, max_length)
+        return self._cumulative[b - 1] if b else 0
+
+    def get_many(self, positions: Iterable[int]) -> List[str]:
+        buckets = self._buckets
+        cumulative = self._cumulative
+        words = []
+        for i in positions:
+            b = bisect.bisect_right(cumulative, i)
+            words.append(buckets[b][i - cumulative[b] + len(buckets[b])])
+        return words
+
+    def _get_encoded_buckets(self) -> List[tuple]:
+        # Encoded on first use, so indexes that never build passwords into
+        # buffers do not hold the words twice.
+        if self._encoded_buckets is None:
+            self._encoded_buckets = [
+                tuple(wrd.encode("utf-8") for wrd in bucket) for bucket in self._buckets
+            ]
+        return self._encoded_buckets
+
+    def get_many_encoded(self, positions: Iterable[int]) -> List[bytes]:
+        """
+        Get the UTF-8 encoded words at many positions at once.
+
+        The words are encoded once, on the first call, and the same `bytes`
+        objects are returned afterwards.
+
+        :param positions: The positions of the words.
+        :type positions: Iterable[int]
+        :return: The encoded words, in the order of `positions`.
+        :rtype: List[bytes]
+        """
+        buckets = self._get_encoded_buckets()
+        cumulative = self._cumulative
+        words = []
+        for i in positions:
+            b = bisect.bisect_right(cumulative, i)
+            words.append(buckets[b][i - cumulative[b] + len(buckets[b])])
+        return words
+
+    def pick_encoded(self, rng, max_length: int) -> bytes:
+        """
+        Pick a random UTF-8 encoded word of at most `max_length` characters.
+
+        The same random numbers are used as by `pick`.
+
+        :param rng: The random number generator to use.
+        :type rng: random.Random
+        :param max_length: The maximum length of a word.
+        :type max_length: int
+        :return: A random encoded word.
+        :rtype: bytes
+        :raises IndexError: If there are no words short enough.
+        """
+        count = self.count(max_length)
+        if not count:
+            raise IndexError("No words of the requested length.")
+        i = rng.randrange(count)
+        buckets = self._get_encoded_buckets()
+        b = bisect.bisect_right(self._cumulative, i)
+        return buckets[b][i - self._cumulative[b] + len(buckets[b])]
+
+    def apply(self, added: Iterable[str] = (), removed: Iterable[str] = ()):
+        """
+        Create a new version of the index with words added and removed.
+
+        Only the length buckets touched by the change are copied, all other
+        buckets are shared with this version, which stays unchanged.
+
+        :param added: The words to add. Words already present are ignored.
+        :type added: Iterable[str]
+        :param removed: The words to remove. Missing words are ignored.
+        :type removed: Iterable[str]
+        :return: The new version of the index.
+        :rtype: WordIndex
+        """
+        changes = {}
+        for wrd in removed:
+            changes.setdefault(len(wrd), (set(), []))[0].add(wrd)
+        for wrd in added:
+            if wrd:
+                changes.setdefault(len(wrd), (set(), []))[1].append(wrd)
+
+        buckets = dict(zip(self._lengths, self._buckets))
+        for length, (to_remove, to_add) in changes.items():
+            bucket = [w for w in buckets.get(length, ()) if w not in to_remove]
+            present = set(bucket)
+            for wrd in to_add:
+                if wrd not in present:
+                    bucket.append(wrd)
+                    present.add(wrd)
+            buckets[length] = tuple(bucket)
+        return self._from_buckets(buckets, self.version + 1)
+
+
+def load_weighted_word_list(path) -> Tuple[List[str], List[int]]:
+    """
+    Load a word list with a frequency per word.
+
+    Every line holds a word and its frequency, a non-negative integer,
+    separated by a tab or spaces, e.g. `time\t1843`. Blank lines are
+    skipped.
+
+    :param path: The path of the word list.
+    :return: The words and their frequencies.
+    :rtype: Tuple[List[str], List[int]]
+    :raises ValidationError: If a line has no valid frequency.
+    """
+    words = []
+    weights = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            parts = line.split()
+            if not parts:
+                continue
+            if len(parts) != 2 or not parts[1].isdigit():
+                raise ValidationError(
+                    f"Invalid line {number} of {path}: {line.strip()!r}. "
+                    "Expected a word and its frequency."
+                )
+            words.append(parts[0])
+            weights.append(int(parts[1]))
+    return words, weights
+
+
+class WeightedWordIndex(WordIndex):
+    """
+    A word index drawing words in proportion to their weights.
+
+    Every length bucket has a Walker alias table of the weights of its
+    words, and every prefix of the buckets (the words up to a length) has
+    one of the total weights of its buckets. A word is drawn by picking a
+    bucket and then a word of the bucket, two constant-time draws, so
+    `pick` with a maximum length is as fast as a draw from all words.
+
+    Duplicate words have their weights added up, words with a weight of
+    zero are left out. `apply` takes the added words with their weights and
+    rebuilds the alias tables of the touched length buckets only.
+
+    :param words: The words.
+    :type words: Iterable[str]
+    :param weights: The non-negative integer weight of every word.
+    :type weights: Iterable[int]
+    :raises ValidationError: If the amounts of words and weights differ,
+                             a weight is invalid or all weights are zero.
+
+    Attributes
+    ----------
+    weights : List[int]
+        The weights of the words, in the order of the index.
+    """
+
+    def __init__(self, words: Iterable[str], weights: Iterable[int]) -> None:
+        words = list(words)
+        weights = list(weights)
+        if len(words) != len(weights):
+            raise ValidationError(f"Got {len(words)} words but {len(weights)} weights.")
+        merged = {}
+        for wrd, weight in zip(words, weights):
+            self._check_weight(wrd, weight)
+            if wrd and weight:
+                merged[wrd] = merged.get(wrd, 0) + weight
+
+        buckets = {}
+        for wrd, weight in merged.items():
+            bucket = buckets.setdefault(len(wrd), ([], []))
+            bucket[0].append(wrd)
+            bucket[1].append(weight)
+        self._set_weighted_buckets(
+            {k: (tuple(v[0]), tuple(v[1])) for k, v in buckets.items()}, {}, 0
+        )
+
+    @staticmethod
+    def _check_weight(wrd: str, weight: int) -> None:
+        if not isinstance(weight, int) or isinstance(weight, bool) or weight < 0:
+            raise ValidationError(
+                f"Invalid weight of {wrd!r}: {weight!r}. "
+                "Weights must be non-negative integers."
+            )
+
+    def _set_weighted_buckets(
+        self,
+        buckets: Dict[int, Tuple[tuple, tuple]],
+        tables: Dict[int, AliasTable],
+        version: int,
+    ) -> None:
+        """
+        Set the words and weights of every length, reusing the alias tables
+        of the lengths in `tables`.
+        """
+        if not any(words for words, _ in buckets.values()):
+            raise ValidationError("At least one word must have a positive weight.")
+        self._set_buckets({k: v[0] for k, v in buckets.items()}, version)
+        self._bucket_weights = [buckets[length][1] for length in self._lengths]
+        self.weights = list(itertools.chain.from_iterable(self._bucket_weights))
+        self._weight_of = dict(zip(self.words, self.weights))
+        self._bucket_tables = [
+            tables.get(length) or AliasTable(weights)
+            for length, weights in zip(self._lengths, self._bucket_weights)
+        ]
+        totals = [table.total for table in self._bucket_tables]
+        self._prefix_tables = [
+            AliasTable(totals[: i + 1]) for i in range(len(self._lengths))
+        ]
+
+    def apply(
+        self, added: Mapping[str, int] = None, removed: Iterable[str] = ()
+    ) -> "WeightedWordIndex":
+        """
+        Create a new version of the index with words added and removed.
+
+        Words of `added` that are already present get their new weight. Only
+        the alias tables of the length buckets touched by the change are
+        rebuilt, all others are shared with this version, which stays
+        unchanged.
+
+        :param added: The words to add or reweight, with their weights.
+                      A weight of zero removes the word.
+        :type added: Mapping[str, int]
+        :param removed: The words to remove. Missing words are ignored.
+        :type removed: Iterable[str]
+        :return: The new version of the index.
+        :rtype: WeightedWordIndex
+        :raises ValidationError: If the added words have no weights, a
+                                 weight is invalid or no word would be left.
+        """
+        if added is None:
+            added = {}
+        if not isinstance(added, Mapping):
+            added = list(added)
+            if added:
+                raise ValidationError(
+                    "Words added to a weighted index need weights. Pass a "
+                    "mapping of the words to their weights."
+                )
+            added = {}
+
+        changes = {}
+        for wrd in removed:
+            changes.setdefault(len(wrd), {})[wrd] = 0
+        for wrd, weight in added.items():
+            self._check_weight(wrd, weight)
+            if wrd:
+                changes.setdefault(len(wrd), {})[wrd] = weight
+
+        buckets = {
+            length: (words, weights)
+            for length, words, weights in zip(
+                self._lengths, self._buckets, self._bucket_weights
+            )
+        }
+        tables = dict(zip(self._lengths, self._bucket_tables))
+        for length, changed in changes.items():
+            merged = dict(zip(*buckets.get(length, ((), ()))))
+            merged.update(changed)
+            merged = {wrd: weight for wrd, weight in merged.items() if weight}
+            buckets[length] = (tuple(merged), tuple(merged.values()))
+            tables.pop(length, None)
+        index = self.__class__.__new__(self.__class__)
+        index._set_weighted_buckets(buckets, tables, self.version + 1)
+        return index
+
+    def _draw(
+        self, rng, count: int, max_length: int = None, buckets: List[tuple] = None
+    ) -> list:
+        if max_length is None:
+            prefix = len(self._lengths)
+        else:
+            prefix = bisect.bisect_right(self._lengths, max_length)
+            if not prefix:
+                raise IndexError("No words of the requested length.")
+        values = random_words(rng, 2 * count)
+        drawn = self._prefix_tables[prefix - 1].map_values(values[:count], rng)
+        buckets = self._buckets if buckets is None else buckets
+        tables = self._bucket_tables
+        return [
+            buckets[b][tables[b].map_value(value, rng)]
+            for b, value in zip(drawn, values[count:])
+        ]
+
+    def pick(self, rng, max_length: int) -> str:
+        """
+        Pick a weighted random word of at most `max_length` characters.
+
+        :param rng: The random number generator to use.
+        :type rng: random.Random
+        :param max_length: The maximum length of a word.
+        :type max_length: int
+        :return: A random word.
+        :rtype: str
+        :raises IndexError: If there are no words short enough.
+        """
+        return self._draw(rng, 1, max_length)[0]
+
+    def pick_encoded(self, rng, max_length: int) -> bytes:
+        """
+        Pick a weighted random UTF-8 encoded word of at most `max_length`
+        characters.
+
+        :param rng: The random number generator to use.
+        :type rng: random.Random
+        :param max_length: The maximum length of a word.
+        :type max_length: int
+        :return: A random encoded word.
+        :rtype: bytes
+        :raises IndexError: If there are no words short enough.
+        """
+        return self._draw(rng, 1, max_length, self._get_encoded_buckets())[0]
+
+    def sample(self, rng, k: int, rows: int = 1) -> List[List[str]]:
+        """
+        Draw weighted random samples of distinct words.
+
+        Every row takes the first `k` distinct words of a sequence of
+        independent weighted draws, which is successive sampling without
+        replacement: every word is drawn in proportion to its weight among
+        the words not yet in the row. Once the words of a row hold most of
+        the weight, repeated draws would be rejected too often, and the
+        remaining words are drawn directly from the words left.
+
+        :param rng: The random number generator to use.
+        :type rng: random.Random
+        :param k: The amount of words per row.
+        :type k: int
+        :param rows: The amount of samples.
+        :type rows: int
+        :return: `rows` lists of `k` distinct words.
+        :rtype: List[List[str]]
+        :raises ValueError: If `k` is larger than the index.
+        """
+        if not 0 <= k <= len(self):
+            raise ValueError("Sample larger than population or is negative.")
+        drawn = self._draw(rng, k * rows)
+        total = self._prefix_tables[-1].total
+        weight_of = self._weight_of
+        samples = []
+        for start in range(0, k * rows, k):
+            row = list(dict.fromkeys(drawn[start : start + k]))
+            while len(row) < k:
+                if 2 * sum(weight_of[w] for w in row) > total:
+                    row.append(self._draw_excluding(rng, row))
+                    continue
+                for wrd in self._draw(rng, k - len(row)):
+                    if wrd not in row:
+                        row.append(wrd)
+                        if len(row) == k:
+                            break
+            samples.append(row)
+        return samples
+
+    def sample_encoded(self, rng, k: int, rows: int = 1) -> List[List[bytes]]:
+        """
+        Draw weighted random samples of distinct UTF-8 encoded words.
+
+        The rows are drawn as by `sample` and their words are encoded.
+
+        :param rng: The random number generator to use.
+        :type rng: random.Random
+        :param k: The amount of words per row.
+        :type k: int
+        :param rows: The amount of samples.
+        :type rows: int
+        :return: `rows` lists of `k` distinct encoded words.
+        :rtype: List[List[bytes]]
+        :raises ValueError: If `k` is larger than the index.
+        """
+        return [
+            [wrd.encode("utf-8") for wrd in row] for row in self.sample(rng, k, rows)
+        ]
+
+    def _draw_excluding(self, rng, excluded: List[str]) -> str:
+        # A linear scan, only used when most of the weight is excluded.
+        excluded = set(excluded)
+        left = self._prefix_tables[-1].total
+        left -= sum(self._weight_of[w] for w in excluded)
+        position = rng.randrange(left)
+        for wrd, weight in zip(self, self.weights):
+            if wrd in excluded:
+                continue
+            position -= weight
+            if position < 0:
+                return wrd
+
+    def _get_weights(self, max_length: int = None) -> List[int]:
+        if max_length is None:
+            return self.weights
+        return self.weights[: self.count(max_length)]
+
+    def entropy(self, k: int = 1, max_length: int = None) -> float:
+        """
+        Get the Shannon entropy of `k` weighted words.
+
+        This is `k` times the entropy of one weighted draw, the entropy of
+        `k` independent draws. Drawing distinct words changes it little
+        unless a few words hold most of the weight; see `min_entropy` for
+        a bound on the strength against guessing.
+
+        :param k: The amount of words.
+        :type k: int
+        :param max_length: The maximum length of the words, or `None` for
+                           all words.
+        :type max_length: int
+        :return: The entropy in bits.
+        :rtype: float
+        :raises ValueError: If there are fewer than `k` words.
+        """
+        weights = self._get_weights(max_length)
+        if k > len(weights):
+            raise ValueError("Sample larger than population.")
+        total = sum(weights)
+        bits = math.log2(total) - sum(w * math.log2(w) for w in weights) / total
+        return k * bits
+
+    def min_entropy(self, k: int = 1, max_length: int = None) -> float:
+        """
+        Get the min-entropy of `k` distinct weighted words drawn in order.
+
+        The most likely sample draws the heaviest words, heaviest first;
+        its probability is the product of the weight of every word over
+        the weight left before it was drawn.
+
+        :param k: The amount of words.
+        :type k: int
+        :param max_length: The maximum length of the words, or `None` for
+                           all words.
+        :type max_length: int
+        :return: The min-entropy in bits.
+        :rtype: float
+        :raises ValueError: If there are fewer than `k` words.
+        """
+        weights = self._get_weights(max_length)
+        if k > len(weights):
+            raise ValueError("Sample larger than population.")
+        left = sum(weights)
+        bits = 0.0
+        for weight in heapq.nlargest(k, weights):
+            bits += math.log2(left) - math.log2(weight)
+            left -= weight
+        return bits
+
+
+class WordListSource:
+    """
+    A word list that can change while generators are using it.
+
+    The source holds the current `WordIndex` version. Additions and
+    removals, whether applied with `update` or picked up from the file by
+    `reload`, only rebuild the affected length buckets. Generators created
+    with `word_source` switch to the current version at the start of each
+    generation, so a password is always built from a single version.
+
+    A `weighted` source reads a list of words and frequencies, see
+    `load_weighted_word_list`, into a `WeightedWordIndex`. Its updates take
+    the added words with their weights, and a reload also applies changed
+    weights.
+
+    :param path: The path of the word list.
+    :param weighted: Whether the word list holds a frequency per word.
+    :type weighted: bool
+
+    Methods
+    -------
+    update(added, removed) -> WordIndex
+        Apply additions and removals.
+    reload() -> bool
+        Apply the differences between the file and the current version.
+    watch(interval: float) -> None
+        Reload the file in a background thread whenever it changes.
+    stop() -> None
+        Stop watching the file.
+    """
+
+    def __init__(self, path, weighted: bool = False) -> None:
+        self.path = path
+        self.weighted = weighted
+        if weighted:
+            self._words = self._load()
+            self.index = WeightedWordIndex(self._words, self._words.values())
+        else:
+            self.index = WordIndex(*load_word_list(path))
+            self._words = dict.fromkeys(self.index)
+        self._stat = self._get_stat()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _load(self) -> Dict[str, int]:
+        """
+        Load the words of the file, with their weights if it is weighted.
+        """
+        if not self.weighted:
+            return dict.fromkeys(load_word_list(self.path)[0])
+        words = {}
+        for wrd, weight in zip(*load_weighted_word_list(self.path)):
+            if wrd and weight:
+                words[wrd] = words.get(wrd, 0) + weight
+        return words
+
+    def _get_stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def update(
+        self, added: Iterable[str] = (), removed: Iterable[str] = ()
+    ) -> WordIndex:
+        """
+        Apply additions and removals and publish the new version.
+
+        :param added: The words to add, or for a weighted source a mapping
+                      of the words to their weights.
+        :type added: Iterable[str]
+        :param removed: The words to remove.
+        :type removed: Iterable[str]
+        :return: The new version of the index.
+        :rtype: WordIndex
+        :raises ValidationError: If a weighted source gets words without
+                                 weights.
+        """
+        if not self.weighted:
+            added = dict.fromkeys(x for x in added if x)
+        removed = list(removed)
+        with self._lock:
+            self.index = self.index.apply(added, removed)
+            if self.weighted:
+                self._words = dict(zip(self.index, self.index.weights))
+            else:
+                for wrd in removed:
+                    self._words.pop(wrd, None)
+                self._words.update(added)
+            return self.index
+
+    def reload(self) -> bool:
+        """
+        Apply the differences between the file and the current version.
+
+        :return: True if the word list changed.
+        :rtype: bool
+        """
+        with self._lock:
+            self._stat = self._get_stat()
+            words = self._load()
+            added = {
+                x: w
+                for x, w in words.items()
+                if x not in self._words or self._words[x] != w
+            }
+            removed = self._words.keys() - words.keys()
+            if not added and not removed:
+                return False
+            self.index = self.index.apply(added, removed)
+            self._words = words
+            return True
+
+    def check(self) -> bool:
+        """
+        Reload the file if it was modified since the last reload.
+
+        :return: True if the word list changed.
+        :rtype: bool
+        """
+        if self._get_stat() == self._stat:
+            return False
+        return self.reload()
+
+    def watch(self, interval: float = 1.0) -> None:
+        """
+        Check the file for modifications every `interval` seconds.
+
+        :param interval: The polling interval in seconds.
+        :type interval: float
+        :return: None
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, args=(interval,), daemon=True
+        )
+        self._thread.start()
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except OSError:
+                # The file may be replaced non-atomically, try again later.
+                continue
+
+    def stop(self) -> None:
+        """
+        Stop watching the file.
+
+        :return: None
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m passbrew.wordlist",
+        description="Build an optimized word list for the password generators.",
+    )
+    parser.add_argument("input", nargs="+", help="Input corpora, one word per line.")
+    parser.add_argument("-o", "--output", required=True, help="Output word list.")
+    parser.add_argument("--min-length", type=int, default=1)
+    parser.add_argument("--max-length", type=int, default=None)
+    parser.add_argument(
+        "--charset",
+        default=LOWERCASE_LETTERS,
+        help="Allowed characters as a regex character class body (default: a-z).",
+    )
+    parser.add_argument(
+        "--keep-case", action="store_true", help="Do not convert words to lowercase."
+    )
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    def lines():
+        for path in args.input:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                yield from f
+
+    histogram = build_word_list(
+        lines(),
+        args.output,
+        min_length=args.min_length,
+        max_length=args.max_length,
+        charset=args.charset,
+        lowercase=not args.keep_case,
+        chunk_size=args.chunk_size,
+    )
+    print(f"{sum(histogram.values())} words written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import random
+from collections import Counter
+
+import pytest
+
+from passbrew.alias import AliasTable, build_alias_table, get_limit, random_words
+from passbrew.exceptions import ValidationError
+
+
+def _outcome_counts(weights):
+    # Walk every value a draw can reduce to and count the outcomes.
+    thresholds, aliases, total = build_alias_table(weights)
+    counts = Counter()
+    for value in range(len(weights) * total):
+        column, rest = divmod(value, total)
+        counts[column if rest < thresholds[column] else aliases[column]] += 1
+    return counts
+
+
+class TestBuildAliasTable:
+    @pytest.mark.parametrize(
+        "weights",
+        [[1], [1, 1], [3, 1], [0, 5, 0, 2], [7, 1, 1, 1, 13], [1, 2, 3, 4, 5, 6]],
+    )
+    def test_exact_probabilities(self, weights):
+        counts = _outcome_counts(weights)
+        assert {i: counts[i] for i in range(len(weights))} == {
+            i: w * len(weights) for i, w in enumerate(weights)
+        }
+
+    @pytest.mark.parametrize("weights", [[], [0, 0], [1, -1], [1.5], [True]])
+    def test_invalid_weights(self, weights):
+        with pytest.raises(ValidationError):
+            build_alias_table(weights)
+
+
+class TestAliasTable:
+    def test_sample(self):
+        table = AliasTable([0, 1, 0])
+        assert table.sample(random.Random(1)) == 1
+        assert set(table.sample_many(random.Random(1), 100)) == {1}
+
+    def test_sample_many(self):
+        table = AliasTable([1, 2, 1])
+        counts = Counter(table.sample_many(random.Random(2), 40_000))
+        assert counts[1] == pytest.approx(20_000, rel=0.05)
+        assert counts[0] == pytest.approx(10_000, rel=0.05)
+
+    def test_probability(self):
+        table = AliasTable([1, 3])
+        assert len(table) == 2
+        assert table.total == 4
+        assert table.probability(1) == 0.75
+
+    def test_too_large(self):
+        with pytest.raises(ValidationError):
+            AliasTable([1 << 63, 1 << 63])
+
+
+def test_random_words():
+    values = random_words(random.Random(3), 5)
+    assert len(values) == 5
+    assert all(0 <= v < 1 << 64 for v in values)
+
+
+def test_get_limit():
+    assert get_limit(1 << 10) == 1 << 64
+    assert get_limit(3) % 3 == 0
+    assert (1 << 64) - get_limit(3) < 3
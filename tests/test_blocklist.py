@@ -0,0 +1,113 @@
+import hashlib
+
+import pytest
+
+from passbrew.blocklist import Blocklist, build_blocklist, hash_password
+from passbrew.exceptions import ValidationError
+from passbrew.generators.computer_friendly import ComputerFriendlyPasswordGenerator
+from passbrew.generators.user_friendly import UserFriendlyPasswordGenerator
+
+PASSWORDS = ["password", "123456", "qwerty", "letmein", "dragon"]
+
+
+@pytest.fixture
+def blocklist(tmp_path):
+    path = tmp_path / "blocklist.bin"
+    build_blocklist(PASSWORDS * 2, path, hashed=False, chunk_size=2)
+    with Blocklist(path) as bl:
+        yield bl
+
+
+class CyclingGenerator(UserFriendlyPasswordGenerator):
+    def __init__(self, passwords, blocklist=None):
+        super().__init__(blocklist=blocklist)
+        self._passwords = iter(passwords)
+
+    def generate(self, length):
+        return next(self._passwords)
+
+
+class TestBuildBlocklist:
+    def test_build_deduplicates(self, blocklist):
+        assert len(blocklist) == len(PASSWORDS)
+
+    def test_build_from_hashes(self, tmp_path):
+        path = tmp_path / "blocklist.bin"
+        lines = [
+            hashlib.sha1(p.encode()).hexdigest().upper() + ":42\n" for p in PASSWORDS
+        ]
+        assert build_blocklist(lines, path) == len(PASSWORDS)
+        with Blocklist(path) as bl:
+            assert all(p in bl for p in PASSWORDS)
+
+    def test_build_invalid_hash(self, tmp_path):
+        with pytest.raises(ValidationError):
+            build_blocklist(["not a hash"], tmp_path / "blocklist.bin")
+
+    def test_build_empty(self, tmp_path):
+        path = tmp_path / "blocklist.bin"
+        assert build_blocklist([], path) == 0
+        with Blocklist(path) as bl:
+            assert "password" not in bl
+
+    def test_open_invalid_file(self, tmp_path):
+        path = tmp_path / "blocklist.bin"
+        path.write_bytes(b"abc")
+        with pytest.raises(ValidationError):
+            Blocklist(path)
+
+
+class TestLookup:
+    def test_contains(self, blocklist):
+        assert "qwerty" in blocklist
+        assert "correct horse" not in blocklist
+
+    def test_contains_hash(self, blocklist):
+        assert blocklist.contains_hash(hash_password("dragon"))
+
+    def test_contains_batch(self, blocklist):
+        candidates = ["dragon", "nope", "123456", "password", "other"]
+        assert blocklist.contains_batch(candidates) == [
+            True,
+            False,
+            True,
+            True,
+            False,
+        ]
+
+    def test_filter(self, blocklist):
+        assert blocklist.filter(["nope", "letmein", "other"]) == ["nope", "other"]
+
+    def test_large_blocklist(self, tmp_path):
+        path = tmp_path / "blocklist.bin"
+        passwords = [str(i) for i in range(5000)]
+        build_blocklist(passwords, path, hashed=False, chunk_size=1000)
+        with Blocklist(path) as bl:
+            assert all(bl.contains_batch(passwords))
+            assert not any(bl.contains_batch([f"x{i}" for i in range(500)]))
+
+
+class TestGenerateBatch:
+    def test_generate_batch(self):
+        passwords = UserFriendlyPasswordGenerator().generate_batch(10, 20)
+        assert len(passwords) == 10
+        assert all(len(p) == 20 for p in passwords)
+
+    def test_generate_batch_computer_friendly(self):
+        passwords = ComputerFriendlyPasswordGenerator().generate_batch(5, 25)
+        assert len(passwords) == 5
+
+    def test_generate_batch_rejects_blocked(self, blocklist):
+        generator = CyclingGenerator(
+            ["password", "ok1", "dragon", "ok2", "ok3"], blocklist
+        )
+        assert generator.generate_batch(3, 20) == ["ok1", "ok2", "ok3"]
+
+    def test_generate_batch_gives_up(self, blocklist):
+        generator = CyclingGenerator(["password"] * 100, blocklist)
+        with pytest.raises(ValidationError):
+            generator.generate_batch(1, 20)
+
+    def test_generate_batch_invalid_count(self):
+        with pytest.raises(ValidationError):
+            UserFriendlyPasswordGenerator().generate_batch(0, 20)
@@ -0,0 +1,134 @@
+import pytest
+
+from passbrew.buffers import BufferPool, write_segments, zeroize
+from passbrew.exceptions import ValidationError
+from passbrew.generators.passphrase import PassphraseGenerator, PassphraseStyle
+from passbrew.generators.policy import PolicyPasswordGenerator
+from passbrew.generators.user_friendly import UserFriendlyPasswordGenerator
+from passbrew.rng import SeededRandom
+from passbrew.settings import GeneratorSettings
+
+pytestmark = pytest.mark.filterwarnings(
+    "ignore::passbrew.exceptions.InsecureRandomWarning"
+)
+
+
+@pytest.fixture(scope="module")
+def index():
+    return UserFriendlyPasswordGenerator().word_index
+
+
+def _pair(generator_class, index, seed, **kwargs):
+    return [
+        generator_class(
+            word_index=index,
+            rng=SeededRandom(seed),
+            settings=GeneratorSettings(),
+            **kwargs,
+        )
+        for _ in range(2)
+    ]
+
+
+class TestBuffers:
+    def test_zeroize(self):
+        buffer = bytearray(b"secret")
+        zeroize(buffer)
+        assert buffer == bytes(6)
+        data = bytearray(b"secret")
+        zeroize(memoryview(data)[2:4])
+        assert data == b"se\x00\x00et"
+
+    def test_write_segments(self):
+        buffer = bytearray(8)
+        assert write_segments(buffer, [b"ab", b"", b"cde"]) == 5
+        assert buffer == b"abcde\x00\x00\x00"
+        assert write_segments(memoryview(buffer)[4:], [b"xyz"]) == 3
+        assert buffer == b"abcdxyz\x00"
+
+    def test_write_segments_too_small(self):
+        buffer = bytearray(4)
+        with pytest.raises(ValidationError):
+            write_segments(buffer, [b"abc", b"de"])
+        assert buffer == bytes(4)
+
+    def test_pool(self):
+        pool = BufferPool(16, max_buffers=1)
+        with pool.borrow() as buffer:
+            buffer[:6] = b"secret"
+            with pool.borrow() as other:
+                assert other is not buffer
+        # Buffers are wiped when given back, and at most one is kept.
+        assert len(pool) == 1
+        assert buffer == bytes(16)
+        with pool.borrow() as again:
+            assert again is other
+
+    def test_pool_wipes_on_error(self):
+        pool = BufferPool(8)
+        with pytest.raises(RuntimeError):
+            with pool.borrow() as buffer:
+                buffer[:6] = b"secret"
+                raise RuntimeError
+        assert buffer == bytes(8)
+
+
+class TestGenerateInto:
+    @pytest.mark.parametrize("seed", range(20))
+    def test_user_friendly_matches_generate(self, index, seed):
+        a, b = _pair(UserFriendlyPasswordGenerator, index, seed)
+        buffer = bytearray(64)
+        n = b.generate_into(buffer, 20)
+        assert n == 20
+        assert buffer[:n].decode() == a.generate(20)
+
+    @pytest.mark.parametrize(
+        "style",
+        [
+            PassphraseStyle(),
+            PassphraseStyle("-_.", "random", 2),
+            PassphraseStyle("", "title", 3),
+            PassphraseStyle("0123456789", "upper"),
+            PassphraseStyle(" ", "lower", 1),
+        ],
+    )
+    @pytest.mark.parametrize("use_word_count", [True, False])
+    def test_passphrase_matches_generate(self, index, style, use_word_count):
+        length = 5 if use_word_count else 30
+        for seed in range(10):
+            a, b = _pair(PassphraseGenerator, index, seed, style=style)
+            buffer = bytearray(128)
+            n = b.generate_into(buffer, length, use_word_count)
+            assert buffer[:n].decode() == a.generate(length, use_word_count)
+
+    def test_memoryview(self, index):
+        generator = UserFriendlyPasswordGenerator(word_index=index)
+        data = bytearray(40)
+        n = generator.generate_into(memoryview(data)[10:], 20)
+        assert data[:10] == bytes(10)
+        assert len(data[10 : 10 + n].decode()) == 20
+
+    def test_buffer_too_small(self, index):
+        generator = PassphraseGenerator(word_index=index)
+        buffer = bytearray(10)
+        with pytest.raises(ValidationError):
+            generator.generate_into(buffer, 8)
+        assert buffer == bytes(10)
+
+    def test_invalid_length(self, index):
+        generator = UserFriendlyPasswordGenerator(word_index=index)
+        with pytest.raises(ValidationError):
+            generator.generate_into(bytearray(64), 2)
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_policy_matches_generate(self, index, seed):
+        a, b = _pair(PolicyPasswordGenerator, index, seed)
+        buffer = bytearray(64)
+        n = b.generate_into(buffer, 20)
+        assert n == 20
+        assert buffer[:n].decode() == a.generate(20)
+
+    def test_policy_buffer_too_small(self, index):
+        generator = PolicyPasswordGenerator(word_index=index)
+        with pytest.raises(ValidationError):
+            generator.generate_into(bytearray(10), 20)
@@ -0,0 +1,158 @@
+import threading
+
+import pytest
+
+from passbrew.client import PassbrewClient
+from passbrew.daemon import MIN_RING_SIZE, PassbrewDaemon, ResultRing
+from passbrew.exceptions import ValidationError
+
+
+class RepeatingGenerator:
+    def generate_batch(self, count, length):
+        return ["x" * length] * count
+
+    def generate_stream(self, count, length):
+        return iter(self.generate_batch(count, length))
+
+
+@pytest.fixture(scope="module")
+def daemon(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("daemon") / "passbrew.sock")
+    daemon = PassbrewDaemon(path, inline_threshold=10, ring_size=4096)
+    threading.Thread(target=daemon.serve_forever, daemon=True).start()
+    yield daemon
+    daemon.shutdown()
+    daemon.server_close()
+
+
+@pytest.fixture
+def client(daemon):
+    client = PassbrewClient(daemon.server_address)
+    yield client
+    client.close()
+
+
+class TestResultRing:
+    def test_write_and_release(self):
+        ring = ResultRing(100)
+        try:
+            assert ring.write(b"a" * 40) == 0
+            assert ring.write(b"b" * 40) == 40
+            # The third segment wraps, and only fits once the first one is
+            # released.
+            assert not ring.fits(30)
+            ring.release()
+            assert ring.fits(30)
+            assert ring.write(b"c" * 30) == 0
+            assert ring.pending == 2
+            with pytest.raises(ValidationError):
+                ring.write(b"d" * 30)
+        finally:
+            ring.close()
+
+    def test_empty_ring(self):
+        ring = ResultRing(100)
+        try:
+            ring.write(b"a" * 60)
+            ring.release()
+            # Nothing is unreleased, so the whole ring is free.
+            assert ring.fits(70)
+            assert ring.write(b"b" * 70) == 0
+            assert not ring.fits(101)
+        finally:
+            ring.close()
+
+
+class TestPassbrewDaemon:
+    def test_generate(self, client):
+        assert len(client.generate("user-friendly", 20)) == 20
+        assert len(client.generate("passphrase", 20, False)) == 20
+
+    def test_inline_batch(self, client):
+        passwords = client.generate_batch("computer-friendly", 10, 25)
+        assert len(passwords) == 10
+        assert {len(p) for p in passwords} == {25}
+
+    def test_ring_batch(self, client):
+        # 5000 passwords need many segments of the 4 KiB ring.
+        passwords = client.generate_batch("user-friendly", 5000, 20)
+        assert len(passwords) == 5000
+        assert {len(p) for p in passwords} == {20}
+        assert len(client.generate_batch("user-friendly", 11, 20)) == 11
+        assert len(client.generate("user-friendly", 20)) == 20
+
+    def test_errors(self, client):
+        with pytest.raises(ValidationError):
+            client.generate("user-friendly", 2)
+        with pytest.raises(ValidationError):
+            client.generate_batch("user-friendly", 100, 2)
+        with pytest.raises(ValidationError):
+            client.generate("unknown", 20)
+        with pytest.raises(ValidationError):
+            client.generate_batch("user-friendly", 0, 20)
+        # The connection is still usable.
+        assert len(client.generate("user-friendly", 20)) == 20
+
+    @pytest.mark.parametrize(
+        "name, args",
+        [
+            ("user-friendly", (20, 1, 2, 3)),
+            ("computer-friendly", (20, "x")),
+            ("computer-friendly", ("x",)),
+            ("user-friendly", ()),
+        ],
+    )
+    def test_invalid_arguments(self, client, name, args):
+        with pytest.raises(ValidationError):
+            client.generate(name, *args)
+        with pytest.raises(ValidationError):
+            client.generate_batch(name, 100, *args)
+        assert len(client.generate("user-friendly", 20)) == 20
+
+    def test_args_not_a_list(self, client):
+        client._send(b'{"generator": "user-friendly", "args": 20}\n')
+        with pytest.raises(ValidationError):
+            client._receive()
+        assert len(client.generate("user-friendly", 20)) == 20
+
+    def test_concurrent_clients(self, daemon):
+        results = []
+
+        def work():
+            with PassbrewClient(daemon.server_address) as client:
+                results.append(client.generate_batch("user-friendly", 200, 20))
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert [len(r) for r in results] == [200] * 4
+
+    def test_already_running(self, daemon):
+        with pytest.raises(OSError):
+            PassbrewDaemon(daemon.server_address)
+
+    def test_ring_size(self, tmp_path):
+        with pytest.raises(ValidationError):
+            PassbrewDaemon(str(tmp_path / "passbrew.sock"), ring_size=100)
+
+    def test_long_passwords(self, tmp_path):
+        daemon = PassbrewDaemon(
+            str(tmp_path / "passbrew.sock"),
+            {"repeat": RepeatingGenerator()},
+            inline_threshold=1,
+            ring_size=MIN_RING_SIZE,
+        )
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+        try:
+            with PassbrewClient(daemon.server_address, timeout=5) as client:
+                # Every segment holds one password longer than a quarter of
+                # the ring.
+                assert client.generate_batch("repeat", 3, 3000) == ["x" * 3000] * 3
+                with pytest.raises(ValidationError):
+                    client.generate_batch("repeat", 3, MIN_RING_SIZE)
+                assert client.generate_batch("repeat", 2, 10) == ["x" * 10] * 2
+        finally:
+            daemon.shutdown()
+            daemon.server_close()
@@ -0,0 +1,170 @@
+import os
+import struct
+import threading
+import zlib
+
+import pytest
+
+from passbrew.exceptions import SnapshotError, ValidationError
+from passbrew.generators.computer_friendly import ComputerFriendlyPasswordGenerator
+from passbrew.issuance import _HEADER, FINGERPRINT_SIZE, IssuanceLog
+from passbrew.settings import GeneratorSettings
+
+KEY = bytes(range(32))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "issued.log"
+
+
+@pytest.fixture
+def log(path):
+    log = IssuanceLog(path, KEY, segment_records=100, sync=False)
+    yield log
+    log.close()
+
+
+class TestIssuanceLog:
+    def test_lookup(self, log):
+        passwords = [f"password{i}" for i in range(250)]
+        log.record(passwords[:200], issued_at=1000.0)
+        log.record(passwords[200:], issued_at=2000.0)
+        assert len(log) == 250
+        # Two full segments are queued, the rest is still buffered.
+        assert log.lookup(["password5", "password210", "unknown"]) == [
+            1000.0,
+            2000.0,
+            None,
+        ]
+        log.flush()
+        assert "password249" in log
+        assert "password250" not in log
+
+    def test_earliest_time(self, log):
+        log.record(["a", "b"], issued_at=20.0)
+        log.flush()
+        log.record(["a"], issued_at=10.0)
+        log.record(["b"], issued_at=30.0)
+        assert log.lookup(["a", "b", "a"]) == [10.0, 20.0, 10.0]
+
+    def test_lookup_while_writing(self, path, monkeypatch):
+        write_segment = IssuanceLog._write_segment
+        release = threading.Event()
+        timeouts = []
+
+        def blocked_write_segment(self, records):
+            if not release.wait(5):
+                timeouts.append(records)
+            return write_segment(self, records)
+
+        monkeypatch.setattr(IssuanceLog, "_write_segment", blocked_write_segment)
+        with IssuanceLog(path, KEY, segment_records=2, sync=False) as log:
+            log.record(["a", "b", "c", "d", "e"], issued_at=10.0)
+            # The writer is stuck on the first segment, lookups neither wait
+            # for it nor miss the queued records.
+            assert log.lookup(["a", "c", "e", "f"]) == [10.0, 10.0, 10.0, None]
+            release.set()
+            log.flush()
+            assert log.lookup(["a", "c", "e", "f"]) == [10.0, 10.0, 10.0, None]
+        assert not timeouts
+
+    def test_timestamps_are_little_endian(self, log, path):
+        log.record(["a", "b"], issued_at=1.5)
+        log.flush()
+        data = zlib.decompress(path.read_bytes()[_HEADER.size :])
+        assert data[2 * FINGERPRINT_SIZE :] == struct.pack("<2Q", 1_500_000, 1_500_000)
+
+    def test_no_plaintext(self, log, path):
+        log.record(["correct horse battery staple"])
+        log.flush()
+        assert b"horse" not in path.read_bytes()
+        assert log.fingerprint("x") == log.fingerprint_many(["x"])[0]
+
+    def test_reopen(self, path):
+        with IssuanceLog(path, KEY, segment_records=10, sync=False) as log:
+            log.record([str(i) for i in range(25)], issued_at=5.0)
+        with IssuanceLog(path, KEY, sync=False) as log:
+            assert len(log) == 25
+            assert log.lookup(["0", "24", "25"]) == [5.0, 5.0, None]
+            log.record(["25"])
+        with IssuanceLog(path, KEY, sync=False) as log:
+            assert len(log) == 26
+
+    def test_incomplete_segment(self, path):
+        with IssuanceLog(path, KEY, sync=False) as log:
+            log.record(["a", "b"])
+        size = os.path.getsize(path)
+        with open(path, "ab") as f:
+            f.write(b"PBISSUE\x00 torn")
+        with IssuanceLog(path, KEY, sync=False) as log:
+            assert len(log) == 2
+        assert os.path.getsize(path) == size
+
+    def test_corrupt_last_segment(self, path):
+        with IssuanceLog(path, KEY, sync=False) as log:
+            log.record(["a", "b"])
+            log.flush()
+            size = os.path.getsize(path)
+            log.record(["c"])
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xFF
+        path.write_bytes(bytes(data))
+        with IssuanceLog(path, KEY, sync=False) as log:
+            assert len(log) == 2
+            assert "a" in log
+            assert "c" not in log
+        assert os.path.getsize(path) == size
+
+    def test_corrupt_segment(self, path):
+        with IssuanceLog(path, KEY, sync=False) as log:
+            log.record(["a", "b"])
+            log.flush()
+            log.record(["c"])
+        data = bytearray(path.read_bytes())
+        data[100] ^= 0xFF
+        path.write_bytes(bytes(data))
+        with IssuanceLog(path, KEY, sync=False) as log:
+            with pytest.raises(SnapshotError):
+                log.lookup(["a"])
+
+    @pytest.mark.parametrize("data", [b"remember the mi", b"x" * 100, b"\x00PB"])
+    def test_other_file(self, tmp_path, data):
+        other = tmp_path / "notes.txt"
+        other.write_bytes(data)
+        with pytest.raises(SnapshotError):
+            IssuanceLog(other, KEY)
+        assert other.read_bytes() == data
+
+    def test_torn_first_header(self, path):
+        path.write_bytes(b"PBIS")
+        with IssuanceLog(path, KEY, sync=False) as log:
+            assert len(log) == 0
+        assert os.path.getsize(path) == 0
+
+    def test_invalid(self, path):
+        with IssuanceLog(path, KEY, sync=False) as log:
+            log.record(["a"])
+        with pytest.raises(ValidationError):
+            IssuanceLog(path, KEY[::-1])
+        with pytest.raises(ValidationError):
+            IssuanceLog(path, b"short")
+
+    def test_closed(self, path):
+        log = IssuanceLog(path, KEY, sync=False)
+        log.close()
+        log.close()
+        with pytest.raises(ValueError):
+            log.record(["a"])
+
+
+class TestGeneratorHook:
+    def test_batch_and_stream(self, log):
+        generator = ComputerFriendlyPasswordGenerator(settings=GeneratorSettings())
+        generator.issuance_log = log
+        batch = generator.generate_batch(150, 20)
+        stream = list(generator.generate_stream(120, 20, chunk_size=50))
+        assert len(log) == 270
+        assert all(t is not None for t in log.lookup(batch + stream))
+        # Single passwords are not recorded.
+        assert generator.generate(20) not in log
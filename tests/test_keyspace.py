@@ -0,0 +1,151 @@
+import itertools
+import math
+
+import pytest
+
+from passbrew.exceptions import ValidationError
+from passbrew.generators.passphrase import PassphraseGenerator, PassphraseStyle
+from passbrew.keyspace import (
+    FeistelPermutation,
+    PassphraseKeyspace,
+    rank_permutation,
+    unrank_permutation,
+)
+from passbrew.settings import GeneratorSettings
+from passbrew.wordlist import WordIndex
+
+KEY = bytes(range(32))
+
+
+@pytest.fixture
+def word_index():
+    return WordIndex(["ox", "cat", "dog", "bird", "fish", "horse", "zebra"])
+
+
+class TestRanking:
+    @pytest.mark.parametrize("n, k", [(1, 1), (5, 3), (6, 2), (4, 4), (7, 1)])
+    def test_lexicographic_order(self, n, k):
+        sequences = [list(p) for p in itertools.permutations(range(n), k)]
+        assert [unrank_permutation(r, n, k) for r in range(len(sequences))] == (
+            sequences
+        )
+        assert [rank_permutation(p, n) for p in sequences] == list(
+            range(len(sequences))
+        )
+
+    def test_large(self):
+        n, k = 100_000, 8
+        for rank in (0, 12345678901234, math.perm(n, k) - 1):
+            assert rank_permutation(unrank_permutation(rank, n, k), n) == rank
+
+    def test_invalid(self):
+        with pytest.raises(ValidationError):
+            rank_permutation([1, 1], 5)
+        with pytest.raises(ValidationError):
+            rank_permutation([5], 5)
+        with pytest.raises(ValidationError):
+            unrank_permutation(60, 5, 3)
+        with pytest.raises(ValidationError):
+            unrank_permutation(-1, 5, 3)
+
+
+class TestFeistelPermutation:
+    @pytest.mark.parametrize("size", [1, 2, 3, 17, 256, 1000])
+    def test_bijection(self, size):
+        permutation = FeistelPermutation(size, KEY)
+        values = [permutation.permute(i) for i in range(size)]
+        assert sorted(values) == list(range(size))
+        assert [permutation.invert(v) for v in values] == list(range(size))
+
+    def test_keyed(self):
+        first = [FeistelPermutation(1000, KEY).permute(i) for i in range(20)]
+        again = [FeistelPermutation(1000, KEY).permute(i) for i in range(20)]
+        other = [FeistelPermutation(1000, KEY[::-1]).permute(i) for i in range(20)]
+        assert first == again
+        assert first != other
+        assert first != sorted(first)
+
+    def test_large(self):
+        permutation = FeistelPermutation(2**100 + 7, KEY)
+        value = permutation.permute(2**99)
+        assert value < 2**100 + 7
+        assert permutation.invert(value) == 2**99
+
+    def test_invalid(self):
+        with pytest.raises(ValidationError):
+            FeistelPermutation(10, b"short")
+        with pytest.raises(ValidationError):
+            FeistelPermutation(0, KEY)
+        with pytest.raises(ValidationError):
+            FeistelPermutation(10, KEY).permute(10)
+        with pytest.raises(ValidationError):
+            FeistelPermutation(2**2000, KEY)
+
+
+class TestPassphraseKeyspace:
+    def test_rank_and_unrank(self, word_index):
+        keyspace = PassphraseKeyspace(word_index, 3, "-")
+        assert keyspace.size == 7 * 6 * 5
+        assert keyspace.unrank(0) == "ox-cat-dog"
+        assert keyspace.unrank(keyspace.size - 1) == "zebra-horse-fish"
+        for rank in range(keyspace.size):
+            assert keyspace.rank(keyspace.unrank(rank)) == rank
+
+    def test_rank_words(self, word_index):
+        keyspace = PassphraseKeyspace(word_index, 2, "")
+        assert keyspace.unrank(1) == "oxdog"
+        assert keyspace.rank(["ox", "dog"]) == 1
+        with pytest.raises(ValidationError):
+            keyspace.rank("oxdog")
+
+    def test_invalid_passphrases(self, word_index):
+        keyspace = PassphraseKeyspace(word_index, 2)
+        for passphrase in ("ox ox", "ox cow", "ox cat dog"):
+            with pytest.raises(ValidationError):
+                keyspace.rank(passphrase)
+        with pytest.raises(ValidationError):
+            PassphraseKeyspace(word_index, 8)
+
+    def test_issue_unique_shards(self, word_index):
+        keyspace = PassphraseKeyspace(word_index, 3, key=KEY)
+        shards = [keyspace.shard(node, 4) for node in range(4)]
+        assert sum(map(len, shards)) == keyspace.size
+        issued = [p for shard in shards for p in keyspace.issue(shard)]
+        assert len(set(issued)) == keyspace.size
+        assert issued != [keyspace.unrank(r) for r in range(keyspace.size)]
+        assert keyspace.rank(issued[5]) == keyspace.permutation.permute(5)
+
+    def test_issue_without_key(self, word_index):
+        keyspace = PassphraseKeyspace(word_index, 2)
+        assert keyspace.issue(range(3)) == ["ox cat", "ox dog", "ox bird"]
+        with pytest.raises(ValidationError):
+            keyspace.shard(4, 4)
+
+
+class TestPassphraseGeneratorKeyspace:
+    def test_get_keyspace(self, word_index):
+        generator = PassphraseGenerator(
+            settings=GeneratorSettings(min_word_count=2, max_word_count=5),
+            word_index=word_index,
+            style=PassphraseStyle("."),
+        )
+        keyspace = generator.get_keyspace(3, KEY)
+        assert keyspace.separator == "."
+        assert len(keyspace.issue(keyspace.shard(0, 2))[0].split(".")) == 3
+        with pytest.raises(ValidationError):
+            generator.get_keyspace(6)
+
+    @pytest.mark.parametrize(
+        "style",
+        [
+            PassphraseStyle("-."),
+            PassphraseStyle(capitalization="random"),
+            PassphraseStyle(digit_amount=2),
+        ],
+    )
+    def test_random_styles(self, word_index, style):
+        generator = PassphraseGenerator(
+            settings=GeneratorSettings(), word_index=word_index, style=style
+        )
+        with pytest.raises(ValidationError):
+            generator.get_keyspace(4)
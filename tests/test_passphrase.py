@@ -1,7 +1,14 @@
+import math
+import random
+import re
+import string
+
 import pytest
 
 from passbrew.exceptions import ExceedsMaximumLength, ValidationError
-from passbrew.generators.passphrase import PassphraseGenerator
+from passbrew.generators.passphrase import PassphraseGenerator, PassphraseStyle
+from passbrew.settings import GeneratorSettings
+from passbrew.wordlist import WeightedWordIndex, WordIndex
 
 
 @pytest.fixture
@@ -76,3 +83,152 @@ class TestGenerateUseChars:
         assert len(passwords) == 50
         for p in passwords:
             assert len(p) == 20
+
+
+class TestPassphraseStyle:
+    @pytest.fixture
+    def settings(self):
+        return GeneratorSettings(min_length=10, max_length=60, max_word_count=12)
+
+    def _generator(self, settings, **kwargs):
+        return PassphraseGenerator(settings=settings, style=PassphraseStyle(**kwargs))
+
+    def test_default_style(self, passphrase):
+        assert passphrase.style.separators == " "
+        assert len(passphrase.generate(5).split(" ")) == 5
+
+    def test_hyphen_separator(self, settings):
+        pwd = self._generator(settings, separators="-").generate(5)
+        assert len(pwd.split("-")) >= 5
+        assert " " not in pwd
+
+    def test_digit_separators(self, settings):
+        generator = self._generator(settings, separators=string.digits)
+        for pwd in generator.generate_batch(20, 30, use_word_count=False):
+            assert len(pwd) == 30
+            assert re.fullmatch(r"[^\d]+(\d[^\d]+)*", pwd)
+
+    @pytest.mark.parametrize(
+        "capitalization, check",
+        [
+            ("upper", lambda w: w == w.upper()),
+            ("lower", lambda w: w == w.lower()),
+            ("title", lambda w: w == w.capitalize()),
+        ],
+    )
+    def test_capitalization(self, settings, capitalization, check):
+        generator = self._generator(settings, capitalization=capitalization)
+        for pwd in generator.generate_batch(20, 5):
+            assert all(check(w) for w in pwd.split(" "))
+
+    def test_random_capitalization(self, settings):
+        generator = self._generator(settings, capitalization="random")
+        words = " ".join(generator.generate_batch(50, 8)).split(" ")
+        assert any(w[0].isupper() for w in words if w.lower() != "i")
+        assert any(w[0].islower() for w in words)
+
+    def test_digits(self, settings):
+        generator = self._generator(settings, digit_amount=3)
+        for pwd in generator.generate_batch(20, 5):
+            assert len(re.findall(r"\d{3}", pwd)) == 1
+
+    @pytest.mark.parametrize("separators", ["", " ", "-_."])
+    @pytest.mark.parametrize("digit_amount", [0, 2])
+    def test_fixed_length(self, settings, separators, digit_amount):
+        generator = self._generator(
+            settings, separators=separators, digit_amount=digit_amount
+        )
+        for length in (10, 17, 33, 60):
+            for pwd in generator.generate_batch(20, length, use_word_count=False):
+                assert len(pwd) == length
+        assert len(generator.generate(25, use_word_count=False)) == 25
+
+    def test_get_length(self):
+        style = PassphraseStyle(separators="-", digit_amount=2)
+        assert style.get_length(20, 4) == 25
+        assert PassphraseStyle(separators="").get_length(20, 4) == 20
+
+    def test_digits_longer_than_passphrase(self):
+        generator = PassphraseGenerator(
+            settings=GeneratorSettings(min_length=1, max_length=30),
+            style=PassphraseStyle(digit_amount=5),
+        )
+        with pytest.raises(ValidationError):
+            generator.generate(5, use_word_count=False)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"separators": None},
+            {"capitalization": "camel"},
+            {"digit_amount": -1},
+            {"digit_amount": "2"},
+        ],
+    )
+    def test_invalid_style(self, kwargs):
+        with pytest.raises(ValidationError):
+            PassphraseStyle(**kwargs)
+
+    def test_style_entropy(self):
+        assert PassphraseStyle().get_entropy(5) == 0
+        assert PassphraseStyle("-_").get_entropy(5) == 4
+        assert PassphraseStyle("--_").get_entropy(2) == pytest.approx(
+            -(2 / 3 * math.log2(2 / 3) + 1 / 3 * math.log2(1 / 3))
+        )
+        assert PassphraseStyle(capitalization="random").get_entropy(5) == 5
+        assert PassphraseStyle(capitalization="random").get_entropy(4, 0.5) == 2
+        assert PassphraseStyle(digit_amount=2).get_entropy(4) == pytest.approx(
+            2 * math.log2(10) + 2
+        )
+
+
+class TestWeightedWords:
+    @pytest.fixture
+    def generator(self):
+        index = WeightedWordIndex(["alpha", "beta", "gamma", "delta"], [8, 4, 2, 2])
+        return PassphraseGenerator(
+            word_index=index,
+            rng=random.Random(1),
+            settings=GeneratorSettings(
+                min_length=5, max_length=40, min_word_count=1, max_word_count=4
+            ),
+            style=PassphraseStyle("-"),
+        )
+
+    def test_weighted_words(self, generator):
+        first_words = [p.split("-")[0] for p in generator.generate_batch(4000, 2)]
+        assert first_words.count("alpha") == pytest.approx(2000, rel=0.1)
+        assert first_words.count("delta") == pytest.approx(500, rel=0.15)
+        for passphrase in generator.generate_batch(100, 4):
+            assert sorted(passphrase.split("-")) == ["alpha", "beta", "delta", "gamma"]
+
+    def test_weighted_fixed_length(self, generator):
+        generator.word_index = WeightedWordIndex(
+            ["a", "ox", "cat", "beta", "alpha"], [1, 2, 3, 4, 5]
+        )
+        for passphrase in generator.generate_batch(100, 16, use_word_count=False):
+            assert len(passphrase) == 16
+
+    def test_entropy(self, generator):
+        assert generator.get_entropy(2) == pytest.approx(2 * 1.75)
+        assert PassphraseGenerator(
+            word_index=WeightedWordIndex(["a", "b"], [1, 1])
+        ).get_entropy(1) == pytest.approx(1)
+
+    def test_capitalization_entropy(self):
+        style = PassphraseStyle("-", capitalization="random")
+        uniform = PassphraseGenerator(
+            word_index=WordIndex(["Ab", "ab", "cd", "1e"]), style=style
+        )
+        # Only "ab" and "cd" change when capitalized.
+        assert uniform.get_entropy(1) == pytest.approx(2 + 0.5)
+        weighted = PassphraseGenerator(
+            word_index=WeightedWordIndex(["Ab", "ab"], [3, 1]), style=style
+        )
+        assert weighted.get_entropy(2) == pytest.approx(
+            weighted.word_index.entropy(2) + 2 * 0.25
+        )
+
+    def test_uniform_entropy(self, passphrase):
+        n = len(passphrase.word_index)
+        assert passphrase.get_entropy(2) == pytest.approx(math.log2(n * (n - 1)))
@@ -61,3 +61,14 @@ class TestSetMaxLength:
     def test_set_max_length_exceeds_max_length(self, generator):
         with pytest.raises(ValidationError):
             generator.set_max_length(1)
+
+
+class TestGenerateStream:
+    def test_generate_stream(self, friendly_password):
+        passwords = list(friendly_password.generate_stream(25, 20, chunk_size=10))
+        assert len(passwords) == 25
+        assert all(len(p) == 20 for p in passwords)
+
+    def test_generate_stream_invalid_chunk_size(self, friendly_password):
+        with pytest.raises(ValidationError):
+            friendly_password.generate_stream(25, 20, chunk_size=0)
@@ -0,0 +1,150 @@
+import math
+import re
+import string
+
+import pytest
+
+from passbrew.exceptions import ValidationError
+from passbrew.generators.pattern import PatternPasswordGenerator
+from passbrew.pattern import SYMBOLS, PatternPlan, parse_pattern
+from passbrew.rng import SeededRandom
+from passbrew.settings import GeneratorSettings
+from passbrew.wordlist import WeightedWordIndex, WordIndex, WordListSource
+
+pytestmark = pytest.mark.filterwarnings(
+    "ignore::passbrew.exceptions.InsecureRandomWarning"
+)
+
+
+@pytest.fixture
+def word_index():
+    return WordIndex(["ox", "cat", "dog", "bird", "fish", "horse"])
+
+
+@pytest.fixture
+def generator(word_index):
+    return PatternPasswordGenerator(
+        rng=SeededRandom(1), settings=GeneratorSettings(), word_index=word_index
+    )
+
+
+class TestParsePattern:
+    def test_tokens(self):
+        assert parse_pattern("Word-dd-S") == (
+            ("word", 1, None, "Word"),
+            ("literal", "-"),
+            ("chars", string.digits, 2),
+            ("literal", "-"),
+            ("chars", SYMBOLS, 1),
+        )
+
+    def test_bounds_and_escapes(self):
+        assert parse_pattern("word{3,5}\\d[xyz]{3}[q]9{2}") == (
+            ("word", 3, 5, "word"),
+            ("literal", "d"),
+            ("chars", "xyz", 3),
+            ("literal", "q"),
+            ("chars", string.digits, 2),
+        )
+        assert parse_pattern("WORD{4}") == (("word", 4, 4, "WORD"),)
+
+    def test_cached(self):
+        assert parse_pattern("ccvcvc99") is parse_pattern("ccvcvc99")
+
+    @pytest.mark.parametrize(
+        "pattern",
+        [
+            "",
+            None,
+            "d{",
+            "d{0}",
+            "d{2,3}",
+            "word{5,3}",
+            "[ab",
+            "[aa]",
+            "[]",
+            "ab}",
+            "\\",
+        ],
+    )
+    def test_invalid(self, pattern):
+        with pytest.raises(ValidationError):
+            parse_pattern(pattern)
+
+
+class TestPatternPlan:
+    def test_entropy_and_lengths(self, word_index):
+        plan = PatternPlan("Word{3,4}-dd", word_index)
+        assert plan.entropy == pytest.approx(math.log2(4) + 2 * math.log2(10))
+        assert (plan.min_length, plan.max_length) == (6, 7)
+
+    def test_word_bounds(self, word_index):
+        plan = PatternPlan("word{4}", word_index, SeededRandom(2))
+        assert set(plan.generate(200)) == {"bird", "fish"}
+        with pytest.raises(ValidationError):
+            PatternPlan("word{7,9}", word_index)
+
+    def test_weighted_index(self):
+        with pytest.raises(ValidationError):
+            PatternPlan("word", WeightedWordIndex(["a", "b"], [1, 2]))
+
+    def test_literal_only(self, word_index):
+        assert PatternPlan("a\\b", word_index).generate(1)[0][1:] == "b"
+        assert PatternPlan("[x]-", word_index).generate(2) == ["x-", "x-"]
+
+
+class TestPatternPasswordGenerator:
+    def test_format(self, generator):
+        regex = re.compile(rf"[A-Z][a-z]+-[A-Z][a-z]+-\d\d-[{re.escape(SYMBOLS)}]")
+        for password in generator.generate_batch(500):
+            assert regex.fullmatch(password)
+
+    def test_consonants_and_vowels(self, generator):
+        regex = re.compile(r"[^aeiou\d]{2}[aeiou][^aeiou\d][aeiou][^aeiou\d]\d\d")
+        passwords = generator.generate_batch(500, "ccvcvc99")
+        assert all(regex.fullmatch(p) and p.islower() for p in passwords)
+        assert len(generator.generate("ccvcvc99")) == 8
+
+    def test_cases(self, generator):
+        assert generator.generate("WORD{5}") == "HORSE"
+        assert generator.generate("word{5}") == "horse"
+        assert generator.generate("Word{5}") == "Horse"
+
+    def test_seeded(self, word_index):
+        first, second = (
+            PatternPasswordGenerator(
+                rng=SeededRandom(3), settings=GeneratorSettings(), word_index=word_index
+            ).generate_batch(20, "word-x{8}")
+            for _ in range(2)
+        )
+        assert first == second
+
+    def test_plan_cache(self, generator):
+        plan = generator.get_plan("Word-d")
+        assert generator.get_plan("Word-d") is plan
+        assert generator.get_plan() is generator.get_plan(generator.pattern)
+        generator.max_plans = 2
+        generator.get_plan("d")
+        generator.get_plan("dd")
+        assert generator.get_plan("Word-d") is not plan
+
+    def test_entropy(self, generator):
+        assert generator.get_entropy("dddd") == pytest.approx(4 * math.log2(10))
+        assert generator.get_entropy("word") == pytest.approx(math.log2(6))
+
+    def test_word_source(self, tmp_path):
+        path = tmp_path / "words.txt"
+        path.write_text("cat\ndog\n")
+        source = WordListSource(path)
+        generator = PatternPasswordGenerator(
+            rng=SeededRandom(4), settings=GeneratorSettings(), word_source=source
+        )
+        assert set(generator.generate_batch(50, "word")) == {"cat", "dog"}
+
+        path.write_text("owl\n")
+        source.reload()
+        assert set(generator.generate_batch(50, "word")) == {"owl"}
+
+    def test_invalid_pattern(self, word_index):
+        with pytest.raises(ValidationError):
+            PatternPasswordGenerator(word_index=word_index, pattern="[ab")
@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from passbrew.exceptions import ValidationError
+from passbrew.generators.policy import PasswordPolicy, PolicyPasswordGenerator
+
+
+def _classes(segments):
+    # Spaces are not segments of their own, so two words separated by a
+    # space still count as neighbours.
+    classes = []
+    for segment in segments:
+        if segment == " ":
+            continue
+        if segment.isalpha():
+            classes.append("word")
+        elif segment.isdigit():
+            classes.append("digit")
+        else:
+            classes.append("special")
+    return classes
+
+
+class TestPasswordPolicy:
+    def test_policy_negative_uppercase(self):
+        with pytest.raises(ValidationError):
+            PasswordPolicy(min_uppercase=-1)
+
+    def test_policy_invalid_max_word_length(self):
+        with pytest.raises(ValidationError):
+            PasswordPolicy(max_word_length=0)
+
+    def test_policy_allows_word(self):
+        policy = PasswordPolicy(banned_substrings=["Cat"], max_word_length=5)
+        assert policy.allows_word("dog")
+        assert not policy.allows_word("concatenate")
+        assert not policy.allows_word("catch")
+
+
+class TestPolicyGenerate:
+    def test_generate_valid_length(self):
+        generator = PolicyPasswordGenerator(PasswordPolicy(min_uppercase=2))
+        for _ in range(50):
+            assert len(generator.generate(20)) == 20
+
+    def test_generate_min_uppercase(self):
+        generator = PolicyPasswordGenerator(PasswordPolicy(min_uppercase=3))
+        for _ in range(50):
+            pwd = generator.generate(20)
+            assert sum(ch.isupper() for ch in pwd) == 3
+
+    def test_generate_max_word_length(self):
+        generator = PolicyPasswordGenerator(PasswordPolicy(max_word_length=4))
+        for _ in range(50):
+            pwd = generator.generate(20).lower()
+            assert not [x for x in generator._long_words if x in pwd]
+
+    def test_generate_no_repeated_class(self):
+        generator = PolicyPasswordGenerator(PasswordPolicy(no_repeated_class=True))
+        for _ in range(50):
+            # Checked on the segments, where two adjacent words would be
+            # indistinguishable from one word in the password.
+            classes = _classes(generator._generate_segments(20))
+            assert all(a != b for a, b in zip(classes, classes[1:]))
+        assert generator.retry_rate == 0
+
+    def test_repeated_class_without_policy(self):
+        generator = PolicyPasswordGenerator()
+        num_amount = generator.num_amount
+        generator.set_num_amount(3)
+        try:
+            repeated = False
+            for _ in range(200):
+                classes = _classes(generator._generate_segments(20))
+                repeated |= any(a == b for a, b in zip(classes, classes[1:]))
+            # The check above would notice neighbouring segments of a class.
+            assert repeated
+        finally:
+            generator.set_num_amount(num_amount)
+
+    def test_generate_banned_substrings(self):
+        generator = PolicyPasswordGenerator(PasswordPolicy(banned_substrings=["e"]))
+        for _ in range(50):
+            assert "e" not in generator.generate(20).lower()
+
+    def test_generate_no_spaces_at_edges(self):
+        generator = PolicyPasswordGenerator()
+        for _ in range(50):
+            pwd = generator.generate(20)
+            assert pwd == pwd.strip()
+            assert "  " not in pwd
+
+    def test_generate_invalid_length(self):
+        generator = PolicyPasswordGenerator()
+        with pytest.raises(ValidationError):
+            generator.generate(2)
+
+    def test_generate_impossible_uppercase(self):
+        generator = PolicyPasswordGenerator(PasswordPolicy(min_uppercase=30))
+        with pytest.raises(ValidationError):
+            generator.generate(20)
+
+    def test_retry_rate(self):
+        generator = PolicyPasswordGenerator(PasswordPolicy(banned_substrings=["a1"]))
+        for _ in range(20):
+            generator.generate(20)
+        assert generator.attempts >= 20
+        assert 0 <= generator.retry_rate < 1
+
+    def test_attempts_across_threads(self):
+        generator = PolicyPasswordGenerator(PasswordPolicy(banned_substrings=["e"]))
+        threads = [
+            threading.Thread(target=lambda: [generator.generate(20) for _ in range(25)])
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Every password took one attempt more than it was rejected.
+        assert generator.attempts == 100 + sum(generator.rejections.values())
@@ -0,0 +1,69 @@
+import io
+
+import pytest
+
+from passbrew.generators.policy import PolicyPasswordGenerator
+from passbrew.profile import (
+    get_generator,
+    main,
+    profile_calls,
+    trace_allocations,
+    write_collapsed,
+)
+
+
+def _inner():
+    return sum(range(2000))
+
+
+def _outer():
+    return [_inner() for _ in range(5)]
+
+
+class TestProfileCalls:
+    def test_cprofile(self):
+        stacks = profile_calls(_outer, 50)
+        assert any(stack.startswith("_outer") and "_inner" in stack for stack in stacks)
+        assert all(weight >= 0 for weight in stacks.values())
+
+    def test_sampling(self):
+        stacks = profile_calls(_outer, 2000, "sampling", interval=0.0005)
+        assert stacks
+        assert all(stack.startswith("_outer") for stack in stacks)
+        assert all(isinstance(count, int) for count in stacks.values())
+
+    def test_unknown_profiler(self):
+        with pytest.raises(ValueError):
+            profile_calls(_outer, 1, "perf")
+
+
+class TestWriteCollapsed:
+    def test_write_collapsed(self):
+        output = io.StringIO()
+        write_collapsed({"a;b": 0.5, "a": 0.25, "c": 0.0000001}, output, scale=1e6)
+        assert output.getvalue() == "a 250000\na;b 500000\n"
+
+
+class TestTraceAllocations:
+    def test_trace_allocations(self):
+        kept = []
+        report = trace_allocations(lambda: kept.append(bytearray(10_000)), 5)
+        assert report.calls == 5
+        assert report.max_peak >= 10_000
+        assert report.retained >= 50_000
+        assert report.top_lines
+
+
+class TestMain:
+    def test_get_generator(self):
+        assert isinstance(get_generator("policy"), PolicyPasswordGenerator)
+        with pytest.raises(ValueError):
+            get_generator("unknown")
+
+    def test_main(self, tmp_path, capsys):
+        output = tmp_path / "stacks.txt"
+        main(["policy", "20", "-n", "20", "-o", str(output), "--memory"])
+        lines = output.read_text().splitlines()
+        assert lines
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert "Allocations of 20 calls" in capsys.readouterr().out
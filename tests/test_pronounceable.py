@@ -0,0 +1,159 @@
+import random
+
+import pytest
+
+from passbrew.exceptions import SnapshotError, ValidationError
+from passbrew.generators.pronounceable import PronounceablePasswordGenerator
+from passbrew.markov import MarkovModel, get_model_key
+from passbrew.settings import GeneratorSettings
+from passbrew.wordlist import WordIndex, WordListSource
+
+
+@pytest.fixture
+def settings():
+    return GeneratorSettings(min_length=8, max_length=40)
+
+
+@pytest.fixture(scope="module")
+def model():
+    return MarkovModel.train(
+        PronounceablePasswordGenerator.DEFAULT_WORD_LIST_PATH.read_text().split()
+    )
+
+
+class TestMarkovModel:
+    def test_single_word(self):
+        # The only word is repeated, cut at the requested length.
+        model = MarkovModel.train(["abc"])
+        assert model.generate(random.Random(1), 10) == "abcabcabca"
+
+    def test_transitions(self):
+        model = MarkovModel.train(["ab", "cd"], order=1)
+        for text in model.generate_many(random.Random(2), 200, 12):
+            chunks = [text[i : i + 2] for i in range(0, 12, 2)]
+            assert set(chunks) <= {"ab", "cd"}
+
+    def test_training_words(self, model):
+        assert model.order == 2
+        assert set(model.symbols[1:]) <= set("abcdefghijklmnopqrstuvwxyz")
+        # Words with other characters than letters are skipped.
+        assert MarkovModel.train(["a-b", "12", "Ok"]).symbols == ["", "k", "o"]
+
+    def test_invalid(self):
+        with pytest.raises(ValidationError):
+            MarkovModel.train(["123"])
+        with pytest.raises(ValidationError):
+            MarkovModel.train(["abc"], order=0)
+
+    def test_exact_length(self, model):
+        rng = random.Random(3)
+        for length in (1, 2, 16, 100):
+            assert len(model.generate(rng, length)) == length
+        texts = model.generate_many(rng, 1000, 16)
+        assert len(texts) == 1000
+        assert {len(t) for t in texts} == {16}
+        assert all(t.isalpha() and t.islower() for t in texts)
+
+    def test_save_and_load(self, model, tmp_path):
+        path = tmp_path / "model.bin"
+        model.save(path)
+        loaded = MarkovModel.load(path)
+        assert loaded.key == model.key
+        assert loaded.symbols == model.symbols
+        assert loaded.generate_many(random.Random(4), 50, 16) == model.generate_many(
+            random.Random(4), 50, 16
+        )
+
+    @pytest.mark.parametrize("contents", [b"", b"PBMARKOV" + b"\x00" * 30])
+    def test_load_invalid(self, tmp_path, contents):
+        path = tmp_path / "model.bin"
+        path.write_bytes(contents)
+        with pytest.raises(SnapshotError):
+            MarkovModel.load(path)
+
+    def test_load_corrupt(self, model, tmp_path):
+        path = tmp_path / "model.bin"
+        model.save(path)
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xFF
+        path.write_bytes(data)
+        with pytest.raises(SnapshotError):
+            MarkovModel.load(path)
+
+    def test_model_key(self):
+        assert get_model_key(["a", "b"], 2) == get_model_key(iter(["a", "b"]), 2)
+        assert get_model_key(["a", "b"], 2) != get_model_key(["a", "b"], 3)
+        assert get_model_key(["ab"], 2) != get_model_key(["a", "b"], 2)
+
+
+class TestPronounceablePasswordGenerator:
+    def test_generate(self, settings):
+        generator = PronounceablePasswordGenerator(settings=settings)
+        password = generator.generate(16)
+        assert len(password) == 16
+        assert password.isalpha()
+
+    def test_generate_batch(self, settings):
+        generator = PronounceablePasswordGenerator(settings=settings)
+        passwords = generator.generate_batch(100, 20)
+        assert len(passwords) == 100
+        assert {len(p) for p in passwords} == {20}
+
+    def test_invalid_length(self, settings):
+        generator = PronounceablePasswordGenerator(settings=settings)
+        with pytest.raises(ValueError):
+            generator.generate(4)
+        with pytest.raises(ValueError):
+            generator.generate_batch(10, 41)
+
+    def test_model_cache(self, settings, tmp_path):
+        path = tmp_path / "model.bin"
+        generator = PronounceablePasswordGenerator(settings=settings, model_path=path)
+        assert path.exists()
+        cached = PronounceablePasswordGenerator(settings=settings, model_path=path)
+        assert cached.model.key == generator.model.key
+
+        higher_order = PronounceablePasswordGenerator(
+            settings=settings, order=3, model_path=path
+        )
+        assert higher_order.model.order == 3
+        assert MarkovModel.load(path).order == 3
+
+    def test_invalid_cache_replaced(self, settings, tmp_path):
+        path = tmp_path / "model.bin"
+        path.write_bytes(b"not a model")
+        PronounceablePasswordGenerator(settings=settings, model_path=path)
+        assert MarkovModel.load(path).order == 2
+
+    def test_word_source(self, settings, tmp_path):
+        path = tmp_path / "words.txt"
+        path.write_text("abc\n")
+        source = WordListSource(path)
+        generator = PronounceablePasswordGenerator(
+            settings=settings, word_source=source, rng=random.Random(5)
+        )
+        assert generator.generate(9) == "abcabcabc"
+
+        path.write_text("xyz\n")
+        source.reload()
+        assert generator.generate(9) == "xyzxyzxyz"
+
+    def test_words_rejected(self, settings):
+        words = ["ab", "cd", "ababcdcd", "cdcdabab", "abababab"]
+        generator = PronounceablePasswordGenerator(
+            settings=settings, word_index=WordIndex(words), rng=random.Random(6)
+        )
+        passwords = generator.generate_batch(200, 8)
+        assert len(passwords) == 200
+        assert not set(passwords) & set(words)
+        assert all(generator.generate(8) not in words for _ in range(50))
+
+    def test_only_words(self, settings):
+        generator = PronounceablePasswordGenerator(
+            settings=settings, word_index=WordIndex(["abc", "abcabcabc"])
+        )
+        assert generator.generate(8) == "abcabcab"
+        with pytest.raises(ValidationError):
+            generator.generate(9)
+        with pytest.raises(ValidationError):
+            generator.generate_batch(3, 9)
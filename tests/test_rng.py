@@ -0,0 +1,159 @@
+import random
+import threading
+
+import pytest
+
+from passbrew.exceptions import InsecureRandomWarning, IntError
+from passbrew.generators.base_generator import BasePasswordGenerator
+from passbrew.generators.computer_friendly import ComputerFriendlyPasswordGenerator
+from passbrew.generators.passphrase import PassphraseGenerator
+from passbrew.generators.user_friendly import UserFriendlyPasswordGenerator
+from passbrew.rng import (
+    SecureRandom,
+    SeededRandom,
+    ThreadLocalRandom,
+    bulk_choices,
+    bulk_randbelow,
+)
+
+pytestmark = pytest.mark.filterwarnings(
+    "ignore::passbrew.exceptions.InsecureRandomWarning"
+)
+
+
+def _stream(generator_class, seed, stream=0, *args):
+    generator = generator_class(rng=SeededRandom(seed, stream))
+    return [generator.generate(*args) for _ in range(20)]
+
+
+class TestSeededRandom:
+    def test_seeded_random_warns(self):
+        with pytest.warns(InsecureRandomWarning):
+            SeededRandom(1)
+
+    def test_seeded_random_is_not_secure(self):
+        assert not SeededRandom(1).is_secure
+        assert SecureRandom().is_secure
+
+    def test_seeded_random_invalid_seed(self):
+        with pytest.raises(IntError):
+            SeededRandom("seed")
+
+    def test_spawn(self):
+        rng = SeededRandom(1)
+        assert rng.spawn(3).random() == SeededRandom(1, 3).random()
+
+
+class TestReproducibility:
+    @pytest.mark.parametrize(
+        "generator_class, args",
+        [
+            (UserFriendlyPasswordGenerator, (20,)),
+            (PassphraseGenerator, (20, False)),
+            (ComputerFriendlyPasswordGenerator, (25,)),
+        ],
+    )
+    def test_same_seed_same_passwords(self, generator_class, args):
+        assert _stream(generator_class, 42, 0, *args) == _stream(
+            generator_class, 42, 0, *args
+        )
+
+    def test_different_streams(self):
+        assert _stream(UserFriendlyPasswordGenerator, 42, 0, 20) != _stream(
+            UserFriendlyPasswordGenerator, 42, 1, 20
+        )
+
+    def test_global_random_is_untouched(self):
+        random.seed(7)
+        expected = random.random()
+        random.seed(7)
+        _stream(UserFriendlyPasswordGenerator, 42, 0, 20)
+        assert random.random() == expected
+
+    def test_default_rng_is_secure(self):
+        assert isinstance(BasePasswordGenerator().rng, SecureRandom)
+
+
+class TestBulkChoices:
+    def test_bulk_choices(self):
+        choices = bulk_choices(SecureRandom(), "abc", 3000)
+        assert len(choices) == 3000
+        assert set(choices) == {"a", "b", "c"}
+
+    def test_bulk_choices_is_reproducible(self):
+        assert bulk_choices(SeededRandom(1), "0123456789", 50) == bulk_choices(
+            SeededRandom(1), "0123456789", 50
+        )
+
+    @pytest.mark.parametrize("population", ["", list(range(257))])
+    def test_bulk_choices_invalid_population(self, population):
+        with pytest.raises(ValueError):
+            bulk_choices(SecureRandom(), population, 1)
+
+    def test_bulk_randbelow(self):
+        limits = [1, 2, 3, 7, 65536] * 200
+        values = bulk_randbelow(SecureRandom(), limits)
+        assert all(0 <= v < limit for v, limit in zip(values, limits))
+        assert set(values[2::5]) == {0, 1, 2}
+
+
+def _in_thread(function):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(function()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+class TestThreadLocalRandom:
+    def test_instance_per_thread(self):
+        rng = ThreadLocalRandom()
+        assert rng.current is rng.current
+        assert _in_thread(lambda: rng.current) is not rng.current
+        assert isinstance(rng.current, SecureRandom)
+        assert rng.is_secure
+
+    def test_seeded_streams(self):
+        rng = ThreadLocalRandom.seeded(42)
+        # The first thread to draw gets stream 0, the next one stream 1.
+        first = [rng.random() for _ in range(5)]
+        second = _in_thread(lambda: [rng.random() for _ in range(5)])
+        stream_0 = SeededRandom(42, 0)
+        stream_1 = SeededRandom(42, 1)
+        assert first == [stream_0.random() for _ in range(5)]
+        assert second == [stream_1.random() for _ in range(5)]
+        assert not rng.is_secure
+
+    def test_seeded_warns(self):
+        with pytest.warns(InsecureRandomWarning):
+            ThreadLocalRandom.seeded(1)
+
+    def test_random_methods(self):
+        rng = ThreadLocalRandom(lambda: random.Random(3))
+        expected = random.Random(3)
+        assert rng.randrange(1000) == expected.randrange(1000)
+        assert rng.choice("abcdef") == expected.choice("abcdef")
+        assert rng.randbytes(4) == expected.randbytes(4)
+
+    def test_no_state(self):
+        rng = ThreadLocalRandom()
+        with pytest.raises(NotImplementedError):
+            rng.getstate()
+        with pytest.raises(NotImplementedError):
+            rng.setstate(None)
+
+    def test_generator_across_threads(self):
+        generator = UserFriendlyPasswordGenerator(rng=ThreadLocalRandom.seeded(7))
+        passwords = []
+        threads = [
+            threading.Thread(
+                target=lambda: passwords.extend(generator.generate_batch(50, 20))
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(passwords) == 200
+        assert {len(pwd) for pwd in passwords} == {20}
@@ -0,0 +1,139 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from passbrew.exceptions import ValidationError
+from passbrew.service import BatchCoalescer, PassbrewServer
+
+
+class CountingGenerator:
+    def __init__(self):
+        self.calls = []
+
+    def generate_batch(self, count, length):
+        if length < 0:
+            raise ValidationError("Invalid length.")
+        self.calls.append(count)
+        return [str(i) for i in range(count)]
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = PassbrewServer(("127.0.0.1", 0), stream_threshold=10, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def conn(server):
+    conn = http.client.HTTPConnection(*server.server_address)
+    yield conn
+    conn.close()
+
+
+def _get(conn, path):
+    conn.request("GET", path)
+    response = conn.getresponse()
+    return response, response.read().decode("utf-8")
+
+
+class TestBatchCoalescer:
+    def test_submit(self):
+        generator = CountingGenerator()
+        coalescer = BatchCoalescer({"gen": generator})
+        assert coalescer.submit("gen", 3, (20,)) == ["0", "1", "2"]
+        coalescer.close()
+
+    def test_concurrent_requests_are_merged(self):
+        generator = CountingGenerator()
+        coalescer = BatchCoalescer({"gen": generator}, max_delay=0.2)
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(coalescer.submit("gen", 2, (20,)))
+            )
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        coalescer.close()
+        assert len(results) == 5
+        assert all(len(r) == 2 for r in results)
+        assert len(generator.calls) < 5
+        assert sum(generator.calls) == 10
+
+    def test_errors_are_raised_in_caller(self):
+        coalescer = BatchCoalescer({"gen": CountingGenerator()})
+        with pytest.raises(ValidationError):
+            coalescer.submit("gen", 1, (-1,))
+        coalescer.close()
+
+
+class TestService:
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/computer-friendly?length=25&count=3",
+            "/user-friendly?length=20&count=3",
+            "/passphrase?length=5&count=3",
+        ],
+    )
+    def test_generate(self, conn, path):
+        response, body = _get(conn, path)
+        assert response.status == 200
+        assert len(json.loads(body)["passwords"]) == 3
+
+    def test_keep_alive(self, conn):
+        for _ in range(3):
+            response, _ = _get(conn, "/user-friendly?length=20")
+            assert response.status == 200
+            assert not response.will_close
+
+    def test_stream(self, conn):
+        response, body = _get(
+            conn, "/passphrase?length=20&use_word_count=false&count=25"
+        )
+        assert response.status == 200
+        assert response.getheader("Transfer-Encoding") == "chunked"
+        passwords = [json.loads(line) for line in body.splitlines()]
+        assert len(passwords) == 25
+        assert all(len(p) == 20 for p in passwords)
+
+    def test_invalid_length(self, conn):
+        response, body = _get(conn, "/user-friendly?length=2")
+        assert response.status == 400
+        assert "error" in json.loads(body)
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/computer-friendly?length=2",
+            "/computer-friendly?length=abc",
+            "/passphrase?length=5&use_word_count=maybe",
+        ],
+    )
+    def test_invalid_arguments(self, conn, path):
+        response, body = _get(conn, path)
+        assert response.status == 400
+        assert "error" in json.loads(body)
+        # The connection is still usable.
+        response, _ = _get(conn, "/computer-friendly?length=20")
+        assert response.status == 200
+
+    def test_missing_length(self, conn):
+        response, _ = _get(conn, "/user-friendly")
+        assert response.status == 400
+
+    def test_invalid_count(self, conn):
+        response, _ = _get(conn, "/user-friendly?length=20&count=0")
+        assert response.status == 400
+
+    def test_unknown_generator(self, conn):
+        response, _ = _get(conn, "/unknown?length=20")
+        assert response.status == 404
@@ -0,0 +1,139 @@
+import pytest
+
+from passbrew.exceptions import ValidationError
+from passbrew.generators.passphrase import PassphraseGenerator
+from passbrew.generators.policy import PasswordPolicy
+from passbrew.generators.user_friendly import UserFriendlyPasswordGenerator
+from passbrew.settings import GeneratorSettings
+
+
+@pytest.fixture(scope="module")
+def word_index():
+    return UserFriendlyPasswordGenerator().word_index
+
+
+class TestGeneratorSettings:
+    def test_settings_invalid_value(self):
+        with pytest.raises(ValidationError):
+            GeneratorSettings(char_amount=0)
+
+    def test_settings_min_not_less_than_max(self):
+        with pytest.raises(ValidationError):
+            GeneratorSettings(min_length=30, max_length=20)
+
+    def test_settings_min_word_count_not_less_than_max(self):
+        with pytest.raises(ValidationError):
+            GeneratorSettings(min_word_count=4, max_word_count=4)
+
+    def test_settings_extra_chars_exceed_max_length(self):
+        with pytest.raises(ValidationError):
+            GeneratorSettings(
+                max_length=10, char_amount=4, num_amount=4, empty_space_amount=2
+            )
+        settings = GeneratorSettings(max_length=10, char_amount=4, num_amount=4)
+        assert (
+            repr(settings)
+            == "GeneratorSettings(max_length=10, char_amount=4, num_amount=4)"
+        )
+
+    def test_settings_are_slotted(self):
+        settings = GeneratorSettings(char_amount=2)
+        with pytest.raises(AttributeError):
+            settings.other = 1
+
+
+class TestPerInstanceSettings:
+    # Other tests change the class defaults, so the settings are derived
+    # from the current ones.
+    @pytest.mark.parametrize(
+        "generator_class, get_settings",
+        [
+            (
+                UserFriendlyPasswordGenerator,
+                lambda cls: GeneratorSettings(max_length=cls._min_length),
+            ),
+            (
+                UserFriendlyPasswordGenerator,
+                lambda cls: GeneratorSettings(min_length=cls._max_length),
+            ),
+            (
+                PassphraseGenerator,
+                lambda cls: GeneratorSettings(max_word_count=cls._min_word_count),
+            ),
+            (
+                UserFriendlyPasswordGenerator,
+                lambda cls: GeneratorSettings(
+                    min_length=1,
+                    max_length=cls._char_amount
+                    + cls._num_amount
+                    + cls._empty_space_amount,
+                ),
+            ),
+        ],
+    )
+    def test_partial_overrides_checked_against_defaults(
+        self, word_index, generator_class, get_settings
+    ):
+        with pytest.raises(ValidationError):
+            generator_class(
+                word_index=word_index, settings=get_settings(generator_class)
+            )
+
+    def test_partial_overrides_within_defaults(self, word_index):
+        word_count = PassphraseGenerator._min_word_count + 1
+        generator = PassphraseGenerator(
+            word_index=word_index,
+            settings=GeneratorSettings(max_word_count=word_count),
+        )
+        assert len(generator.generate(word_count).split()) == word_count
+        length = UserFriendlyPasswordGenerator._min_length + 8
+        generator = UserFriendlyPasswordGenerator(
+            word_index=word_index, settings=GeneratorSettings(max_length=length)
+        )
+        assert len(generator.generate(length)) == length
+
+    def test_settings_override_class_defaults(self, word_index):
+        generator = UserFriendlyPasswordGenerator(
+            word_index=word_index,
+            settings=GeneratorSettings(char_amount=3, num_amount=4),
+        )
+        assert generator.char_amount == 3
+        assert generator.num_amount == 4
+        assert (
+            generator.empty_space_amount
+            == UserFriendlyPasswordGenerator._empty_space_amount
+        )
+        pwd = generator.generate(20)
+        assert len(pwd) == 20
+        assert sum(c.isdigit() for c in pwd) >= 4
+
+    def test_settings_length_range(self, word_index):
+        generator = UserFriendlyPasswordGenerator(
+            word_index=word_index, settings=GeneratorSettings(min_length=30)
+        )
+        with pytest.raises(ValidationError):
+            generator.generate(20)
+        assert len(generator.generate(30)) == 30
+
+    def test_settings_word_count(self, word_index):
+        generator = PassphraseGenerator(
+            word_index=word_index,
+            settings=GeneratorSettings(min_word_count=2, max_word_count=3),
+        )
+        assert len(generator.generate(2).split()) == 2
+        with pytest.raises(ValidationError):
+            generator.generate(4)
+
+
+class TestSharedWordIndex:
+    def test_word_index_is_shared(self, word_index):
+        a = UserFriendlyPasswordGenerator(word_index=word_index)
+        b = PassphraseGenerator(word_index=word_index)
+        assert a.words is b.words
+
+    def test_generators_are_slotted(self, word_index):
+        assert not hasattr(
+            UserFriendlyPasswordGenerator(word_index=word_index), "__dict__"
+        )
+        assert not hasattr(PassphraseGenerator(word_index=word_index), "__dict__")
+        assert not hasattr(PasswordPolicy(), "__dict__")
@@ -0,0 +1,236 @@
+import os
+import random
+import shutil
+
+import pytest
+
+from passbrew.exceptions import SnapshotError
+from passbrew.generators.base_generator import BasePasswordGenerator
+from passbrew.generators.computer_friendly import ComputerFriendlyPasswordGenerator
+from passbrew.generators.passphrase import PassphraseGenerator, PassphraseStyle
+from passbrew.generators.policy import PasswordPolicy, PolicyPasswordGenerator
+from passbrew.generators.user_friendly import UserFriendlyPasswordGenerator
+from passbrew.settings import GeneratorSettings
+from passbrew.snapshot import (
+    MappedStrings,
+    MappedWordIndex,
+    load_snapshot,
+    save_snapshot,
+    warm_start,
+)
+from passbrew.tokens import HEX
+from passbrew.wordlist import WeightedWordIndex
+
+
+@pytest.fixture
+def word_list(tmp_path):
+    path = tmp_path / "words.txt"
+    shutil.copy(BasePasswordGenerator.DEFAULT_WORD_LIST_PATH, path)
+    return path
+
+
+@pytest.fixture
+def settings():
+    return GeneratorSettings(
+        min_length=12, max_length=40, min_word_count=2, max_word_count=10
+    )
+
+
+@pytest.fixture
+def policy():
+    return PasswordPolicy(
+        min_uppercase=1,
+        no_repeated_class=True,
+        max_word_length=8,
+        banned_substrings=["pass"],
+    )
+
+
+def _build(name, word_list, settings, policy, rng=None):
+    kwargs = {"word_list_path": word_list, "settings": settings, "rng": rng}
+    if name == "policy":
+        return PolicyPasswordGenerator(policy, **kwargs)
+    if name == "passphrase":
+        return PassphraseGenerator(style=PassphraseStyle("-", "title", 1), **kwargs)
+    if name == "computer-friendly":
+        return ComputerFriendlyPasswordGenerator(alphabet=HEX, **kwargs)
+    return UserFriendlyPasswordGenerator(**kwargs)
+
+
+def _fields(obj):
+    return {k: getattr(obj, k) for k in obj.__slots__}
+
+
+GENERATOR_NAMES = ["policy", "passphrase", "user-friendly", "computer-friendly"]
+
+
+class TestRoundTrip:
+    @pytest.mark.parametrize("name", GENERATOR_NAMES)
+    def test_same_output(self, tmp_path, word_list, settings, policy, name):
+        path = tmp_path / "generator.snap"
+        save_snapshot(_build(name, word_list, settings, policy), path, word_list)
+        restored = load_snapshot(path, word_list, rng=random.Random(1))
+        original = _build(name, word_list, settings, policy, random.Random(1))
+
+        assert type(restored) is type(original)
+        assert _fields(restored.settings) == _fields(original.settings)
+        length = 4 if name == "passphrase" else 20
+        assert restored.generate_batch(50, length) == original.generate_batch(
+            50, length
+        )
+
+    def test_policy_state(self, tmp_path, word_list, settings, policy):
+        generator = _build("policy", word_list, settings, policy)
+        path = tmp_path / "policy.snap"
+        save_snapshot(generator, path, word_list)
+        restored = load_snapshot(path, word_list)
+
+        assert _fields(restored.policy) == _fields(generator.policy)
+        assert set(restored._long_words) == generator._long_words
+        assert restored._longest_word == generator._longest_word
+        assert {k: list(v) for k, v in restored._buckets.items()} == {
+            k: list(v) for k, v in generator._buckets.items()
+        }
+        # Every composition table was computed before saving.
+        for length in generator._composition_tables:
+            assert restored._composition_tables.get(length) == (
+                generator._composition_tables[length]
+            )
+
+    def test_word_index(self, tmp_path, word_list, settings):
+        generator = _build("user-friendly", word_list, settings, None)
+        path = tmp_path / "words.snap"
+        save_snapshot(generator, path, word_list)
+        index = load_snapshot(path, word_list).word_index
+
+        assert isinstance(index, MappedWordIndex)
+        assert list(index) == list(generator.word_index)
+        assert index.histogram == generator.word_index.histogram
+        for max_length in (0, 3, 7, 100):
+            assert index.count(max_length) == generator.word_index.count(max_length)
+        assert index.get_many([5, 0, 5]) == [index[5], index[0], index[5]]
+        assert index.get_many_encoded([5, 0]) == [index[5].encode(), index[0].encode()]
+
+    def test_weighted_index_rejected(self, tmp_path, word_list, settings):
+        generator = PassphraseGenerator(
+            settings=settings, word_index=WeightedWordIndex(["a", "b"], [1, 2])
+        )
+        with pytest.raises(SnapshotError):
+            save_snapshot(generator, tmp_path / "weighted.snap", word_list)
+
+    def test_word_source_rejected(self, tmp_path, word_list, settings):
+        generator = _build("user-friendly", word_list, settings, None)
+        generator.word_source = object()
+        with pytest.raises(SnapshotError):
+            save_snapshot(generator, tmp_path / "source.snap", word_list)
+
+
+class TestMappedStrings:
+    def test_access(self):
+        words = ["a", "bb", "ççç"]
+        data = "".join(words).encode()
+        offsets = memoryview(bytearray(16)).cast("I")
+        for i, offset in enumerate([0, 1, 3, 9]):
+            offsets[i] = offset
+        strings = MappedStrings(data, offsets)
+
+        assert list(strings) == words
+        assert strings[-1] == "ççç"
+        assert strings[0:2] == ["a", "bb"]
+        assert list(MappedStrings(data, offsets, 1, 3)) == ["bb", "ççç"]
+        with pytest.raises(IndexError):
+            strings[3]
+
+
+class TestValidation:
+    @pytest.fixture
+    def snapshot(self, tmp_path, word_list, settings):
+        path = tmp_path / "generator.snap"
+        save_snapshot(
+            _build("user-friendly", word_list, settings, None), path, word_list
+        )
+        return path
+
+    def test_changed_word_list(self, snapshot, word_list):
+        with open(word_list, "a") as f:
+            f.write("\nsnapshot\n")
+        with pytest.raises(SnapshotError):
+            load_snapshot(snapshot, word_list)
+
+    def test_same_size_change(self, snapshot, word_list):
+        contents = word_list.read_bytes()
+        word_list.write_bytes(contents[::-1])
+        with pytest.raises(SnapshotError):
+            load_snapshot(snapshot, word_list)
+
+    def test_touched_word_list(self, snapshot, word_list):
+        stat = os.stat(word_list)
+        os.utime(word_list, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert load_snapshot(snapshot, word_list).generate(20)
+
+    def test_skip_check(self, snapshot, word_list):
+        os.remove(word_list)
+        assert load_snapshot(snapshot, None).generate(20)
+
+    def test_bad_magic(self, snapshot, word_list):
+        data = bytearray(snapshot.read_bytes())
+        data[0:4] = b"NOPE"
+        snapshot.write_bytes(data)
+        with pytest.raises(SnapshotError):
+            load_snapshot(snapshot, word_list)
+
+    def test_corrupt_metadata(self, snapshot, word_list):
+        data = bytearray(snapshot.read_bytes())
+        data[30] ^= 0xFF
+        snapshot.write_bytes(data)
+        with pytest.raises(SnapshotError):
+            load_snapshot(snapshot, word_list)
+
+    @pytest.mark.parametrize("contents", [b"", b"PBSNAP"])
+    def test_truncated(self, tmp_path, word_list, contents):
+        path = tmp_path / "truncated.snap"
+        path.write_bytes(contents)
+        with pytest.raises(SnapshotError):
+            load_snapshot(path, word_list)
+
+    def test_missing(self, tmp_path, word_list):
+        with pytest.raises(SnapshotError):
+            load_snapshot(tmp_path / "missing.snap", word_list)
+
+
+class TestWarmStart:
+    def test_builds_then_restores(self, tmp_path, word_list, settings, policy):
+        path = tmp_path / "policy.snap"
+        built = warm_start(path, "policy", word_list, settings, policy=policy)
+        assert isinstance(built, PolicyPasswordGenerator)
+        assert path.exists()
+
+        restored = warm_start(path, "policy", word_list, settings, policy=policy)
+        assert isinstance(restored.word_index, MappedWordIndex)
+        assert _fields(restored.policy) == _fields(policy)
+        assert len(restored.generate(20)) == 20
+
+    def test_rebuilds_on_changed_config(self, tmp_path, word_list, settings, policy):
+        path = tmp_path / "policy.snap"
+        warm_start(path, "policy", word_list, settings, policy=policy)
+        other = PasswordPolicy(min_uppercase=2)
+        generator = warm_start(path, "policy", word_list, settings, policy=other)
+        assert not isinstance(generator.word_index, MappedWordIndex)
+        assert _fields(load_snapshot(path, word_list).policy) == _fields(other)
+
+    def test_rebuilds_on_changed_word_list(self, tmp_path, word_list, settings):
+        path = tmp_path / "tokens.snap"
+        warm_start(path, "computer-friendly", word_list, settings, alphabet="hex")
+        with open(word_list, "a") as f:
+            f.write("\nsnapshot\n")
+        generator = warm_start(
+            path, "computer-friendly", word_list, settings, alphabet="hex"
+        )
+        assert not isinstance(generator.word_index, MappedWordIndex)
+        assert "snapshot" in load_snapshot(path, word_list).word_index
+
+    def test_replaces_invalid_file(self, tmp_path, word_list, settings):
+        path = tmp_path / "passphrase.snap"
+        path.write_bytes(b"not a snapshot")
+        warm_start(path, "passphrase", word_list, settings)
+        assert isinstance(load_snapshot(path, word_list), PassphraseGenerator)
@@ -0,0 +1,124 @@
+import random
+
+import pytest
+
+from passbrew.generators.passphrase import PassphraseGenerator
+from passbrew.generators.policy import PasswordPolicy, PolicyPasswordGenerator
+from passbrew.generators.user_friendly import UserFriendlyPasswordGenerator
+from passbrew.settings import GeneratorSettings
+from passbrew.sqlite_index import SQLiteWordIndex, build_sqlite_word_index, main
+from passbrew.wordlist import WordIndex, load_word_list
+
+
+@pytest.fixture(scope="module")
+def word_index():
+    return WordIndex(*load_word_list(PassphraseGenerator.DEFAULT_WORD_LIST_PATH))
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory, word_index):
+    path = tmp_path_factory.mktemp("sqlite") / "words.db"
+    build_sqlite_word_index(list(word_index) + ["", "cat", "cat"], path)
+    return path
+
+
+@pytest.fixture
+def index(database):
+    with SQLiteWordIndex(database, cache_size=100) as index:
+        yield index
+
+
+@pytest.fixture
+def settings():
+    return GeneratorSettings(
+        min_length=12, max_length=40, min_word_count=2, max_word_count=10
+    )
+
+
+class TestBuild:
+    def test_build(self, tmp_path):
+        path = tmp_path / "words.db"
+        assert build_sqlite_word_index(["dog", "cat", "", "cat", "horse"], path) == 3
+        with SQLiteWordIndex(path) as index:
+            assert list(index) == ["cat", "dog", "horse"]
+
+    def test_build_replaces_database(self, tmp_path):
+        path = tmp_path / "words.db"
+        build_sqlite_word_index(["dog"], path)
+        build_sqlite_word_index(["owl", "bird"], path)
+        with SQLiteWordIndex(path) as index:
+            assert list(index) == ["owl", "bird"]
+
+    def test_main(self, tmp_path, capsys):
+        source = tmp_path / "words.txt"
+        source.write_text("dog\ncat\n", encoding="utf-8")
+        main([str(source), "-o", str(tmp_path / "words.db")])
+        assert "2 words written" in capsys.readouterr().out
+
+
+class TestSQLiteWordIndex:
+    def test_same_words(self, index, word_index):
+        assert len(index) == len(word_index)
+        assert index.histogram == word_index.histogram
+        assert set(index) == set(word_index)
+
+    def test_ordered_by_length(self, index):
+        lengths = [len(w) for w in index]
+        assert lengths == sorted(lengths)
+
+    @pytest.mark.parametrize("max_length", [0, 1, 3, 8, 100])
+    def test_count(self, index, word_index, max_length):
+        assert index.count(max_length) == word_index.count(max_length)
+
+    def test_getitem(self, index):
+        words = list(index)
+        assert index[0] == words[0]
+        assert index[-1] == words[-1]
+        assert index[10:13] == words[10:13]
+        with pytest.raises(IndexError):
+            index[len(words)]
+
+    def test_pick(self, index):
+        rng = random.Random(1)
+        assert all(len(index.pick(rng, 4)) <= 4 for _ in range(200))
+        with pytest.raises(IndexError):
+            index.pick(rng, 0)
+
+    def test_sample(self, index):
+        rows = index.sample(random.Random(2), 5, rows=20)
+        assert len(rows) == 20
+        assert all(len(set(row)) == 5 for row in rows)
+
+    def test_sample_matches_random_sample(self, index):
+        assert index.sample(random.Random(3), 4)[0] == random.Random(3).sample(
+            list(index), 4
+        )
+
+    def test_cache(self, index):
+        index.get_many(range(150))
+        assert index.misses == 150
+        index.get_many(range(100, 150))
+        assert index.hits == 50
+        index.get_many([0])
+        assert index.misses == 151
+
+    def test_many_parameters(self, index):
+        positions = list(range(0, 2000, 2))
+        assert index.get_many(positions) == list(index)[0:2000:2]
+
+
+class TestGenerators:
+    def test_user_friendly(self, index, settings):
+        generator = UserFriendlyPasswordGenerator(word_index=index, settings=settings)
+        assert all(len(p) == 20 for p in generator.generate_batch(50, 20))
+
+    def test_passphrase(self, index, settings):
+        generator = PassphraseGenerator(word_index=index, settings=settings)
+        assert all(len(p.split(" ")) == 4 for p in generator.generate_batch(50, 4))
+        assert len(generator.generate(20, use_word_count=False)) == 20
+
+    def test_policy(self, index, settings):
+        generator = PolicyPasswordGenerator(
+            PasswordPolicy(min_uppercase=1), word_index=index, settings=settings
+        )
+        assert len(generator.generate(20)) == 20
@@ -0,0 +1,325 @@
+"""
+Statistical checks of the output distributions of the generators.
+
+Every test generates a large sample through the batch paths and compares
+it with the expected distribution in a chi-square test. The generators use
+fixed seeds, so the tests are deterministic; a p-value below `ALPHA` means
+a sampler was changed in a way that skews its output.
+"""
+
+import math
+import re
+from collections import Counter
+
+import pytest
+
+from passbrew.generators.passphrase import PassphraseGenerator
+from passbrew.generators.pattern import PatternPasswordGenerator
+from passbrew.generators.user_friendly import UserFriendlyPasswordGenerator
+from passbrew.rng import SeededRandom
+from passbrew.pattern import CONSONANTS
+from passbrew.settings import GeneratorSettings
+from passbrew.wordlist import WeightedWordIndex, WordIndex, load_word_list
+
+pytestmark = pytest.mark.filterwarnings(
+    "ignore::passbrew.exceptions.InsecureRandomWarning"
+)
+
+ALPHA = 0.001
+
+
+def _upper_gamma_regularized(a: float, x: float) -> float:
+    # Q(a, x), from the series for small x and the continued fraction
+    # (modified Lentz) otherwise.
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1 / a
+        n = a
+        while abs(term) > abs(total) * 1e-15:
+            n += 1
+            term *= x / n
+            total += term
+        return 1 - total * math.exp(log_prefix)
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    i = 1
+    while True:
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            return h * math.exp(log_prefix)
+        i += 1
+
+
+def chi_square(observed: Counter, expected: dict) -> tuple:
+    """
+    Compare observed counts with expected probabilities.
+
+    :return: The statistic, the degrees of freedom and the p-value.
+    """
+    total = sum(observed.values())
+    assert set(observed) <= set(expected), "Unexpected outcomes observed."
+    statistic = 0.0
+    for outcome, probability in expected.items():
+        count = total * probability
+        assert count >= 5, "Sample too small for a chi-square test."
+        statistic += (observed[outcome] - count) ** 2 / count
+    df = len(expected) - 1
+    return statistic, df, _upper_gamma_regularized(df / 2, statistic / 2)
+
+
+def _uniform(outcomes) -> dict:
+    outcomes = list(outcomes)
+    return {outcome: 1 / len(outcomes) for outcome in outcomes}
+
+
+@pytest.fixture(scope="module")
+def word_index():
+    return WordIndex(*load_word_list(PassphraseGenerator.DEFAULT_WORD_LIST_PATH))
+
+
+@pytest.fixture(scope="module")
+def capitalized_index(word_index):
+    # Every word starts with the only capital letter in it, so passwords
+    # can be split back into their segments.
+    return WordIndex(w.capitalize() for w in word_index if w.isalpha() and w.islower())
+
+
+class TestChiSquare:
+    def test_p_value(self):
+        # Reference values of the chi-square survival function.
+        for statistic, df, p in (
+            (3.841, 1, 0.05),
+            (18.307, 10, 0.05),
+            (2.0, 2, 0.3679),
+        ):
+            assert _upper_gamma_regularized(df / 2, statistic / 2) == pytest.approx(
+                p, abs=1e-3
+            )
+
+    def test_detects_modulo_bias(self):
+        # Mapping random bytes to 62 outcomes by modulo favours the first 8.
+        rng = SeededRandom(1)
+        observed = Counter(b % 62 for b in rng.randbytes(200_000))
+        assert chi_square(observed, _uniform(range(62)))[2] < ALPHA
+
+
+class TestWordSelection:
+    def test_passphrase_word_frequency(self, word_index):
+        generator = PassphraseGenerator(
+            rng=SeededRandom(2),
+            settings=GeneratorSettings(min_word_count=2, max_word_count=12),
+            word_index=word_index,
+        )
+        observed = Counter()
+        for passphrase in generator.generate_batch(30_000, 5):
+            observed.update(passphrase.split(" "))
+        _, _, p = chi_square(observed, _uniform(word_index))
+        assert p > ALPHA
+
+    @pytest.mark.parametrize("max_length", [3, 6, 12])
+    def test_pick_frequency(self, word_index, max_length):
+        rng = SeededRandom(3, max_length)
+        count = word_index.count(max_length)
+        observed = Counter(
+            word_index.pick(rng, max_length) for _ in range(max(20 * count, 10_000))
+        )
+        candidates = [w for w in word_index if len(w) <= max_length]
+        _, _, p = chi_square(observed, _uniform(candidates))
+        assert p > ALPHA
+
+    def test_pattern_word_frequency(self, word_index):
+        # `word` lowercases its words, so only lowercase words are used.
+        lowercase_index = WordIndex(w for w in word_index if w.islower())
+        generator = PatternPasswordGenerator(
+            rng=SeededRandom(4),
+            settings=GeneratorSettings(),
+            word_index=lowercase_index,
+        )
+        observed = Counter(generator.generate_batch(30_000, "word{4,5}"))
+        candidates = [w for w in lowercase_index if 4 <= len(w) <= 5]
+        _, _, p = chi_square(observed, _uniform(candidates))
+        assert p > ALPHA
+
+
+@pytest.fixture(scope="module")
+def weighted_index(word_index):
+    # Zipf-like weights, the usual shape of word frequencies.
+    return WeightedWordIndex(word_index, [1000 // (i + 1) + 1 for i in range(100)] * 30)
+
+
+class TestWeightedSelection:
+    @pytest.mark.parametrize("max_length", [4, 8, 20])
+    def test_pick_frequency(self, weighted_index, max_length):
+        rng = SeededRandom(7, max_length)
+        observed = Counter(weighted_index.pick(rng, max_length) for _ in range(40_000))
+        weights = {
+            w: weight
+            for w, weight in zip(weighted_index, weighted_index.weights)
+            if len(w) <= max_length
+        }
+        total = sum(weights.values())
+        expected = {w: weight / total for w, weight in weights.items()}
+        # Merge the words expected less than 5 times into one cell.
+        rare = {w for w, p in expected.items() if p * 40_000 < 5}
+        merged_expected = Counter()
+        for w, p in expected.items():
+            merged_expected[None if w in rare else w] += p
+        merged_observed = Counter()
+        for w, n in observed.items():
+            merged_observed[None if w in rare else w] += n
+        _, _, p = chi_square(merged_observed, merged_expected)
+        assert p > ALPHA
+
+    def test_second_word_of_sample(self):
+        # Successive sampling: the second word is drawn in proportion to
+        # its weight among the words other than the first.
+        weights = [40, 20, 20, 10, 5, 5]
+        index = WeightedWordIndex("abcdef", weights)
+        rows = index.sample(SeededRandom(8), 2, 60_000)
+        expected = Counter()
+        for i, first in enumerate(weights):
+            for j, second in enumerate(weights):
+                if i != j:
+                    expected["abcdef"[i], "abcdef"[j]] += (
+                        first / 100 * second / (100 - first)
+                    )
+        _, _, p = chi_square(Counter(map(tuple, rows)), expected)
+        assert p > ALPHA
+
+
+class TestLengthDistribution:
+    def test_passphrase_length(self, word_index):
+        word_count = 4
+        generator = PassphraseGenerator(
+            rng=SeededRandom(4),
+            settings=GeneratorSettings(min_word_count=2, max_word_count=12),
+            word_index=word_index,
+        )
+        # The length of a passphrase is the sum of the lengths of its words
+        # and the separators. Words are sampled without replacement, which
+        # changes the distribution by far less than this test can detect.
+        single = Counter(len(w) for w in word_index)
+        expected = {word_count - 1: 1.0}
+        for _ in range(word_count):
+            combined = Counter()
+            for length, probability in expected.items():
+                for word_length, amount in single.items():
+                    combined[length + word_length] += (
+                        probability * amount / len(word_index)
+                    )
+            expected = combined
+
+        observed = Counter(map(len, generator.generate_batch(50_000, word_count)))
+        # Merge the rare tails so every cell expects at least 5 passwords.
+        threshold = 5 / 50_000
+        lengths = sorted(expected)
+        low = next(
+            n
+            for n in lengths
+            if sum(expected[m] for m in lengths if m <= n) > threshold
+        )
+        high = next(
+            n
+            for n in reversed(lengths)
+            if sum(expected[m] for m in lengths if m >= n) > threshold
+        )
+        clamp = lambda n: min(max(n, low), high)  # noqa: E731
+        merged_expected = Counter()
+        for length, probability in expected.items():
+            merged_expected[clamp(length)] += probability
+        merged_observed = Counter()
+        for length, amount in observed.items():
+            merged_observed[clamp(length)] += amount
+
+        _, _, p = chi_square(merged_observed, merged_expected)
+        assert p > ALPHA
+
+    def test_fixed_length_passphrase(self, word_index):
+        generator = PassphraseGenerator(
+            rng=SeededRandom(5),
+            settings=GeneratorSettings(min_length=10, max_length=40),
+            word_index=word_index,
+        )
+        lengths = Counter(map(len, generator.generate_batch(20_000, 23, False)))
+        assert lengths == {23: 20_000}
+
+
+@pytest.fixture(scope="module")
+def user_friendly_segments(capitalized_index):
+    generator = UserFriendlyPasswordGenerator(
+        rng=SeededRandom(6),
+        settings=GeneratorSettings(
+            min_length=12,
+            max_length=40,
+            char_amount=1,
+            num_amount=1,
+            empty_space_amount=1,
+        ),
+        word_index=capitalized_index,
+    )
+    passwords = generator.generate_batch(60_000, 24)
+    assert all(len(p) == 24 for p in passwords)
+    return [re.findall(r"[A-Z][a-z]*|.", p) for p in passwords]
+
+
+class TestUserFriendlyPositions:
+    def _position_test(self, segments, is_target, gaps=False):
+        # The amount of segments differs between passwords, so every amount
+        # gets its own uniform distribution. The statistics of independent
+        # groups add up, and so do their degrees of freedom.
+        groups = {}
+        for items in segments:
+            values = [s for s in items if s != " "]
+            if gaps:
+                outcome = items.index(" ")
+                size = len(values) - 1
+            else:
+                outcome = next(i for i, s in enumerate(values) if is_target(s))
+                size = len(values)
+            groups.setdefault(size, Counter())[outcome] += 1
+
+        statistic = df = 0
+        for size, observed in groups.items():
+            offset = 1 if gaps else 0
+            if sum(observed.values()) < 5 * size:
+                continue
+            s, d, _ = chi_square(observed, _uniform(range(offset, size + offset)))
+            statistic += s
+            df += d
+        assert df > 10
+        return _upper_gamma_regularized(df / 2, statistic / 2)
+
+    def test_special_character_position(self, user_friendly_segments):
+        special = set(UserFriendlyPasswordGenerator._special_chars)
+        assert self._position_test(user_friendly_segments, special.__contains__) > ALPHA
+
+    def test_digit_position(self, user_friendly_segments):
+        assert self._position_test(user_friendly_segments, str.isdigit) > ALPHA
+
+    def test_space_position(self, user_friendly_segments):
+        assert self._position_test(user_friendly_segments, None, gaps=True) > ALPHA
+
+
+class TestPatternCharacters:
+    def test_character_frequency(self, word_index):
+        generator = PatternPasswordGenerator(
+            rng=SeededRandom(11), settings=GeneratorSettings(), word_index=word_index
+        )
+        passwords = generator.generate_batch(20_000, "c-c")
+        for position in (0, 2):
+            observed = Counter(p[position] for p in passwords)
+            _, _, p = chi_square(observed, _uniform(CONSONANTS))
+            assert p > ALPHA
@@ -0,0 +1,83 @@
+import gc
+import weakref
+
+import pytest
+
+from passbrew.exceptions import ValidationError
+from passbrew import strength
+from passbrew.strength import StrengthChecker, get_checker
+from passbrew.utils import WordList
+
+
+@pytest.fixture
+def checker():
+    return StrengthChecker(["pass", "word", "dog", "house", "a"])
+
+
+class TestFindWords:
+    def test_find_words(self, checker):
+        assert checker.find_words("password") == ["pass", "word"]
+
+    def test_find_words_case_folding(self, checker):
+        assert checker.find_words("HoUsE") == ["house"]
+
+    def test_find_words_leetspeak(self, checker):
+        assert checker.find_words("P@55w0rd") == ["pass", "word"]
+
+    def test_find_words_ignores_short_words(self, checker):
+        assert checker.find_words("aaa") == []
+
+    def test_find_words_non_latin(self, checker):
+        assert checker.find_words("do😀g") == []
+
+
+class TestCheck:
+    def test_check_dictionary_words(self, checker):
+        result = checker.check("password")
+        assert result.covered == 8
+        assert result.word_count == 2
+        assert result.score == 0
+
+    def test_check_random_password(self, checker):
+        result = checker.check("x9$Kq!vZ2#mLr7")
+        assert result.covered == 0
+        assert result.score >= 3
+
+    def test_check_batch(self, checker):
+        passwords = ["password", "x9$Kq!vZ2#mLr7", "dog"]
+        assert checker.check_batch(passwords) == [checker.check(p) for p in passwords]
+
+    def test_invalid_min_word_length(self):
+        with pytest.raises(ValidationError):
+            StrengthChecker(["dog"], min_word_length=0)
+
+
+class TestGetChecker:
+    def test_cached_by_identity(self):
+        words = ["cat", "dog", "lion"]
+        assert get_checker(words) is get_checker(words)
+        assert get_checker(words) is not get_checker(list(words))
+        assert get_checker(words) is not get_checker(words, min_word_length=4)
+
+    def test_word_list_change_invalidates(self):
+        words = WordList(["cat", "dog"])
+        checker = get_checker(words)
+        words.append("lion")
+        assert get_checker(words) is not checker
+        assert get_checker(words).find_words("lion") == ["lion"]
+
+    def test_word_lists_are_referenced_weakly(self):
+        words = WordList(["cat", "dog"])
+        ref = weakref.ref(words)
+        get_checker(words)
+        del words
+        gc.collect()
+        assert ref() is None
+
+    def test_bounded(self):
+        lists = [[f"word{i}"] for i in range(strength._CACHE_SIZE + 1)]
+        checkers = [get_checker(words) for words in lists]
+        assert len(strength._cache) == strength._CACHE_SIZE
+        # The least recently used list was evicted.
+        assert get_checker(lists[-1]) is checkers[-1]
+        assert get_checker(lists[0]) is not checkers[0]
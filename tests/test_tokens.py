@@ -0,0 +1,129 @@
+import os
+import string
+from collections import Counter
+
+import pytest
+
+from passbrew.exceptions import ValidationError
+from passbrew.generators.computer_friendly import ComputerFriendlyPasswordGenerator
+from passbrew.generators.pattern import PatternPasswordGenerator
+from passbrew.rng import SeededRandom
+from passbrew.settings import GeneratorSettings
+from passbrew.tokens import ALPHABETS, BASE32, HEX, TokenEngine
+
+pytestmark = pytest.mark.filterwarnings(
+    "ignore::passbrew.exceptions.InsecureRandomWarning"
+)
+
+
+class TestTokenEngine:
+    @pytest.mark.parametrize("name", sorted(ALPHABETS))
+    def test_alphabets(self, name):
+        engine = TokenEngine(name)
+        for token in engine.tokens(100, 20):
+            assert len(token) == 20
+            assert set(token) <= set(ALPHABETS[name])
+
+    def test_custom_alphabet(self):
+        engine = TokenEngine("abc!")
+        assert set("".join(engine.tokens(100, 10))) == set("abc!")
+
+    def test_token(self):
+        engine = TokenEngine(HEX)
+        tokens = [engine.token(7) for _ in range(50)]
+        assert all(len(t) == 7 for t in tokens)
+        assert len(set(tokens)) == 50
+
+    def test_large_batch(self):
+        tokens = TokenEngine(BASE32).tokens(10_000, 16)
+        assert len(tokens) == 10_000
+        assert {len(t) for t in tokens} == {16}
+
+    def test_reproducible_with_seeded_rng(self):
+        first = TokenEngine(rng=SeededRandom(3)).tokens(10, 12)
+        assert first == TokenEngine(rng=SeededRandom(3)).tokens(10, 12)
+
+    def test_unbiased(self):
+        # 62 characters do not divide 256, so a modulo without rejection
+        # would make the first 8 characters 5/4 times as likely.
+        alphabet = string.ascii_letters + string.digits
+        engine = TokenEngine(alphabet, rng=SeededRandom(1))
+        counts = Counter("".join(engine.tokens(1000, 62)))
+        first = sum(counts[c] for c in alphabet[:8]) / 8
+        rest = sum(counts[c] for c in alphabet[8:]) / 54
+        assert abs(first / rest - 1) < 0.05
+
+    def test_bits_per_character(self):
+        assert TokenEngine(HEX).bits_per_character == 4
+
+    @pytest.mark.parametrize("alphabet", ["a", "aab", "Ābc", 42, "x" * 257])
+    def test_invalid_alphabet(self, alphabet):
+        with pytest.raises(ValidationError):
+            TokenEngine(alphabet)
+
+    @pytest.mark.parametrize("args", [(0, 5), (5, 0), (5, "5")])
+    def test_invalid_tokens(self, args):
+        with pytest.raises(ValidationError):
+            TokenEngine().tokens(*args)
+
+
+class TestComputerFriendlyPasswordGenerator:
+    @pytest.fixture
+    def settings(self):
+        return GeneratorSettings(min_length=8, max_length=64)
+
+    def test_exact_length(self, settings):
+        generator = ComputerFriendlyPasswordGenerator(settings=settings)
+        for length in (8, 16, 33, 64):
+            assert len(generator.get(length)) == length
+
+    def test_alphabet(self, settings):
+        generator = ComputerFriendlyPasswordGenerator(settings=settings, alphabet="hex")
+        assert set(generator.get(64)) <= set(HEX)
+
+    def test_generate_batch(self, settings):
+        generator = ComputerFriendlyPasswordGenerator(settings=settings)
+        passwords = generator.generate_batch(1000, 16)
+        assert len(passwords) == 1000
+        assert all(len(p) == 16 for p in passwords)
+
+    def test_invalid_length(self, settings):
+        generator = ComputerFriendlyPasswordGenerator(settings=settings)
+        with pytest.raises(ValueError):
+            generator.get(65)
+        with pytest.raises(ValueError):
+            generator.generate_batch(2, 4)
+
+
+def _computer_friendly():
+    generator = ComputerFriendlyPasswordGenerator(
+        settings=GeneratorSettings(min_length=8, max_length=64)
+    )
+    return lambda: generator.generate(16)
+
+
+def _pattern():
+    generator = PatternPasswordGenerator(settings=GeneratorSettings())
+    return lambda: generator.generate("xxxxxxxxxxxxxxxx")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+@pytest.mark.parametrize("factory", [_computer_friendly, _pattern])
+def test_fork_does_not_repeat_tokens(factory):
+    generate = factory()
+    # Use the generator before forking, as a pre-forking server would.
+    generate()
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.write(write, generate().encode())
+        finally:
+            os._exit(0)
+    os.close(write)
+    parent = generate()
+    with os.fdopen(read, "rb") as f:
+        child = f.read().decode()
+    os.waitpid(pid, 0)
+    assert len(child) == len(parent)
+    assert child != parent
@@ -90,6 +90,24 @@ class TestPickRandomWord:
             friendly_password._pick_a_random_word("str")
 
 
+class TestAddACapitalLetter:
+    def test_capitalizes_one_letter_of_a_word(self, friendly_password):
+        for _ in range(20):
+            segments = ["!", "apple", "7", "a"]
+            friendly_password._add_a_capital_letter(segments)
+            assert segments[0] == "!"
+            assert segments[2:] == ["7", "a"]
+            word = segments[1]
+            assert word.lower() == "apple"
+            # The first letter is never the one capitalized.
+            assert [ch.isupper() for ch in word].count(True) == 1
+            assert word[0] == "a"
+
+    def test_no_word_to_capitalize(self, friendly_password):
+        with pytest.raises(IndexError):
+            friendly_password._add_a_capital_letter(["!", "7", "a"])
+
+
 class TestGenerate:
     def test_generate_valid_input(self, friendly_password):
         pwd = friendly_password.generate(20)
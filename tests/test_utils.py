@@ -1,7 +1,16 @@
+import gc
+import weakref
+
 import pytest
 
 from passbrew.exceptions import ValidationError
-from passbrew.utils import filter_list
+from passbrew.utils import (
+    _FILTER_CACHE,
+    FilterCache,
+    WordList,
+    cached_filter_list,
+    filter_list,
+)
 
 
 @pytest.fixture
@@ -33,3 +42,106 @@ class TestFilterList:
             match="The input must be a positive number. Please provide a valid positive number.",
         ):
             filter_list(lst, -1)
+
+
+class TestCachedFilterList:
+    @pytest.fixture
+    def cache(self):
+        return FilterCache(maxsize=2)
+
+    @pytest.fixture
+    def words(self, lst):
+        return WordList(lst)
+
+    def test_cached_filter_list(self, words):
+        assert cached_filter_list(words, 3) == ("cat", "dog")
+        assert cached_filter_list(words, 3) is cached_filter_list(words, 3)
+
+    def test_filter_list_uses_cache(self, words):
+        hits = _FILTER_CACHE.hits
+        first = filter_list(words, 3)
+        second = filter_list(words, 3)
+        assert first == second == ["cat", "dog"]
+        # Every call gets a list of its own.
+        assert first is not second
+        assert _FILTER_CACHE.hits == hits + 1
+
+    def test_hit(self, cache, words):
+        first = cache.get(words, 3)
+        assert cache.get(words, 3) is first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_result_is_read_only(self, cache, words):
+        with pytest.raises(AttributeError):
+            cache.get(words, 3).append("cow")
+
+    def test_plain_list_is_not_cached(self, cache, lst):
+        assert cache.get(lst, 3) == ("cat", "dog")
+        lst.append("cow")
+        assert cache.get(lst, 3) == ("cat", "dog", "cow")
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (0, 0)
+
+    def test_word_list_change_invalidates(self, cache):
+        words = WordList(["cat", "lion"])
+        assert cache.get(words, 3) == ("cat",)
+        words[1] = "dog"
+        assert cache.get(words, 3) == ("cat", "dog")
+        words.remove("cat")
+        assert cache.get(words, 3) == ("dog",)
+        assert words.version == 2
+
+    def test_read_during_change_is_not_kept(self, cache):
+        words = WordList(["cat"])
+
+        def new_words():
+            yield "dog"
+            # Reads the list halfway through the change.
+            assert cache.get(words, 3) == ("cat", "dog")
+            yield "cow"
+
+        words.extend(new_words())
+        assert cache.get(words, 3) == ("cat", "dog", "cow")
+
+    def test_lists_are_referenced_weakly(self, cache):
+        words = WordList(["cat", "lion"])
+        ref = weakref.ref(words)
+        cache.get(words, 3)
+        del words
+        gc.collect()
+        assert ref() is None
+        # A new list, possibly at the same address, is not served the
+        # result of the old one.
+        assert cache.get(WordList(["dog", "ox"]), 3) == ("dog", "ox")
+
+    def test_equal_lists_are_cached_separately(self, cache, words):
+        other = WordList(words)
+        cache.get(words, 3)
+        cache.get(other, 3)
+        assert cache.misses == 2
+
+    def test_lru_eviction(self, cache, words):
+        cache.get(words, 3)
+        cache.get(words, 4)
+        cache.get(words, 3)
+        cache.get(words, 5)
+        assert len(cache) == 2
+        cache.get(words, 3)
+        assert cache.hits == 2
+        cache.get(words, 4)
+        assert cache.misses == 4
+
+    def test_invalid_list(self, cache):
+        with pytest.raises(TypeError, match="Input should be a list of string"):
+            cache.get([1, 2, 3], 3)
+        with pytest.raises(TypeError, match="Input should be a list of string"):
+            cache.get([[1]], 3)
+
+    def test_invalid_length(self, cache, words):
+        cache.get(words, 3)
+        with pytest.raises(ValidationError):
+            cache.get(words, -1)
+
+    def test_invalid_maxsize(self):
+        with pytest.raises(ValidationError):
+            FilterCache(maxsize=0)
@@ -0,0 +1,313 @@
+import math
+import random
+import threading
+
+import pytest
+
+from passbrew.exceptions import ValidationError
+from passbrew.generators.passphrase import PassphraseGenerator
+from passbrew.generators.user_friendly import UserFriendlyPasswordGenerator
+from passbrew.settings import GeneratorSettings
+from passbrew.wordlist import (
+    WeightedWordIndex,
+    WordIndex,
+    WordListSource,
+    build_word_list,
+    get_histogram_path,
+    load_weighted_word_list,
+    load_word_list,
+    normalize_word,
+)
+
+CORPUS = ["Café\n", "dog\n", "DOG\n", "\n", "lion\n", "e-mail\n", "a\n", "zebra\n"]
+
+
+@pytest.fixture
+def word_list(tmp_path):
+    path = tmp_path / "words.txt"
+    build_word_list(CORPUS, path, min_length=2, chunk_size=2)
+    return path
+
+
+class TestBuildWordList:
+    def test_normalize_word(self):
+        assert normalize_word(" Café\n") == "cafe"
+        assert normalize_word("Café", lowercase=False) == "Cafe"
+
+    def test_build_word_list(self, word_list):
+        assert word_list.read_text().split() == ["dog", "cafe", "lion", "zebra"]
+
+    def test_build_word_list_histogram(self, word_list):
+        assert get_histogram_path(word_list).exists()
+        assert load_word_list(word_list)[1] == {3: 1, 4: 2, 5: 1}
+
+    def test_build_word_list_max_length(self, tmp_path):
+        path = tmp_path / "words.txt"
+        histogram = build_word_list(CORPUS, path, max_length=4)
+        assert histogram == {1: 1, 3: 1, 4: 2}
+
+    def test_build_word_list_charset(self, tmp_path):
+        path = tmp_path / "words.txt"
+        build_word_list(CORPUS, path, min_length=5, charset="a-z-")
+        assert path.read_text().split() == ["zebra", "e-mail"]
+
+    def test_build_word_list_invalid_length(self, tmp_path):
+        with pytest.raises(ValidationError):
+            build_word_list(CORPUS, tmp_path / "words.txt", min_length=0)
+
+
+class TestLoadWordList:
+    def test_load_removes_blanks_and_duplicates(self, tmp_path):
+        path = tmp_path / "words.txt"
+        path.write_text("dog\n\ncat\ndog\n")
+        assert load_word_list(path) == (["dog", "cat"], {3: 2})
+
+    def test_generator_loads_built_list(self, word_list):
+        generator = UserFriendlyPasswordGenerator(word_list)
+        assert generator.words == ["dog", "cafe", "lion", "zebra"]
+
+
+class TestWordIndex:
+    def test_word_index_sorts_by_length(self):
+        index = WordIndex(["zebra", "dog", "lion"])
+        assert index.words == ["dog", "lion", "zebra"]
+        assert index.histogram == {3: 1, 4: 1, 5: 1}
+
+    def test_word_index_count(self):
+        index = WordIndex(["zebra", "dog", "lion"])
+        assert index.count(2) == 0
+        assert index.count(4) == 2
+        assert index.count(100) == 3
+
+    def test_word_index_pick(self):
+        index = WordIndex(["zebra", "dog", "lion"])
+        rng = random.Random(1)
+        assert {index.pick(rng, 4) for _ in range(100)} == {"dog", "lion"}
+
+    def test_word_index_pick_too_short(self):
+        with pytest.raises(IndexError):
+            WordIndex(["zebra"]).pick(random.Random(1), 3)
+
+    def test_word_index_encoded(self):
+        index = WordIndex(["zebra", "dog", "café", "cat"])
+        assert index.get_many_encoded([3, 0]) == ["zebra".encode(), b"dog"]
+        # The same random numbers give the encoded words.
+        assert [index.pick_encoded(random.Random(i), 4) for i in range(20)] == [
+            index.pick(random.Random(i), 4).encode() for i in range(20)
+        ]
+        assert index.sample_encoded(random.Random(2), 3, 4) == [
+            [w.encode() for w in row] for row in index.sample(random.Random(2), 3, 4)
+        ]
+        # The encoded words are shared between calls.
+        assert index.get_many_encoded([0])[0] is index.get_many_encoded([0])[0]
+
+    def test_word_index_sequence(self):
+        index = WordIndex(["zebra", "dog", "lion", "cat"])
+        assert list(index) == ["dog", "cat", "lion", "zebra"]
+        assert [index[i] for i in range(len(index))] == list(index)
+        assert index[-1] == "zebra"
+        with pytest.raises(IndexError):
+            index[4]
+
+    def test_word_index_from_histogram(self):
+        index = WordIndex(["dog", "cat", "lion"], {3: 2, 4: 1})
+        assert index.histogram == {3: 2, 4: 1}
+        assert index.count(3) == 2
+
+    def test_word_index_entropy(self):
+        index = WordIndex(["dog", "cat", "lion", "zebra"])
+        assert index.entropy() == 2
+        assert index.entropy(2) == pytest.approx(math.log2(12))
+        assert index.entropy(1, max_length=3) == 1
+        assert index.min_entropy(2) == index.entropy(2)
+        with pytest.raises(ValueError):
+            index.entropy(5)
+
+
+class TestWeightedWordIndex:
+    @pytest.fixture
+    def index(self):
+        return WeightedWordIndex(
+            ["zebra", "dog", "lion", "cat", "dog", "ox"], [1, 2, 4, 1, 1, 0]
+        )
+
+    def test_words(self, index):
+        # Duplicates are merged, zero weights left out.
+        assert list(index) == ["dog", "cat", "lion", "zebra"]
+        assert index.weights == [3, 1, 4, 1]
+        assert index.histogram == {3: 2, 4: 1, 5: 1}
+
+    def test_pick(self, index):
+        rng = random.Random(1)
+        picks = [index.pick(rng, 3) for _ in range(4000)]
+        assert set(picks) == {"dog", "cat"}
+        assert picks.count("dog") == pytest.approx(3000, rel=0.05)
+        with pytest.raises(IndexError):
+            index.pick(rng, 2)
+
+    def test_sample(self, index):
+        rows = index.sample(random.Random(2), 4, 100)
+        assert len(rows) == 100
+        assert all(sorted(row) == sorted(index) for row in rows)
+        with pytest.raises(ValueError):
+            index.sample(random.Random(2), 5)
+
+    def test_encoded(self, index):
+        assert [index.pick_encoded(random.Random(i), 3) for i in range(20)] == [
+            index.pick(random.Random(i), 3).encode() for i in range(20)
+        ]
+        assert index.sample_encoded(random.Random(2), 2, 3) == [
+            [w.encode() for w in row] for row in index.sample(random.Random(2), 2, 3)
+        ]
+
+    def test_sample_dominant_word(self):
+        index = WeightedWordIndex(["a", "b", "c"], [10**6, 1, 1])
+        for row in index.sample(random.Random(3), 2, 20):
+            assert row[0] == "a"
+            assert len(set(row)) == 2
+
+    def test_entropy(self, index):
+        uniform = WeightedWordIndex(["dog", "cat", "lion", "zebra"], [5] * 4)
+        assert uniform.entropy(2) == pytest.approx(4)
+        assert uniform.min_entropy(2) == pytest.approx(math.log2(12))
+
+        probabilities = [3 / 9, 1 / 9, 4 / 9, 1 / 9]
+        shannon = -sum(p * math.log2(p) for p in probabilities)
+        assert index.entropy() == pytest.approx(shannon)
+        assert index.entropy(3) == pytest.approx(3 * shannon)
+        assert index.entropy(1, max_length=3) == pytest.approx(
+            -(0.75 * math.log2(0.75) + 0.25 * math.log2(0.25))
+        )
+        # The most likely sample is lion, then dog.
+        assert index.min_entropy(2) == pytest.approx(-math.log2(4 / 9 * 3 / 5))
+        assert index.min_entropy(1) < index.entropy(1) < WordIndex(index).entropy(1)
+
+    @pytest.mark.parametrize(
+        "words, weights",
+        [(["a", "b"], [1]), (["a"], [-1]), (["a"], [1.5]), (["a", "b"], [0, 0])],
+    )
+    def test_invalid(self, words, weights):
+        with pytest.raises(ValidationError):
+            WeightedWordIndex(words, weights)
+
+    def test_apply(self, index):
+        changed = index.apply({"tiger": 2, "dog": 5, "ox": 0}, removed=["zebra"])
+        assert changed.version == index.version + 1
+        assert list(changed) == ["dog", "cat", "lion", "tiger"]
+        assert changed.weights == [5, 1, 4, 2]
+        # The untouched bucket keeps its alias table, the old version is
+        # unchanged.
+        assert changed._bucket_tables[1] is index._bucket_tables[1]
+        assert list(index) == ["dog", "cat", "lion", "zebra"]
+        picks = [changed.pick(random.Random(i), 3) for i in range(3000)]
+        assert picks.count("dog") == pytest.approx(2500, rel=0.05)
+
+    def test_apply_invalid(self, index):
+        with pytest.raises(ValidationError):
+            index.apply(["tiger"])
+        with pytest.raises(ValidationError):
+            index.apply({"tiger": -1})
+        with pytest.raises(ValidationError):
+            index.apply(removed=list(index))
+
+    def test_load_weighted_word_list(self, tmp_path):
+        path = tmp_path / "weighted.txt"
+        path.write_text("time\t1843\nyear 912\n\nzebra\t0\n")
+        assert load_weighted_word_list(path) == (
+            ["time", "year", "zebra"],
+            [1843, 912, 0],
+        )
+
+    @pytest.mark.parametrize("line", ["time\n", "time\t1.5\n", "time 1 2\n"])
+    def test_load_invalid_weighted_word_list(self, tmp_path, line):
+        path = tmp_path / "weighted.txt"
+        path.write_text("year\t912\n" + line)
+        with pytest.raises(ValidationError):
+            load_weighted_word_list(path)
+
+
+class TestWordIndexApply:
+    def test_apply(self):
+        index = WordIndex(["dog", "cat", "lion", "zebra"])
+        new = index.apply(added=["ant", "dog", "tiger"], removed=["cat", "zebra"])
+        assert list(new) == ["dog", "ant", "lion", "tiger"]
+        assert new.version == index.version + 1
+
+    def test_apply_keeps_old_version(self):
+        index = WordIndex(["dog", "cat", "lion"])
+        index.apply(removed=["dog"])
+        assert list(index) == ["dog", "cat", "lion"]
+
+    def test_apply_shares_untouched_buckets(self):
+        index = WordIndex(["dog", "cat", "lion", "zebra"])
+        new = index.apply(added=["ant"])
+        assert new._buckets[1] is index._buckets[1]
+        assert new._buckets[2] is index._buckets[2]
+        assert new._buckets[0] is not index._buckets[0]
+
+
+class TestWordListSource:
+    @pytest.fixture
+    def source(self, tmp_path):
+        path = tmp_path / "words.txt"
+        path.write_text("dog\ncat\nlion\nzebra\n")
+        return WordListSource(path)
+
+    def test_reload(self, source):
+        source.path.write_text("dog\nlion\nzebra\ntiger\n")
+        assert source.reload()
+        assert list(source.index) == ["dog", "lion", "zebra", "tiger"]
+        assert not source.reload()
+
+    def test_check_unmodified(self, source):
+        assert not source.check()
+
+    def test_update(self, source):
+        index = source.update(added=["ant"], removed=["dog", "cat"])
+        assert index is source.index
+        assert list(index) == ["ant", "lion", "zebra"]
+
+    def test_generator_follows_source(self, source):
+        generator = PassphraseGenerator(
+            word_source=source,
+            settings=GeneratorSettings(min_word_count=2, max_word_count=6),
+        )
+        snapshot = generator.word_index
+        source.update(removed=["dog", "cat", "lion"], added=["ant", "bee", "elk"])
+        words = generator.generate(4).split()
+        assert "dog" not in words and "ant" in words
+        assert list(snapshot) == ["dog", "cat", "lion", "zebra"]
+
+    def test_weighted_reload(self, tmp_path):
+        path = tmp_path / "weighted.txt"
+        path.write_text("dog 3\ncat 1\nlion 4\n")
+        source = WordListSource(path, weighted=True)
+        generator = PassphraseGenerator(
+            word_source=source,
+            settings=GeneratorSettings(min_word_count=2, max_word_count=6),
+        )
+        assert isinstance(source.index, WeightedWordIndex)
+        path.write_text("dog 3\ncat 7\nzebra 2\n")
+        assert source.reload()
+        assert list(source.index) == ["dog", "cat", "zebra"]
+        assert source.index.weights == [3, 7, 2]
+        assert not source.reload()
+        assert set(generator.generate(3).split()) == {"dog", "cat", "zebra"}
+
+        index = source.update({"ox": 1}, removed=["dog"])
+        assert index.weights == [1, 7, 2]
+        with pytest.raises(ValidationError):
+            source.update(["tiger"])
+        assert source.index is index
+
+    def test_watch(self, source):
+        source.watch(interval=0.01)
+        try:
+            source.path.write_text("dog\n")
+            for _ in range(200):
+                if list(source.index) == ["dog"]:
+                    break
+                threading.Event().wait(0.01)
+            assert list(source.index) == ["dog"]
+        finally:
+            source.stop()